@@ -1,5 +1,10 @@
+import os
+import sys
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "processing"))
+from entities import build_entity_table, entity_ids
+
 dealInvestor_df = pd.read_csv("data/dealInvestor_updated.csv")
 investors_df = pd.read_csv("data/investors_updated.csv")
 
@@ -9,7 +14,7 @@ investors_df["investorName"] = investors_df["investorName"].str.strip().str.lowe
 investor_country_map = investors_df.set_index("investorName")["country"].to_dict()
 
 unmatched_investors = dealInvestor_df[
-    (dealInvestor_df["investorCountry"].isnull()) & 
+    (dealInvestor_df["investorCountry"].isnull()) &
     (~dealInvestor_df["investorName"].isin(investor_country_map))
 ]["investorName"].unique()
 
@@ -17,7 +22,16 @@ dealInvestor_df["investorCountry"] = dealInvestor_df["investorCountry"].fillna(
     dealInvestor_df["investorName"].map(investor_country_map)
 )
 
+# 🔹 Retry the names with no exact match through the fuzzy entity index ("Sequoia Capital, Inc." -> "sequoia capital")
+entities = build_entity_table(investors_df["investorName"], dealInvestor_df["investorName"])
+investor_entities = entity_ids(entities, investors_df["investorName"])
+entity_country_map = investors_df["country"][investor_entities.notna()].groupby(investor_entities.dropna()).last()
+unmatched = dealInvestor_df["investorCountry"].isnull() & dealInvestor_df["investorName"].isin(unmatched_investors)
+dealInvestor_df.loc[unmatched, "investorCountry"] = (
+    entity_ids(entities, dealInvestor_df.loc[unmatched, "investorName"]).map(entity_country_map).astype(object)
+)
+
 dealInvestor_df.to_csv("data/dealInvestor_final.csv", index=False)
 
 print(f"❌ Remaining missing `investorCountry`: {dealInvestor_df['investorCountry'].isnull().sum()}")
-print("✅ `investorCountry` updated using `investors_updated.csv` and saved as `dealInvestor_final.csv`!")
\ No newline at end of file
+print("✅ `investorCountry` updated using `investors_updated.csv` and saved as `dealInvestor_final.csv`!")
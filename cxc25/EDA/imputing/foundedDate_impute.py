@@ -1,21 +1,32 @@
 ### THIS IS FOR SCRAPING dateFounded IN companies.csv
 
+import asyncio
 import re
 import google.generativeai as genai
 from googlesearch import search
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import time
 import numpy as np
 import dotenv
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "processing"))
+from scraper import SEARCH_FAILURE, Fetcher, map_bounded
+from founded_dates import append_checkpoint, fill_scraped_dates, load_checkpoint
+
+# Companies looked up at once; per-host limits live in processing/scraper.py and apply to the searches too
+COMPANY_CONCURRENCY = 8
+SEARCH_URL = "https://www.google.com/search"
+# Results are appended here as each company finishes, so an interrupted run picks up where it stopped
+CHECKPOINT_PATH = "data/companies_scraped_checkpoint.csv"
 
 dotenv.load_dotenv()
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 
 df = pd.read_csv("data/companies_cleaned.csv")
 missing_companies = df[df["dateFounded"].isna()][["companyName", "ecosystemName"]].dropna().values.tolist()
+done = set(load_checkpoint(CHECKPOINT_PATH)[["companyName", "ecosystemName"]].itertuples(index=False, name=None))
+missing_companies = [[company, location] for company, location in missing_companies if (company, location) not in done]
 
 genai.configure(api_key=gemini_api_key)  # Replace with your actual API key
 
@@ -44,44 +55,14 @@ def get_google_search_results(company_name, location):
     ]
     return valid_results
 
-def scrape_webpage(url):
-    """Fetch and extract text content from a webpage."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36"
-    }
-    
-    try:
-        response = requests.get(url, headers=headers, timeout=10)  # Increased timeout
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, "html.parser")
-        return soup.get_text()
-
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error scraping {url}: {e}")
-        return None
-
 def format_founded_date(date_str):
     """Format year-only results as 'YYYY-01-01'."""
     if re.fullmatch(r"\d{4}", date_str):  # If only a year is found
         return f"{date_str}-01-01"
     return date_str  # Return full YYYY-MM-DD if already formatted
 
-def get_founded_date(company_name, location):
-    """Find the full founded date using Google search + web scraping + Gemini AI."""
-    search_results = get_google_search_results(company_name, location)
-
-    scraped_texts = []
-    for url in search_results:
-        scraped_text = scrape_webpage(url)
-        if scraped_text:
-            scraped_texts.append(scraped_text[:2000])  # Limit text size for API
-            if len(scraped_texts) >= 10:  # Stop after getting 2 valid results
-                break
-
-    if not scraped_texts:
-        return "Not Found"
-
+def extract_founded_date(company_name, location, scraped_texts):
+    """Ask Gemini for the founding date found in the scraped pages."""
     try:
         # 🔹 Use Gemini API
         model = genai.GenerativeModel("gemini-pro")
@@ -103,16 +84,36 @@ def get_founded_date(company_name, location):
         print(f"❌ Gemini API Error: {e}")
         return "Error: AI Failure"
 
-# 🔹 Loop through the missing companies list
-for company, location in missing_companies:
-    print(f"🔍 Searching for: {company} ({location})")
-    founded_date = get_founded_date(company, location)
+async def get_founded_date(fetcher, company_name, location):
+    """Find the full founded date using Google search + concurrent web scraping + Gemini AI."""
+    print(f"🔍 Searching for: {company_name} ({location})")
+    try:
+        search_results = await fetcher.run_limited(SEARCH_URL, get_google_search_results, company_name, location)
+    except Exception as e:
+        # Not checkpointed, so the company is searched again on the next run
+        print(f"❌ Search Error: {e}")
+        return SEARCH_FAILURE
 
-    # 🔹 Update the original DataFrame
-    df.loc[(df["companyName"] == company) & (df["ecosystemName"] == location), "dateFounded"] = founded_date
+    # Fetch the results concurrently and stop once 10 pages have text
+    scraped_texts = await fetcher.collect_texts(search_results, limit=10)
+    if not scraped_texts:
+        founded_date = "Not Found"
+    else:
+        founded_date = await asyncio.to_thread(extract_founded_date, company_name, location, scraped_texts)
+
+    # 🔹 Checkpoint the result before moving on
+    append_checkpoint(CHECKPOINT_PATH, [(company_name, location, founded_date)])
+    return founded_date
+
+async def get_founded_dates(companies):
+    with Fetcher() as fetcher:
+        return await map_bounded(companies, lambda company, location: get_founded_date(fetcher, company, location), COMPANY_CONCURRENCY)
+
+# 🔹 Look up the missing companies concurrently
+asyncio.run(get_founded_dates(missing_companies))
 
-    # 🔹 Sleep to prevent API rate limits
-    time.sleep(2)
+# 🔹 Update the original DataFrame from every checkpointed result in one pass
+df = fill_scraped_dates(df, load_checkpoint(CHECKPOINT_PATH))
 
 
 # ensuring that all of the imputed data is dates
@@ -128,7 +129,7 @@ print(df[date_cols].isnull().sum())
 #######################################
 
 import pandas as pd
-from datetime import timedelta
+from founded_dates import impute_founded_dates
 
 companies_df = pd.read_csv("data/companies_updated.csv")  # Companies data
 deals_df = pd.read_csv("data/deals_updated.csv")  # Deals with funding dates
@@ -138,23 +139,7 @@ deals_df["companyName"] = deals_df["companyName"].str.strip().str.lower()
 
 deals_df["date"] = pd.to_datetime(deals_df["date"], errors="coerce")
 
-deals_df = deals_df.sort_values(by=["companyName", "date"], ascending=[True, True])
-
-first_funding = deals_df.drop_duplicates(subset=["companyName"], keep="first")[["companyName", "date", "roundType"]]
-
-def estimate_founded_date(row):
-    if pd.isnull(row["date"]):  # If no funding date available, return NaN
-        return pd.NaT
-
-    if row["roundType"] in ["Pre-Seed", "Seed", "Series A", "Series B"]:
-        return row["date"] - pd.DateOffset(years=1)  # 1 year before first funding
-    else:
-        return row["date"] - pd.DateOffset(years=2)  # 2 years before first funding
-
-first_funding["estimatedFounded"] = first_funding.apply(estimate_founded_date, axis=1)
-companies_df = companies_df.merge(first_funding[["companyName", "estimatedFounded"]], on="companyName", how="left")
-companies_df["dateFounded"] = companies_df["dateFounded"].fillna(companies_df["estimatedFounded"])
-companies_df.drop(columns=["estimatedFounded"], inplace=True, errors="ignore")
+companies_df, founded_filled = impute_founded_dates(companies_df, deals_df)
 companies_df.to_csv("data/companies_final.csv", index=False)
 
 print(companies_df.isnull().sum())
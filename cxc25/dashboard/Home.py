@@ -1,7 +1,13 @@
-import pycountry
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from data_loader import load_deals, load_companies, load_investors, load_country_codes
+from deal_facts import load_deal_facts, deals_per_country
+from cube import load_cube, amount_by, deal_counts
+from downsample import downsample, render_mode, METHODS as DOWNSAMPLING_METHODS
+from date_index import load_date_index
+from time_buckets import GRANULARITIES, bucket_column
+from figure_cache import cached_figure, show_cache_stats
 
 # Set Page Config
 st.set_page_config(
@@ -102,36 +108,13 @@ st.markdown("""
 
 ####### DATA #######
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/deals_updated.csv")
-    df = df.drop(columns=["ecosystemSecondary"], errors="ignore")  
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    df["year"] = df["date"].dt.year
-    df = df[df["year"].between(2019, 2024)]
-    return df
-deals_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/dealInvestor_updated.csv")
-    df = df.dropna(subset=["date"])
-    df = df[df["year"].between(2019, 2024)]
-    return df
-dealInvestor_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/companies_updated.csv")
-    return df
-companies_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/investors_updated.csv")
-    return df
-investors_df = load_data()
+deals_df = load_deals()
+deal_facts = load_deal_facts()
+companies_df = load_companies()
+investors_df = load_investors()
+country_codes = load_country_codes()
+deal_cube = load_cube()
+deal_index = load_date_index()
 
 funding_data = {
     "Funding Stage": [
@@ -165,7 +148,6 @@ st.sidebar.write("---")
 
 min_date, max_date = deals_df["date"].min().date(), deals_df["date"].max().date()
 date_range = st.sidebar.slider("Select Date Range:", min_date, max_date, (min_date, max_date), format="YYYY-MM-DD")
-filtered_deals = deals_df[(deals_df["date"] >= pd.to_datetime(date_range[0])) & (deals_df["date"] <= pd.to_datetime(date_range[1]))]
 
 st.sidebar.write("---")
 
@@ -174,173 +156,179 @@ st.sidebar.image("dashboard/images/bb.png", use_container_width=True)  # 🔥 Re
 
 ####### METRICS #######
 col1, col2, col3, col4 = st.columns(4)
-col1.metric("Total Investment ($M)", f"{filtered_deals['amount'].sum() / 1e6:.2f}M")
-col2.metric("Total Deals", f"{filtered_deals.shape[0]}")
-col3.metric("Largest Deal ($M)", f"{filtered_deals['amount'].max() / 1e6:.2f}M")
-col4.metric("Smallest Deal ($K)", f"{filtered_deals['amount'].min() / 1e3:.2f}K")
+total_investment, total_deals, largest_deal, smallest_deal = deal_index.metrics(date_range)
+col1.metric("Total Investment ($M)", f"{total_investment / 1e6:.2f}M")
+col2.metric("Total Deals", f"{total_deals}")
+col3.metric("Largest Deal ($M)", f"{largest_deal / 1e6:.2f}M")
+col4.metric("Smallest Deal ($K)", f"{smallest_deal / 1e3:.2f}K")
 
+# Each section below is an st.fragment: a widget inside a section reruns only that section.
+# Inputs shared with the rest of the page (the sidebar date range, the data frames) are passed in explicitly.
 
 ####### Investment Over Time #######
-option = st.radio("Choose Investment View:", ["Total Investment Per Quarter", "Average Investment Amounts Over Time"])
-filtered_deals["yearQuarter"] = filtered_deals["date"].dt.to_period("Q").astype(str).apply(lambda x: "'" + f"{x[2:4]} Q{x[-1]}")
-if option == "Total Investment Per Quarter":
-    investment_by_quarter = filtered_deals.groupby("yearQuarter")["amount"].sum().reset_index()
-    st.subheader("Total Investment Per Quarter")
-else:
-    investment_by_quarter = filtered_deals.groupby("yearQuarter")["amount"].mean().reset_index()
-    st.subheader("Average Investment Amounts Over Time")
-fig = px.bar(
-    investment_by_quarter, x="yearQuarter", y="amount",
-    labels={"yearQuarter": "Quarter", "amount": "Investment ($)" if option == "Total Investment Per Quarter" else "Avg Investment ($)"},
-    text_auto=True, color="amount", color_continuous_scale="magma"
-)
-st.plotly_chart(fig, use_container_width=True)
-deals_per_year = filtered_deals.groupby("year").size().reset_index(name="deal_count")
-avg_deal_size_per_year = filtered_deals.groupby("year")["amount"].mean().reset_index()
-avg_deal_size_per_year.columns = ["year", "avg_deal_size"]  # Ensure correct column name
-avg_deal_size_per_year["avg_deal_size"] /= 1e6  # Convert to millions
-
+@st.fragment
+def investment_over_time(deal_cube, date_range):
+    option = st.radio("Choose Investment View:", ["Total Investment Per Quarter", "Average Investment Amounts Over Time"])
+    granularity = st.radio("Select Granularity:", GRANULARITIES, index=GRANULARITIES.index("Quarter"), horizontal=True)
+    if option == "Total Investment Per Quarter":
+        st.subheader(f"Total Investment Per {granularity}")
+    else:
+        st.subheader("Average Investment Amounts Over Time")
+
+    def build():
+        period = bucket_column(granularity)
+        investment_by_period = amount_by(deal_cube, [period], "sum" if option == "Total Investment Per Quarter" else "mean", date_range)
+        return px.bar(
+            investment_by_period, x=period, y="amount",
+            labels={period: granularity, "amount": "Investment ($)" if option == "Total Investment Per Quarter" else "Avg Investment ($)"},
+            text_auto=True, color="amount", color_continuous_scale="magma"
+        )
+    fig = cached_figure("home.investment_over_time", {"option": option, "granularity": granularity, "date_range": date_range}, build)
+    st.plotly_chart(fig, use_container_width=True)
 
 
-col3, col4 = st.columns([2, 1])
+@st.fragment
+def yearly_trends(deal_cube, date_range):
+    deals_per_year = deal_counts(deal_cube, ["year"], date_range, name="deal_count")
+    avg_deal_size_per_year = amount_by(deal_cube, ["year"], "mean", date_range)
+    avg_deal_size_per_year.columns = ["year", "avg_deal_size"]  # Ensure correct column name
+    avg_deal_size_per_year["avg_deal_size"] /= 1e6  # Convert to millions
+
+    col3, col4 = st.columns([2, 1])
+
+    ####### Investment by Funding Stage #######
+    with col3:
+        avg_amounts = amount_by(deal_cube, ["year", "roundType"], "sum", date_range)
+        area_chart = px.area(
+            avg_amounts,
+            x="year",
+            y="amount",
+            title="Investment Distribution by Funding Stage Over Time",
+            color="roundType",
+            labels={"amount": "Total Investment ($)", "year": "Year", "roundType": "Funding Stage"},
+            color_discrete_sequence=px.colors.sequential.Magma
+        )
+        area_chart.update_layout(font=dict(family="Courier New, monospace", size=14, color="white"))
+        st.subheader("Investment Distribution by Funding Stage Over Time")
+        st.plotly_chart(area_chart, use_container_width=True)
 
-####### Investment by Funding Stage #######
-with col3:
-    avg_amounts = filtered_deals.groupby(["year", "roundType"])["amount"].sum().reset_index()
-    area_chart = px.area(
-        avg_amounts,
-        x="year",
-        y="amount",
-        title="Investment Distribution by Funding Stage Over Time",
-        color="roundType",
-        labels={"amount": "Total Investment ($)", "year": "Year", "roundType": "Funding Stage"},
-        color_discrete_sequence=px.colors.sequential.Magma
-    )
-    area_chart.update_layout(font=dict(family="Courier New, monospace", size=14, color="white"))
-    st.subheader("Investment Distribution by Funding Stage Over Time")
-    st.plotly_chart(area_chart, use_container_width=True)
-
-####### Avg Deal Size Per Year ($M) #######
-with col4:
-    fig1 = px.line(deals_per_year, x="year", y="deal_count", markers=True, color_discrete_sequence=["#D53B70"])
-    fig1.update_layout(xaxis_title="Year", yaxis_title="Number of Deals", template="plotly_dark", width=450, height=250)
-    st.subheader("Number of Deals Per Year")
-    st.plotly_chart(fig1, use_container_width=True)
-    fig2 = px.line(avg_deal_size_per_year, x="year", y="avg_deal_size", markers=True, color_discrete_sequence=["#FAF09D"])
-    fig2.update_layout(xaxis_title="Year", yaxis_title="Avg Deal Size ($M)", template="plotly_dark", width=450, height=250)
-    st.subheader("Avg Deal Size Per Year ($M)")
-    st.plotly_chart(fig2, use_container_width=True)
+    ####### Avg Deal Size Per Year ($M) #######
+    with col4:
+        fig1 = px.line(deals_per_year, x="year", y="deal_count", markers=True, color_discrete_sequence=["#D53B70"])
+        fig1.update_layout(xaxis_title="Year", yaxis_title="Number of Deals", template="plotly_dark", width=450, height=250)
+        st.subheader("Number of Deals Per Year")
+        st.plotly_chart(fig1, use_container_width=True)
+        fig2 = px.line(avg_deal_size_per_year, x="year", y="avg_deal_size", markers=True, color_discrete_sequence=["#FAF09D"])
+        fig2.update_layout(xaxis_title="Year", yaxis_title="Avg Deal Size ($M)", template="plotly_dark", width=450, height=250)
+        st.subheader("Avg Deal Size Per Year ($M)")
+        st.plotly_chart(fig2, use_container_width=True)
 
 
+investment_over_time(deal_cube, date_range)
+yearly_trends(deal_cube, date_range)
 
 
 ####### Investment Firm Distribution Map #######
-def get_country_code(country_name):
-    try:
-        return pycountry.countries.lookup(country_name).alpha_3
-    except LookupError:
-        return None
-unique_investors = dealInvestor_df.drop_duplicates(subset=["investorId", "investorCountry"])
-investor_counts = unique_investors["investorCountry"].value_counts().reset_index()
-investor_counts.columns = ["investorCountry", "num_unique_investors"]
-investor_counts["iso_alpha"] = investor_counts["investorCountry"].apply(get_country_code)
-col1, col2 = st.columns([3, 1])
-with col1:
-    fig = px.choropleth(
-        investor_counts, locations="iso_alpha", color="num_unique_investors",
-        hover_name="investorCountry", color_continuous_scale="Magma",
-        scope="world", labels={"num_unique_investors": "Unique Investment Firms"},
-        projection="natural earth"
+@st.fragment
+def investment_firm_map(deal_facts, country_codes):
+    unique_investors = deal_facts.drop_duplicates(subset=["investorKey", "investorCountry"])
+    investor_counts = unique_investors["investorCountry"].value_counts().reset_index()
+    investor_counts.columns = ["investorCountry", "num_unique_investors"]
+    investor_counts = investor_counts[investor_counts["num_unique_investors"] > 0]
+    # ISO Alpha-3 codes come from the country table resolved at imputation time
+    investor_counts = investor_counts.merge(country_codes[["investorCountry", "alpha3"]], on="investorCountry", how="left")
+    investor_counts = investor_counts.rename(columns={"alpha3": "iso_alpha"})
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        def build_map():
+            fig = px.choropleth(
+                investor_counts, locations="iso_alpha", color="num_unique_investors",
+                hover_name="investorCountry", color_continuous_scale="Magma",
+                scope="world", labels={"num_unique_investors": "Unique Investment Firms"},
+                projection="natural earth"
+            )
+            fig.update_layout(
+                font=dict(family="Courier New, monospace", size=14, color="white"),
+                paper_bgcolor="#0e1117", plot_bgcolor="#0e1117", geo=dict(bgcolor="#0e1117"),
+                margin=dict(l=0, r=0, t=50, b=0), height=500
+            )
+            return fig
+        fig = cached_figure("home.investment_firm_map", {}, build_map)
+        st.subheader("Global Investment Firm Distribution")
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.write(investor_counts)
+
+
+investment_firm_map(deal_facts, country_codes)
+
+
+@st.fragment
+def stage_geography(deal_facts):
+    ####### "Investment Firms Per Funding Stage #######
+    st.header("Customize Top Countries")
+    top_n_countries = st.slider("Select Top Countries", 5, 50, 10)  # Adjustable slider
+
+    stage_country_counts = deal_facts.groupby(["roundType", "investorCountry"], observed=True)["investorId"].nunique().reset_index()
+    top_stage_countries = stage_country_counts.groupby("investorCountry", observed=True)["investorId"].sum().nlargest(top_n_countries).index
+    filtered_stage_country_counts = stage_country_counts[stage_country_counts["investorCountry"].isin(top_stage_countries)]
+    fig = px.bar(
+        filtered_stage_country_counts, x="roundType", y="investorId", color="investorCountry",
+        text_auto=True, labels={"roundType": "Funding Stage", "investorId": "Number of Investment Firms"},
+        color_discrete_sequence=px.colors.sequential.Magma
     )
     fig.update_layout(
-        font=dict(family="Courier New, monospace", size=14, color="white"),
-        paper_bgcolor="#0e1117", plot_bgcolor="#0e1117", geo=dict(bgcolor="#0e1117"),
-        margin=dict(l=0, r=0, t=50, b=0), height=500
+        plot_bgcolor="#0e1117", paper_bgcolor="#0e1117",
+        font=dict(color="white", family="Courier New, monospace"),
+        legend=dict(title="Country", font=dict(color="white")),
+        xaxis=dict(title="Funding Stage", tickangle=45),
+        yaxis=dict(title="Number of Investment Firms"),
+        margin=dict(l=0, r=0, t=50, b=0)
     )
-    st.subheader("Global Investment Firm Distribution")
+    st.subheader("Investment Firms Per Funding Stage")
     st.plotly_chart(fig, use_container_width=True)
-with col2:
-    st.write(investor_counts)
-
-
-
-
-####### "Investment Firms Per Funding Stage #######
-st.header("Customize Top Countries")
-top_n_countries = st.slider("Select Top Countries", 5, 50, 10)  # Adjustable slider
-
-stage_country_counts = dealInvestor_df.groupby(["roundType", "investorCountry"])["investorId"].nunique().reset_index()
-top_stage_countries = stage_country_counts.groupby("investorCountry")["investorId"].sum().nlargest(top_n_countries).index
-filtered_stage_country_counts = stage_country_counts[stage_country_counts["investorCountry"].isin(top_stage_countries)]
-fig = px.bar(
-    filtered_stage_country_counts, x="roundType", y="investorId", color="investorCountry",
-    text_auto=True, labels={"roundType": "Funding Stage", "investorId": "Number of Investment Firms"},
-    color_discrete_sequence=px.colors.sequential.Magma
-)
-fig.update_layout(
-    plot_bgcolor="#0e1117", paper_bgcolor="#0e1117",
-    font=dict(color="white", family="Courier New, monospace"),
-    legend=dict(title="Country", font=dict(color="white")),
-    xaxis=dict(title="Funding Stage", tickangle=45),
-    yaxis=dict(title="Number of Investment Firms"),
-    margin=dict(l=0, r=0, t=50, b=0)
-)
-st.subheader("Investment Firms Per Funding Stage")
-st.plotly_chart(fig, use_container_width=True)
 
+    ####### Average Deal Size by Stage & Geography #######
+    avg_deal_size = deals_per_country(deal_facts).groupby(["roundType", "investorCountry"], as_index=False, observed=True)["amount"].mean()
+    top_deal_countries = avg_deal_size.groupby("investorCountry", observed=True)["amount"].sum().nlargest(top_n_countries).index
+    filtered_avg_deal_size = avg_deal_size[avg_deal_size["investorCountry"].isin(top_deal_countries)]
+    fig = px.bar(
+        filtered_avg_deal_size,
+        x="roundType",
+        y="amount",
+        color="investorCountry",
+        text_auto=".2s",
+        labels={"roundType": "Funding Stage", "amount": "Avg Deal Size (USD)"},
+        color_discrete_sequence=px.colors.sequential.Magma
+    )
+    fig.update_layout(
+        plot_bgcolor="#0e1117",
+        paper_bgcolor="#0e1117",
+        font=dict(color="white", family="Courier New, monospace"),
+        legend=dict(title="Investor Country", font=dict(color="white")),
+        xaxis=dict(title="Funding Stage", tickangle=45),
+        yaxis=dict(title="Avg Deal Size (USD)", tickprefix="$"),
+        margin=dict(l=0, r=0, t=50, b=0)
+    )
+    st.subheader("Average Deal Size by Stage & Geography")
+    st.plotly_chart(fig, use_container_width=True)
 
-####### Average Deal Size by Stage & Geography #######
-if "dealId" not in deals_df.columns:
-    if "id" in deals_df.columns:
-        deals_df.rename(columns={"id": "dealId"}, inplace=True)
-    else:
-        st.error("Error: 'dealId' column not found in deals_df!")
-if "dealId" not in dealInvestor_df.columns:
-    if "id" in dealInvestor_df.columns:
-        dealInvestor_df.rename(columns={"id": "dealId"}, inplace=True)
-    else:
-        st.error("Error: 'dealId' column not found in dealInvestor_df!")
-deals_df = deals_df.drop_duplicates(subset="dealId")
-dealInvestor_df = dealInvestor_df.drop_duplicates(subset="dealId")
-merged_df = dealInvestor_df[["dealId", "investorCountry"]].merge(deals_df, on="dealId", how="left")
-avg_deal_size = merged_df.groupby(["roundType", "investorCountry"], as_index=False)["amount"].mean()
-top_deal_countries = avg_deal_size.groupby("investorCountry")["amount"].sum().nlargest(top_n_countries).index
-filtered_avg_deal_size = avg_deal_size[avg_deal_size["investorCountry"].isin(top_deal_countries)]
-fig = px.bar(
-    filtered_avg_deal_size,
-    x="roundType",
-    y="amount",
-    color="investorCountry",
-    text_auto=".2s",
-    labels={"roundType": "Funding Stage", "amount": "Avg Deal Size (USD)"},
-    color_discrete_sequence=px.colors.sequential.Magma
-)
-fig.update_layout(
-    plot_bgcolor="#0e1117",
-    paper_bgcolor="#0e1117",
-    font=dict(color="white", family="Courier New, monospace"),
-    legend=dict(title="Investor Country", font=dict(color="white")),
-    xaxis=dict(title="Funding Stage", tickangle=45),
-    yaxis=dict(title="Avg Deal Size (USD)", tickprefix="$"),
-    margin=dict(l=0, r=0, t=50, b=0)
-)
-st.subheader("Average Deal Size by Stage & Geography")
-st.plotly_chart(fig, use_container_width=True)
 
+stage_geography(deal_facts)
 
-col1, col2 = st.columns(2)
 
-with col1:
-    ####### Most Active ___ Investment Firms Analysis in Year ___ #######
+####### Most Active ___ Investment Firms Analysis in Year ___ #######
+@st.fragment
+def firm_activity_section(deal_facts):
     st.header("Investment Firm Activity")
     top_n = st.slider("Select Top Firms", 5, 20, 10)
     chart_type = st.radio("Choose Chart Type", [ "Pie Chart", "Bar Chart"])
-    firm_activity = dealInvestor_df.groupby(["investorName", "year"])["dealId"].nunique().reset_index()
+    firm_activity = deal_facts.groupby(["investorName", "year"], observed=True)["dealKey"].nunique().reset_index()
     firm_activity.columns = ["Investor Name", "Year", "Number of Deals"]
-    selected_year = st.selectbox("Select Year", sorted(dealInvestor_df["year"].unique(), reverse=True))
+    selected_year = st.selectbox("Select Year", sorted(deal_facts["year"].unique(), reverse=True))
     if chart_type == "Pie Chart":
         firm_activity = firm_activity[firm_activity["Year"] == selected_year]
-    top_firms = firm_activity.groupby("Investor Name")["Number of Deals"].sum().nlargest(top_n).index
+    top_firms = firm_activity.groupby("Investor Name", observed=True)["Number of Deals"].sum().nlargest(top_n).index
     filtered_firm_activity = firm_activity[firm_activity["Investor Name"].isin(top_firms)]
     if chart_type == "Bar Chart":
         fig = px.bar(
@@ -362,8 +350,11 @@ with col1:
     )
     st.subheader(f"Most Active {top_n} Firms in {str(selected_year)[:4]}")
     st.plotly_chart(fig, use_container_width=True)
-with col2:
-    sector_stage_investment = deals_df.groupby(["roundType", "primaryTag"])["amount"].sum().reset_index()
+
+
+@st.fragment
+def top_sectors_by_stage(deal_cube):
+    sector_stage_investment = amount_by(deal_cube, ["roundType", "primaryTag"])
     funding_stages = sector_stage_investment["roundType"].unique()
     selected_stage = st.selectbox("Select a Funding Stage", funding_stages)
     filtered_data = sector_stage_investment[sector_stage_investment["roundType"] == selected_stage]
@@ -382,194 +373,229 @@ with col2:
     st.plotly_chart(fig, use_container_width=True)
 
 
+col1, col2 = st.columns(2)
+with col1:
+    firm_activity_section(deal_facts)
+with col2:
+    top_sectors_by_stage(deal_cube)
+
+
 ####### Evolution of Average Deal Size by Funding Stage #######
-st.subheader("Evolution of Average Deal Size by Funding Stage")
-daily_avg_deal_size = filtered_deals.groupby(["date", "roundType"])["amount"].mean().reset_index()
-daily_avg_deal_size["amount"] = daily_avg_deal_size["amount"] / 1e6
-chart_type = st.radio("Select Chart Type:", ["Line", "Points", "Both"], horizontal=True)
-if chart_type == "Line":
-        fig1 = px.line(daily_avg_deal_size, x="date", y="amount", color="roundType", line_shape="linear",
-                    color_discrete_sequence=px.colors.sequential.Magma)
-elif chart_type == "Points":
-        fig1 = px.scatter(daily_avg_deal_size, x="date", y="amount", color="roundType",
+@st.fragment
+def deal_size_evolution(deal_cube, date_range):
+    st.subheader("Evolution of Average Deal Size by Funding Stage")
+    daily_avg_deal_size = amount_by(deal_cube, ["date", "roundType"], "mean", date_range)
+    daily_avg_deal_size["amount"] = daily_avg_deal_size["amount"] / 1e6
+    chart_type = st.radio("Select Chart Type:", ["Line", "Points", "Both"], horizontal=True)
+    sampling = st.radio("Downsampling:", list(DOWNSAMPLING_METHODS), horizontal=True)
+    daily_avg_deal_size = downsample(daily_avg_deal_size, "date", "amount", "roundType", method=DOWNSAMPLING_METHODS[sampling])
+    mode = render_mode(len(daily_avg_deal_size))
+    if chart_type == "Line":
+            fig1 = px.line(daily_avg_deal_size, x="date", y="amount", color="roundType", line_shape="linear", render_mode=mode,
+                        color_discrete_sequence=px.colors.sequential.Magma)
+    elif chart_type == "Points":
+            fig1 = px.scatter(daily_avg_deal_size, x="date", y="amount", color="roundType", render_mode=mode,
+                            color_discrete_sequence=px.colors.sequential.Magma)
+    else:
+            fig1 = px.line(daily_avg_deal_size, x="date", y="amount", color="roundType", markers=True, line_shape="linear", render_mode=mode,
                         color_discrete_sequence=px.colors.sequential.Magma)
-else:
-        fig1 = px.line(daily_avg_deal_size, x="date", y="amount", color="roundType", markers=True, line_shape="linear",
-                    color_discrete_sequence=px.colors.sequential.Magma)
-fig1.update_layout(font=dict(family="Courier New, monospace", size=14, color="white"), xaxis=dict(title="Date", tickformat="%Y-%m-%d"), legend_title_text="Funding Stage")
-st.plotly_chart(fig1, use_container_width=True)
+    fig1.update_layout(font=dict(family="Courier New, monospace", size=14, color="white"), xaxis=dict(title="Date", tickformat="%Y-%m-%d"), legend_title_text="Funding Stage")
+    st.plotly_chart(fig1, use_container_width=True)
+
+
+deal_size_evolution(deal_cube, date_range)
 
 ####### Primary Sectors Across Funding Stages #######
-col1, col2= st.columns([2, 1])  # Adjust column widths
-with col1:  # Pie chart takes up more space
-    st.subheader("Primary Sectors Across Funding Stages")
-    sector_counts = filtered_deals.groupby("roundType")["ecosystemName"].nunique().reset_index()
-    sector_counts = sector_counts.sort_values(by="ecosystemName", ascending=True)
-    fig = px.bar(sector_counts, x="ecosystemName", y="roundType", orientation="h", 
-                # title="Primary Sectors Across Funding Stages",
-                labels={"ecosystemName": "Number of Unique Sectors", "roundType": "Funding Stage"},
-                color="roundType", color_discrete_sequence=px.colors.sequential.Magma)
-    st.plotly_chart(fig, use_container_width=True)
-with col2:  # Keep the funding stages explanation separate
-    funding_df = pd.DataFrame(funding_data)
-    with st.expander("What Do Funding Stages Mean?"):
-        st.write("Each funding stage represents a company's growth and investment needs.")
-        st.dataframe(funding_df, hide_index=True)
-    
+@st.fragment
+def sectors_across_stages(deal_cube, date_range):
+    col1, col2= st.columns([2, 1])  # Adjust column widths
+    with col1:  # Pie chart takes up more space
+        st.subheader("Primary Sectors Across Funding Stages")
+        sector_counts = deal_counts(deal_cube, ["roundType", "ecosystemName"], date_range).groupby("roundType", observed=True)["ecosystemName"].nunique().reset_index()
+        sector_counts = sector_counts.sort_values(by="ecosystemName", ascending=True)
+        fig = px.bar(sector_counts, x="ecosystemName", y="roundType", orientation="h", 
+                    # title="Primary Sectors Across Funding Stages",
+                    labels={"ecosystemName": "Number of Unique Sectors", "roundType": "Funding Stage"},
+                    color="roundType", color_discrete_sequence=px.colors.sequential.Magma)
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:  # Keep the funding stages explanation separate
+        funding_df = pd.DataFrame(funding_data)
+        with st.expander("What Do Funding Stages Mean?"):
+            st.write("Each funding stage represents a company's growth and investment needs.")
+            st.dataframe(funding_df, hide_index=True)
+
+
+sectors_across_stages(deal_cube, date_range)
+
 
 ####### Ecosystem of Startup's Distribution Across Funding Stage #######
-view_type = st.radio("Choose a sector visualization:", ["Treemap", "Bar Graph"])
+@st.fragment
+def ecosystem_distribution(deal_cube, date_range):
+    view_type = st.radio("Choose a sector visualization:", ["Treemap", "Bar Graph"])
+
+    def build():
+        sector_distribution = deal_counts(deal_cube, ["roundType", "ecosystemName"], date_range)
+        if view_type == "Treemap":
+            return px.treemap(sector_distribution, path=["roundType", "ecosystemName"], values="count",
+                            # title="Primary Ecosystem Distribution Across Funding Stages",
+                            labels={"roundType": "Funding Stage", "count": "Number of Deals", "ecosystemName": "Primary Ecosystem"},
+                            color="count", color_continuous_scale="magma")
+        return px.bar(sector_distribution, x="roundType", y="count", color="ecosystemName", 
+                    # title="Primary Ecosystem Distribution Across Funding Stages", labels={"roundType": "Funding Stage", "count": "Number of Deals", "ecosystemName": "Primary Ecosystem"},
+                    barmode="stack", color_discrete_sequence=px.colors.sequential.Magma)
+    fig = cached_figure("home.ecosystem_distribution", {"view_type": view_type, "date_range": date_range}, build)
+    st.subheader("Ecosystem of Startups' Distribution Across Funding Stage")
+    st.plotly_chart(fig, use_container_width=True)
 
-if view_type == "Treemap":
-    sector_distribution = filtered_deals.groupby(["roundType", "ecosystemName"]).size().reset_index(name="count")
-    fig = px.treemap(sector_distribution, path=["roundType", "ecosystemName"], values="count",
-                    # title="Primary Ecosystem Distribution Across Funding Stages",
-                    labels={"roundType": "Funding Stage", "count": "Number of Deals", "ecosystemName": "Primary Ecosystem"},
-                    color="count", color_continuous_scale="magma")
-else:
-    sector_distribution = filtered_deals.groupby(["roundType", "ecosystemName"]).size().reset_index(name="count")
-    fig = px.bar(sector_distribution, x="roundType", y="count", color="ecosystemName", 
-                # title="Primary Ecosystem Distribution Across Funding Stages", labels={"roundType": "Funding Stage", "count": "Number of Deals", "ecosystemName": "Primary Ecosystem"},
-                barmode="stack", color_discrete_sequence=px.colors.sequential.Magma)
-st.subheader("Ecosystem of Startups' Distribution Across Funding Stage")
-st.plotly_chart(fig, use_container_width=True)
 
+ecosystem_distribution(deal_cube, date_range)
 
 
+####### Sector vs. Region Investment Heatmap #######
+# The top-N sliders and the heatmap metric also drive the sector and region charts below the
+# sector distribution, so they stay outside the fragments: changing one reruns the page.
+num_categories = st.slider("Select Number of Top Sectors:", min_value=1, max_value=50, value=10, step=1, key="num_sectors")
+num_regions = st.slider("Select Number of Top Regions:", min_value=1, max_value=20, value=5, step=1, key="num_regions")
 
+heatmap_metric = st.radio("Choose Heatmap Metric:", ["Number of Deals", "Total Investment"], key="heatmap_metric")
 
 
+def sector_region_data(deal_cube, date_range, num_categories, num_regions, heatmap_metric):
+    """The heatmap metric for the top sectors x top regions, with its value column, axis label and colorbar title."""
+    top_regions = (
+        amount_by(deal_cube, ["headquarters"], "sum", date_range)
+        .sort_values(by="amount", ascending=False)
+        .head(num_regions)["headquarters"]
+        .tolist()
+    )
 
+    top_sectors = (
+        amount_by(deal_cube, ["primaryTag"], "sum", date_range)
+        .sort_values(by="amount", ascending=False)
+        .head(num_categories)["primaryTag"]
+        .tolist()
+    )
 
+    if heatmap_metric == "Number of Deals":
+        heatmap_data = deal_counts(deal_cube, ["primaryTag", "headquarters"], date_range)
+        z_label = "Number of Deals"
+        colorbar_title = "Total Deals"
+        heatmap_z = "count"
+    else:
+        heatmap_data = amount_by(deal_cube, ["primaryTag", "headquarters"], "sum", date_range)
+        z_label = "Total Investment ($)"
+        colorbar_title = "Total Investment ($)"
+        heatmap_z = "amount"
+    heatmap_data = heatmap_data[
+        (heatmap_data["primaryTag"].isin(top_sectors)) & 
+        (heatmap_data["headquarters"].isin(top_regions))
+    ]
+    return heatmap_data, heatmap_z, z_label, colorbar_title
+
+
+def sector_region_heatmap(deal_cube, date_range, num_categories, num_regions, heatmap_metric):
+    def build_heatmap():
+        heatmap_data, heatmap_z, z_label, colorbar_title = sector_region_data(deal_cube, date_range, num_categories, num_regions, heatmap_metric)
+        fig1 = px.density_heatmap(
+            heatmap_data,
+            x="headquarters",
+            y="primaryTag",
+            z=heatmap_z,
+            color_continuous_scale="magma",
+            labels={"headquarters": "Region", "primaryTag": "Sector", heatmap_z: z_label},
+        )
+        fig1.update_layout(
+            coloraxis_colorbar=dict(
+                title=colorbar_title,
+                tickformat="$.0s" if heatmap_metric == "Total Investment" else ""
+            )
+        )
+        return fig1
+    heatmap_params = {"num_categories": num_categories, "num_regions": num_regions, "heatmap_metric": heatmap_metric, "date_range": date_range}
+    fig1 = cached_figure("home.sector_region_heatmap", heatmap_params, build_heatmap)
+    st.subheader(f"{heatmap_metric} Distribution: Sectors vs. Regions")
+    st.plotly_chart(fig1, use_container_width=True)
 
 
+sector_region_heatmap(deal_cube, date_range, num_categories, num_regions, heatmap_metric)
 
 
-num_categories = st.slider("Select Number of Top Sectors:", min_value=1, max_value=50, value=10, step=1, key="num_sectors")
-num_regions = st.slider("Select Number of Top Regions:", min_value=1, max_value=20, value=5, step=1, key="num_regions")
+####### Sector Distribution Across Companies & by Number of Deals #######
+@st.fragment
+def sector_distribution(deal_cube, date_range):
+    col1, col2 = st.columns(2) 
 
-heatmap_metric = st.radio("Choose Heatmap Metric:", ["Number of Deals", "Total Investment"], key="heatmap_metric")
+    with col1: 
+        ####### Sector Distribution Across Companies #######
+        st.subheader("Sector Distribution Across Companies")
+        company_distribution = (
+            deal_counts(deal_cube, ["primaryTag"], date_range).sort_values(by="count", ascending=False)
+        )
+        fig2 = px.pie(
+            company_distribution,
+            names="primaryTag",
+            values="count",
+            labels={"primaryTag": "Sector", "count": "Number of Companies"},
+            hole=0.4,
+            color_discrete_sequence=px.colors.sequential.Magma
+        )
+        fig2.update_traces(textinfo="none", hovertemplate="<b>%{label}</b><br>Number of Companies: %{value}<br>Percentage: %{percent}")
+        st.plotly_chart(fig2, use_container_width=True)
 
-top_regions = (
-    filtered_deals.groupby("headquarters")["amount"]
-    .sum()
-    .reset_index()
-    .sort_values(by="amount", ascending=False)
-    .head(num_regions)["headquarters"]
-    .tolist()
-)
+    with col2:
+        ####### Distribution of Sectors by Number of Deals #######
+        st.subheader("Distribution of Sectors by Number of Deals")
+        view_type = st.radio("Choose a sector visualization:", ["Treemap", "Bar Chart"], key="view_type")
 
-top_sectors = (
-    filtered_deals.groupby("primaryTag")["amount"]
-    .sum()
-    .reset_index()
-    .sort_values(by="amount", ascending=False)
-    .head(num_categories)["primaryTag"]
-    .tolist()
-)
+        def build():
+            sector_dist = (
+                deal_counts(deal_cube, ["primaryTag"], date_range).sort_values(by="count", ascending=False)
+            )
+            if view_type == "Treemap":
+                return px.treemap(sector_dist, path=["primaryTag"], values="count", labels={"primaryTag": "Sector", "count": "Number of Deals"}, color="count", color_continuous_scale="magma")
+            return px.bar(sector_dist, x="count", y="primaryTag", orientation="h", labels={"primaryTag": "Sector", "count": "Number of Deals"}, color="count", color_continuous_scale="magma")
+        fig3 = cached_figure("home.sector_dist", {"view_type": view_type, "date_range": date_range}, build)
+
+        st.plotly_chart(fig3, use_container_width=True)
 
-####### Sector vs. Region Investment Heatmap #######
-filtered_sector_region = filtered_deals[
-    (filtered_deals["primaryTag"].isin(top_sectors)) & 
-    (filtered_deals["headquarters"].isin(top_regions))
-]
-if heatmap_metric == "Number of Deals":
-    heatmap_data = (
-        filtered_sector_region.groupby(["primaryTag", "headquarters"])
-        .size()
-        .reset_index(name="count")
-    )
-    z_label = "Number of Deals"
-    colorbar_title = "Total Deals"
-    heatmap_z = "count"
-else:
-    heatmap_data = (
-        filtered_sector_region.groupby(["primaryTag", "headquarters"])["amount"]
-        .sum()
-        .reset_index()
-    )
-    z_label = "Total Investment ($)"
-    colorbar_title = "Total Investment ($)"
-    heatmap_z = "amount"
-fig1 = px.density_heatmap(
-    heatmap_data,
-    x="headquarters",
-    y="primaryTag",
-    z=heatmap_z,
-    color_continuous_scale="magma",
-    labels={"headquarters": "Region", "primaryTag": "Sector", heatmap_z: z_label},
-)
-fig1.update_layout(
-    coloraxis_colorbar=dict(
-        title=colorbar_title,
-        tickformat="$.0s" if heatmap_metric == "Total Investment" else ""
-    )
-)
-st.subheader(f"{heatmap_metric} Distribution: Sectors vs. Regions")
-st.plotly_chart(fig1, use_container_width=True)
 
+sector_distribution(deal_cube, date_range)
 
 
-col1, col2 = st.columns(2) 
+####### Investment by Sector & Region #######
+@st.fragment
+def sector_region_investment(deal_cube, date_range, num_categories, num_regions, heatmap_metric):
+    investment_type = st.radio("Select Investment Type:", ["Total Investment", "Average Investment"], key="investment_type")
 
-with col1: 
-    ####### Sector Distribution Across Companies #######
-    st.subheader("Sector Distribution Across Companies")
-    company_distribution = (
-        filtered_deals.groupby("primaryTag").size().reset_index(name="count").sort_values(by="count", ascending=False)
+    ####### Investment by Sector #######
+    st.subheader(f"{investment_type} of Top {num_categories} Sectors")
+    fig4 = px.bar(
+        amount_by(deal_cube, ["primaryTag"], "sum", date_range).nlargest(num_categories, "amount"),
+        x="primaryTag",
+        y="amount",
+        text_auto=True,
+        labels={"primaryTag": "Investment Category", "amount": "Total Investment ($)"},
+        color="amount",
+        color_continuous_scale="magma"
     )
-    fig2 = px.pie(
-        company_distribution,
-        names="primaryTag",
-        values="count",
-        labels={"primaryTag": "Sector", "count": "Number of Companies"},
-        hole=0.4,
+    fig4.update_layout(xaxis_tickangle=-45)
+    st.plotly_chart(fig4, use_container_width=True)
+
+    ####### Total Investment of Top ____ Regions #######
+    heatmap_data, heatmap_z, z_label, _ = sector_region_data(deal_cube, date_range, num_categories, num_regions, heatmap_metric)
+    st.subheader(f"{investment_type} of Top {num_regions} Regions")
+    fig5 = px.bar(
+        heatmap_data,
+        x="headquarters",
+        y=heatmap_z,
+        color="primaryTag",
+        labels={"headquarters": "Region", heatmap_z: z_label, "primaryTag": "Sector"},
+        barmode="stack",
         color_discrete_sequence=px.colors.sequential.Magma
     )
-    fig2.update_traces(textinfo="none", hovertemplate="<b>%{label}</b><br>Number of Companies: %{value}<br>Percentage: %{percent}")
-    st.plotly_chart(fig2, use_container_width=True)
+    st.plotly_chart(fig5, use_container_width=True)
 
-with col2:
-    ####### Distribution of Sectors by Number of Deals #######
-    st.subheader("Distribution of Sectors by Number of Deals")
-    sector_dist = (
-        filtered_deals.groupby("primaryTag").size().reset_index(name="count").sort_values(by="count", ascending=False)
-    )
-    view_type = st.radio("Choose a sector visualization:", ["Treemap", "Bar Chart"], key="view_type")
 
-    if view_type == "Treemap":
-        fig3 = px.treemap(sector_dist, path=["primaryTag"], values="count", labels={"primaryTag": "Sector", "count": "Number of Deals"}, color="count", color_continuous_scale="magma")
-    else:
-        fig3 = px.bar(sector_dist, x="count", y="primaryTag", orientation="h", labels={"primaryTag": "Sector", "count": "Number of Deals"}, color="count", color_continuous_scale="magma")
-
-    st.plotly_chart(fig3, use_container_width=True)
-
-investment_type = st.radio("Select Investment Type:", ["Total Investment", "Average Investment"], key="investment_type")
-
-####### Investment by Sector #######
-st.subheader(f"{investment_type} of Top {num_categories} Sectors")
-fig4 = px.bar(
-    filtered_deals.groupby("primaryTag")[["amount"]].sum().reset_index().nlargest(num_categories, "amount"),
-    x="primaryTag",
-    y="amount",
-    text_auto=True,
-    labels={"primaryTag": "Investment Category", "amount": "Total Investment ($)"},
-    color="amount",
-    color_continuous_scale="magma"
-)
-fig4.update_layout(xaxis_tickangle=-45)
-st.plotly_chart(fig4, use_container_width=True)
-
-####### Total Investment of Top ____ Regions #######
-st.subheader(f"{investment_type} of Top {num_regions} Regions")
-fig5 = px.bar(
-    heatmap_data,
-    x="headquarters",
-    y=heatmap_z,
-    color="primaryTag",
-    labels={"headquarters": "Region", heatmap_z: z_label, "primaryTag": "Sector"},
-    barmode="stack",
-    color_discrete_sequence=px.colors.sequential.Magma
-)
-st.plotly_chart(fig5, use_container_width=True)
+sector_region_investment(deal_cube, date_range, num_categories, num_regions, heatmap_metric)
 
+show_cache_stats()
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import ArpackNoConvergence, eigsh
+from data_loader import load_deals, load_deal_investor_index
+
+# Investor co-investment network for the Co-Investment Network page.
+# The deals' CSR investor index (see processing/deal_investors.py) is already a deals x investors
+# incidence matrix; its rows for the selected years and round types, transposed, are the sparse
+# investors x deals matrix B (rows are the index's investor ids, which also index its `names`).
+# B @ B.T is the co-investment matrix: entry (a, b) is the number of deals investors a and b were
+# both on, and its diagonal is each investor's deal count. Top co-investors, syndicate clusters
+# and centrality are read off that matrix with sparse operations and scipy.sparse.csgraph /
+# scipy.sparse.linalg, so the work grows with the number of co-investments rather than firms².
+
+# Investors named in a syndicate's `members` label; the rest are counted
+SYNDICATE_MEMBERS_SHOWN = 10
+# Year range / round type selections whose co-investment matrix is kept in memory
+CO_INVESTMENT_CACHE_ENTRIES = 8
+
+
+def incidence(index, deals, years=None, round_types=None):
+    """Investors x deals incidence matrix of the `deals` in `years` (inclusive range) and `round_types`.
+
+    `index` is the deals' DealInvestors index, row for row; a repeated dealId counts once.
+    """
+    mask = ~deals["dealId"].duplicated().to_numpy()
+    if years is not None:
+        mask &= deals["year"].between(*years).to_numpy()
+    if round_types is not None:
+        mask &= deals["roundType"].isin(round_types).to_numpy()
+    return index.matrix()[mask].T.astype("int32")
+
+
+def co_investment(matrix):
+    """Investors x investors shared-deal counts (CSR, zero diagonal) and each investor's deal count."""
+    shared = (matrix @ matrix.T).tocsr()
+    deals = shared.diagonal()
+    shared.setdiag(0)
+    shared.eliminate_zeros()
+    return shared, deals
+
+
+def top_pairs(shared, names, n=20):
+    """The `n` investor pairs with the most deals together."""
+    upper = sparse.triu(shared, k=1).tocoo()
+    top = np.argsort(-upper.data, kind="stable")[:n]
+    return pd.DataFrame({
+        "investor": names[upper.row[top]],
+        "coInvestor": names[upper.col[top]],
+        "sharedDeals": upper.data[top],
+    })
+
+
+def top_co_investors(shared, names, investor, n=10):
+    """The `n` investors that shared the most deals with `investor` (an investorKey)."""
+    start, end = shared.indptr[investor], shared.indptr[investor + 1]
+    partners, counts = shared.indices[start:end], shared.data[start:end]
+    top = np.argsort(-counts, kind="stable")[:n]
+    return pd.DataFrame({"coInvestor": names[partners[top]], "sharedDeals": counts[top]})
+
+
+def centrality(shared, deals, names):
+    """Centrality of every investor with a deal, most central first.
+
+    `coInvestors` is the number of distinct partners (degree), `sharedDeals` the deals shared with
+    them (weighted degree), and `eigenvector` the leading eigenvector of the co-investment matrix,
+    scaled to a maximum of 1: an investor scores high for co-investing with investors that do.
+    """
+    active = np.flatnonzero(deals > 0)
+    graph = shared[active][:, active].astype("float64")
+    eigenvector = np.zeros(len(active))
+    if graph.nnz and len(active) > 2:
+        try:
+            _, vectors = eigsh(graph, k=1, which="LA")
+            eigenvector = np.abs(vectors[:, 0])
+            eigenvector /= eigenvector.max()
+        except ArpackNoConvergence:
+            pass
+    ranking = pd.DataFrame({
+        "investor": names[active],
+        "deals": deals[active],
+        "coInvestors": np.diff(graph.indptr),
+        "sharedDeals": np.asarray(graph.sum(axis=1)).ravel().astype("int64"),
+        "eigenvector": eigenvector,
+    })
+    return ranking.sort_values(["eigenvector", "sharedDeals"], ascending=False, ignore_index=True)
+
+
+def member_list(members, shown):
+    """The first `shown` of `members` joined with ", ", followed by how many were left out."""
+    label = ", ".join(members.iloc[:shown])
+    return f"{label} and {len(members) - shown} more" if len(members) > shown else label
+
+
+def syndicates(shared, deals, names, min_shared=2, members_shown=SYNDICATE_MEMBERS_SHOWN):
+    """Groups of investors connected by ties of at least `min_shared` deals together, largest first.
+
+    Each group is a connected component of the graph keeping only those ties; `members` names
+    the group's first `members_shown` investors by deal count and counts the others.
+    """
+    strong = shared.multiply(shared >= min_shared).tocsr()
+    tied = np.flatnonzero(np.diff(strong.indptr) > 0)
+    if not len(tied):
+        return pd.DataFrame(columns=["syndicate", "investors", "sharedDeals", "members"])
+    _, labels = connected_components(strong[tied][:, tied], directed=False)
+    ties = sparse.triu(strong[tied][:, tied], k=1).tocoo()
+    groups = pd.DataFrame({"label": labels, "investor": names[tied], "deals": deals[tied]})
+    groups = groups.sort_values(["label", "deals"], ascending=[True, False])
+    table = groups.groupby("label").agg(investors=("investor", "size"), members=("investor", lambda members: member_list(members, members_shown)))
+    table["sharedDeals"] = np.bincount(labels[ties.row], weights=ties.data, minlength=len(table)).astype("int64")
+    table = table.sort_values(["investors", "sharedDeals"], ascending=False, ignore_index=True)
+    table.insert(0, "syndicate", np.arange(1, len(table) + 1))
+    return table[["syndicate", "investors", "sharedDeals", "members"]]
+
+
+@st.cache_resource(max_entries=CO_INVESTMENT_CACHE_ENTRIES)
+def load_co_investment(years, round_types):
+    """(shared-deal matrix, deal counts, investor names) for the given year range and round types (tuples)."""
+    index = load_deal_investor_index(years=None)
+    shared, deals = co_investment(incidence(index, load_deals(years=None), years, list(round_types)))
+    return shared, deals, index.names
@@ -0,0 +1,69 @@
+import pandas as pd
+import streamlit as st
+from data_loader import load_deals
+from time_buckets import add_buckets
+
+# Pre-aggregated deal cube for the dashboard charts.
+# One row per day x roundType x primaryTag x headquarters x ecosystemName holding the sum,
+# count, min and max of `amount` (plus the raw number of deals), with a week / month / quarter /
+# year bucket column per row. Charts roll up from the cube instead of grouping the raw deal
+# rows on every widget interaction.
+
+DIMENSIONS = ["roundType", "primaryTag", "headquarters", "ecosystemName"]
+MEASURES = ["sum", "count", "deals", "min", "max"]
+
+
+def build_cube(deals):
+    """Aggregate deal rows into the day-level cube."""
+    df = deals.assign(date=deals["date"].dt.normalize())
+    cube = (
+        df.groupby(["date"] + DIMENSIONS, dropna=False, observed=True)["amount"]
+        .agg(sum="sum", count="count", deals="size", min="min", max="max")
+        .reset_index()
+        .sort_values("date", kind="stable")
+        .reset_index(drop=True)
+    )
+    cube["year"] = cube["date"].dt.year.astype("int16")
+    return add_buckets(cube)
+
+
+def slice_dates(cube, date_range=None):
+    """Rows with `date_range[0] <= date <= date_range[1]`; the cube is date-sorted, so this is two binary searches."""
+    if date_range is None:
+        return cube
+    start, end = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
+    lo = cube["date"].searchsorted(start, side="left")
+    hi = cube["date"].searchsorted(end, side="right")
+    return cube.iloc[lo:hi]
+
+
+def rollup(cube, by, date_range=None):
+    """Roll the cube up to the `by` columns, returning sum, count, deals, mean, min and max of amount."""
+    out = (
+        slice_dates(cube, date_range)
+        .groupby(by, observed=True)
+        .agg(sum=("sum", "sum"), count=("count", "sum"), deals=("deals", "sum"), min=("min", "min"), max=("max", "max"))
+        .reset_index()
+    )
+    out["mean"] = out["sum"] / out["count"]
+    return out
+
+
+def amount_by(cube, by, stat="sum", date_range=None):
+    """`groupby(by)["amount"].<stat>()` equivalent served from the cube."""
+    out = rollup(cube, by, date_range)
+    return out[by + [stat]].rename(columns={stat: "amount"})
+
+
+def deal_counts(cube, by, date_range=None, name="count"):
+    """`groupby(by).size()` equivalent served from the cube."""
+    out = rollup(cube, by, date_range)
+    return out[by + ["deals"]].rename(columns={"deals": name})
+
+
+@st.cache_resource
+def load_cube(positive_only=False):
+    deals = load_deals()
+    if positive_only:
+        deals = deals[deals["amount"] > 0]
+    return build_cube(deals)
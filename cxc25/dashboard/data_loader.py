@@ -0,0 +1,139 @@
+import os
+import sys
+import pandas as pd
+import streamlit as st
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "processing"))
+from categories import encode_categories
+from deal_investors import DEAL_INVESTOR_COLUMNS, DealInvestors
+from schema import read_csv
+
+# Shared data access for Home.py and every page under dashboard/pages.
+# The CSVs are validated once against processing/schema.py into a typed Parquet snapshot (`year` derived),
+# and the frames are handed out through st.cache_resource so every page and every
+# session shares the same objects instead of re-reading and deep-copying them.
+# String dimensions are dictionary-encoded (see processing/categories.py), so group them with observed=True.
+# The deals' comma-separated `investors` / `leadInvestors` are parsed into a CSR investor index
+# (see processing/deal_investors.py) saved next to the deals snapshot and dropped from the frame.
+# Frames returned from here are shared: treat them as read-only and copy before mutating.
+
+DATA_DIR = "data"
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshot")
+DEAL_INVESTORS_PATH = os.path.join(SNAPSHOT_DIR, "deal_investors.npz")
+COUNTRY_CODES_PATH = os.path.join(DATA_DIR, "country_codes.csv")
+DASHBOARD_YEARS = (2019, 2024)
+
+SOURCES = {
+    "deals": "deals_typed.csv",  # written by processing/imputation.py (round types inferred)
+    "dealInvestor": "dealInvestor_updated.csv",
+    "companies": "companies_updated.csv",
+    "investors": "investors_updated.csv",
+}
+
+
+def _prepare_deals(df):
+    df = df.drop(columns=["ecosystemSecondary"], errors="ignore")
+    df = df.rename(columns={"id": "dealId"})
+    df = df.dropna(subset=["date"])
+    df["year"] = df["date"].dt.year.astype("int16")
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def _prepare_deal_investors(df):
+    df = df.drop(columns=["Unnamed: 0"], errors="ignore")
+    df = df.dropna(subset=["date"])
+    df["year"] = df["date"].dt.year.astype("int16")
+    return df.reset_index(drop=True)
+
+
+def _prepare_companies(df):
+    return df
+
+
+def _prepare_investors(df):
+    return df
+
+
+PREPARERS = {
+    "deals": _prepare_deals,
+    "dealInvestor": _prepare_deal_investors,
+    "companies": _prepare_companies,
+    "investors": _prepare_investors,
+}
+
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name}.parquet")
+
+
+def build_snapshot(name, force=False):
+    """Write the typed Parquet snapshot for one source CSV if it is missing or stale."""
+    csv_path = os.path.join(DATA_DIR, SOURCES[name])
+    parquet_path = snapshot_path(name)
+    outputs = [parquet_path, DEAL_INVESTORS_PATH] if name == "deals" else [parquet_path]
+    if not force and all(os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path) for path in outputs):
+        return parquet_path
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    df = read_csv(csv_path, name, rejects_dir=os.path.join(DATA_DIR, "rejects"))
+    df = PREPARERS[name](df)
+    if name == "deals":
+        DealInvestors.from_deals(df, id_column="dealId").save(DEAL_INVESTORS_PATH)
+        df = df.drop(columns=DEAL_INVESTOR_COLUMNS)
+    encode_categories(df).to_parquet(parquet_path, index=False)
+    return parquet_path
+
+
+def snapshot_version():
+    """Modification time of every snapshot file and the country codes; changes whenever one is rebuilt."""
+    entries = list(os.scandir(SNAPSHOT_DIR)) if os.path.isdir(SNAPSHOT_DIR) else []
+    versions = [(entry.name, entry.stat().st_mtime_ns) for entry in entries if entry.is_file()]
+    if os.path.exists(COUNTRY_CODES_PATH):
+        versions.append((COUNTRY_CODES_PATH, os.stat(COUNTRY_CODES_PATH).st_mtime_ns))
+    return tuple(sorted(versions))
+
+
+def read_snapshot(name):
+    return pd.read_parquet(build_snapshot(name))
+
+
+def _in_window(df, years):
+    if years is None:
+        return df
+    return df[df["year"].between(*years)].reset_index(drop=True)
+
+
+@st.cache_resource
+def load_deals(years=DASHBOARD_YEARS):
+    return _in_window(read_snapshot("deals"), years)
+
+
+@st.cache_resource
+def load_deal_investor_index(years=DASHBOARD_YEARS):
+    """Investors of each deal from load_deals(years), row for row, as a DealInvestors index."""
+    build_snapshot("deals")
+    index = DealInvestors.load(DEAL_INVESTORS_PATH)
+    return index.take(index.rows(load_deals(years=years)["dealId"]))
+
+
+@st.cache_resource
+def load_deal_investors(years=DASHBOARD_YEARS):
+    return _in_window(read_snapshot("dealInvestor"), years)
+
+
+@st.cache_resource
+def load_companies():
+    return read_snapshot("companies")
+
+
+@st.cache_resource
+def load_investors():
+    return read_snapshot("investors")
+
+
+@st.cache_resource
+def load_country_codes():
+    """ISO codes per investor country, as resolved by processing/imputation.py (built here only if missing)."""
+    if not os.path.exists(COUNTRY_CODES_PATH):
+        from countries import build_country_table, save_country_table  # pulls in pycountry
+        save_country_table(build_country_table(read_snapshot("dealInvestor")["investorCountry"], read_snapshot("investors")["country"]))
+    return pd.read_csv(COUNTRY_CODES_PATH, keep_default_na=False, na_values=[""])
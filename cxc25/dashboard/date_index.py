@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from data_loader import load_deals
+
+# Date-sorted index over the deals for the sidebar date slider.
+# Range selection is two binary searches; total investment and deal count come from
+# prefix sums, and largest / smallest deal from a blocked sparse table, so the headline
+# metrics cost O(log n) per slider move instead of two boolean masks and a rescan.
+
+BLOCK_SIZE = 256
+
+
+class RangeExtrema:
+    """Range min/max over a fixed array: sparse tables over block extrema plus a scan of the partial blocks."""
+
+    def __init__(self, values, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.low = np.where(np.isnan(values), np.inf, values)
+        self.high = np.where(np.isnan(values), -np.inf, values)
+        n_blocks = -(-len(values) // block_size)
+        pad = n_blocks * block_size - len(values)
+        block_min = np.pad(self.low, (0, pad), constant_values=np.inf).reshape(n_blocks, block_size).min(axis=1)
+        block_max = np.pad(self.high, (0, pad), constant_values=-np.inf).reshape(n_blocks, block_size).max(axis=1)
+        self.min_table = self._sparse_table(block_min, np.minimum)
+        self.max_table = self._sparse_table(block_max, np.maximum)
+
+    @staticmethod
+    def _sparse_table(values, combine):
+        table = [values]
+        span = 1
+        while 2 * span <= len(values):
+            prev = table[-1]
+            table.append(combine(prev[:-span], prev[span:]))
+            span *= 2
+        return table
+
+    @staticmethod
+    def _query_table(table, lo, hi, combine):
+        level = int(hi - lo).bit_length() - 1
+        return combine(table[level][lo], table[level][hi - (1 << level)])
+
+    def query(self, lo, hi):
+        """Return (min, max) over positions [lo, hi), NaN for an empty or all-missing range."""
+        if hi <= lo:
+            return np.nan, np.nan
+        first_block = -(-lo // self.block_size)
+        last_block = hi // self.block_size
+        if first_block >= last_block:
+            low, high = self.low[lo:hi].min(), self.high[lo:hi].max()
+        else:
+            head, tail = slice(lo, first_block * self.block_size), slice(last_block * self.block_size, hi)
+            low = min(
+                self._query_table(self.min_table, first_block, last_block, np.minimum),
+                self.low[head].min(initial=np.inf), self.low[tail].min(initial=np.inf),
+            )
+            high = max(
+                self._query_table(self.max_table, first_block, last_block, np.maximum),
+                self.high[head].max(initial=-np.inf), self.high[tail].max(initial=-np.inf),
+            )
+        return (low if np.isfinite(low) else np.nan), (high if np.isfinite(high) else np.nan)
+
+
+class DateIndex:
+    """Binary-search date range selection with prefix sums over a date-sorted deals frame."""
+
+    def __init__(self, deals):
+        if not deals["date"].is_monotonic_increasing:
+            deals = deals.sort_values("date", kind="stable").reset_index(drop=True)
+        self.dates = deals["date"].to_numpy(dtype="datetime64[ns]")
+        amounts = deals["amount"].to_numpy(dtype="float64")
+        self.amount_cumsum = np.concatenate([[0.0], np.cumsum(np.nan_to_num(amounts))])
+        self.extrema = RangeExtrema(amounts)
+
+    def bounds(self, date_range):
+        start, end = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
+        lo = int(np.searchsorted(self.dates, start.to_datetime64(), side="left"))
+        hi = int(np.searchsorted(self.dates, end.to_datetime64(), side="right"))
+        return lo, max(lo, hi)
+
+    def metrics(self, date_range):
+        """Return total investment, deal count, largest and smallest deal for the range."""
+        lo, hi = self.bounds(date_range)
+        smallest, largest = self.extrema.query(lo, hi)
+        return self.amount_cumsum[hi] - self.amount_cumsum[lo], hi - lo, largest, smallest
+
+
+@st.cache_resource
+def load_date_index():
+    return DateIndex(load_deals())
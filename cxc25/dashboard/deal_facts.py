@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from data_loader import load_deals, load_deal_investors, DASHBOARD_YEARS
+
+# Deal x investor fact table for the investor charts.
+# One row per (deal, investor) pair with dense int32 keys (dealKey is the deal's position in the
+# deduplicated, date-sorted deal frame; investorKey indexes the sorted investor ids) and the deal
+# attributes the charts need (amount, roundType, year) joined on once. Every co-investor of a deal
+# keeps its row, so per-country aggregates should count a deal once per country, not once per investor.
+
+DEAL_ATTRIBUTES = ["date", "year", "roundType", "amount"]
+INVESTOR_ATTRIBUTES = ["investorName", "investorCountry", "leadInvestorFlag"]
+
+
+def build_deal_facts(deals, deal_investors):
+    """Join the deal-investor links to their deals by position instead of a per-rerun merge."""
+    deals = deals.drop_duplicates(subset="dealId").reset_index(drop=True)
+    links = deal_investors.drop_duplicates(subset=["dealId", "investorId"])
+    deal_key = pd.Index(deals["dealId"]).get_indexer(links["dealId"])
+    # Links whose deal is outside the loaded window (or missing) have no deal row to join to
+    matched = deal_key >= 0
+    links, deal_key = links[matched], deal_key[matched]
+    investor_key, _ = pd.factorize(links["investorId"], sort=True)
+    facts = pd.DataFrame({
+        "dealKey": deal_key.astype("int32"),
+        "investorKey": investor_key.astype("int32"),
+        "dealId": deals["dealId"].to_numpy()[deal_key],
+        "investorId": links["investorId"].to_numpy(),
+    })
+    for col in INVESTOR_ATTRIBUTES:
+        facts[col] = links[col].array
+    for col in DEAL_ATTRIBUTES:
+        facts[col] = deals[col].take(deal_key).array
+    order = np.lexsort((facts["investorKey"].to_numpy(), facts["dealKey"].to_numpy()))
+    return facts.iloc[order].reset_index(drop=True)
+
+
+def deals_per_country(facts):
+    """One row per (deal, investorCountry): a deal counts once for each country that invested in it."""
+    return facts.drop_duplicates(subset=["dealKey", "investorCountry"])
+
+
+@st.cache_resource
+def load_deal_facts(years=DASHBOARD_YEARS):
+    return build_deal_facts(load_deals(years=years), load_deal_investors(years=None))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+# Server-side downsampling for long per-day time series.
+# Each series is reduced to roughly one point per horizontal pixel before it is sent to the
+# browser, either with Largest-Triangle-Three-Buckets (keeps the visual shape) or with
+# per-bucket min/max (keeps every spike). Anything still above WEBGL_THRESHOLD points is
+# drawn with scattergl instead of SVG.
+
+CHART_WIDTH_PX = 1200
+WEBGL_THRESHOLD = 1000
+METHODS = {"LTTB": "lttb", "Min/Max": "minmax", "Off": None}
+
+
+def lttb_indices(x, y, n_out):
+    """Positions of the points Largest-Triangle-Three-Buckets keeps when reducing (x, y) to `n_out` points."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """Positions of the min and max of `y` in each of n_out // 2 equal-width buckets, in order."""
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+    buckets = np.arange(n) * n_buckets // n
+    frame = pd.DataFrame({"bucket": buckets, "y": np.asarray(y, dtype="float64")})
+    grouped = frame.groupby("bucket")["y"]
+    return np.unique(np.concatenate([grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy()]))
+
+
+def downsample(df, x, y, group=None, max_points=CHART_WIDTH_PX, method="lttb"):
+    """Reduce every `group` series of `df` (sorted by `x`) to at most `max_points` points."""
+    if method is None:
+        return df
+    df = df.dropna(subset=[y])
+    groups = df.groupby(group, observed=True, sort=False) if group else [(None, df)]
+    parts = []
+    for _, series in groups:
+        series = series.sort_values(x)
+        if method == "lttb":
+            keep = lttb_indices(series[x].to_numpy(dtype="int64") if np.issubdtype(series[x].dtype, np.datetime64) else series[x].to_numpy(), series[y].to_numpy(), max_points)
+        else:
+            keep = minmax_indices(series[y].to_numpy(), max_points)
+        parts.append(series.iloc[keep])
+    if not parts:
+        return df
+    return pd.concat(parts, ignore_index=True)
+
+
+def render_mode(n_points):
+    """Plotly Express render_mode for a chart with `n_points` points."""
+    return "webgl" if n_points > WEBGL_THRESHOLD else "svg"
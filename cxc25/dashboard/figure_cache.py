@@ -0,0 +1,107 @@
+import datetime
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+import plotly.io as pio
+import streamlit as st
+from data_loader import snapshot_version
+
+# Process-wide LRU cache of rendered Plotly figures.
+# Figures are stored as their JSON, keyed by a chart id plus the normalized filter parameters
+# that produced them, so toggling back to a view someone already looked at skips both the
+# pandas work and the Plotly Express build. The cache is bounded by total JSON size.
+# Chart ids are prefixed by their page ("home.", "sectoral.", ...), and cached_figure adds the
+# data snapshot's version to the key, so figures of a rebuilt snapshot are never served.
+# Pages that use it end with show_cache_stats(), which reports the hit/miss counts in the sidebar.
+
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def normalize_params(params):
+    """Turn filter parameters into a canonical JSON string (dates as ISO strings, sequences as lists, sorted keys)."""
+    def normalize(value):
+        if isinstance(value, dict):
+            return {str(k): normalize(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return [normalize(v) for v in value]
+        if isinstance(value, (set, frozenset)):
+            return sorted(normalize(v) for v in value)
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+    return json.dumps(normalize(params), sort_keys=True, default=str)
+
+
+class FigureCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get_or_build(self, chart_id, params, build, version=None):
+        """Return the figure for (chart_id, params, version), calling `build()` and caching its JSON on a miss."""
+        key = (chart_id, version, normalize_params(params))
+        with self.lock:
+            fig_json = self.entries.get(key)
+            if fig_json is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+        if fig_json is None:
+            fig_json = build().to_json()
+            with self.lock:
+                self.misses += 1
+                self._put(key, fig_json)
+        return pio.from_json(fig_json, skip_invalid=True)
+
+    def _put(self, key, fig_json):
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        if len(fig_json) > self.max_bytes:
+            return
+        self.entries[key] = fig_json
+        self.size += len(fig_json)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+
+def cached_figure(chart_id, params, build):
+    return get_figure_cache().get_or_build(chart_id, params, build, snapshot_version())
+
+
+def show_cache_stats():
+    """Hit / miss statistics of the figure cache, in a collapsed sidebar expander."""
+    stats = get_figure_cache().stats()
+    with st.sidebar.expander("Figure Cache"):
+        st.write(f"{stats['entries']} figures ({stats['bytes'] / 1e6:.1f} MB), {stats['evictions']} evicted")
+        st.write(f"{stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
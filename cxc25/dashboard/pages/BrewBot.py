@@ -1,10 +1,8 @@
 import streamlit as st
 import google.generativeai as genai
 import os
-import pandas as pd
 from dotenv import load_dotenv
-from PyPDF2 import PdfReader
-import docx
+from data_loader import load_deals, load_deal_investors, load_investors
 
 load_dotenv()
 gemini_api_key = os.getenv("GEMINI_API")
@@ -30,37 +28,23 @@ st.markdown("""
 
 st.sidebar.image("dashboard/images/bb.png", use_container_width=True)  # 🔥 Replace with your logo path
 
-@st.cache_data
-def load_data():
-    deals_df = pd.read_csv("data/deals_updated.csv")
-    deal_investors_df = pd.read_csv("data/dealInvestor_updated.csv")
-    investors_df = pd.read_csv("data/investors_updated.csv")
-
-    # Strip spaces from column names
-    deals_df.columns = deals_df.columns.str.strip()
-    deal_investors_df.columns = deal_investors_df.columns.str.strip()
-    investors_df.columns = investors_df.columns.str.strip()
-
-    # Convert amounts to numeric and filter out invalid data
-    deals_df["amount"] = pd.to_numeric(deals_df["amount"], errors="coerce")
-    deals_df = deals_df[deals_df["amount"] > 0]
-
-    return deals_df, deal_investors_df, investors_df
-
-deals_df, deal_investors_df, investors_df = load_data()
+deals_df = load_deals(years=None)
+deals_df = deals_df[deals_df["amount"] > 0]
+deal_investors_df = load_deal_investors(years=None)
+investors_df = load_investors()
 
 def get_top_sectors():
-    sector_data = deals_df.groupby("primaryTag")["amount"].sum().reset_index()
+    sector_data = deals_df.groupby("primaryTag", observed=True)["amount"].sum().reset_index()
     sector_data = sector_data.sort_values(by="amount", ascending=False).head(5)
     return sector_data.to_string(index=False)
 
 def get_top_regions():
-    region_data = deals_df.groupby("headquarters")["amount"].sum().reset_index()
+    region_data = deals_df.groupby("headquarters", observed=True)["amount"].sum().reset_index()
     region_data = region_data.sort_values(by="amount", ascending=False).head(5)
     return region_data.to_string(index=False)
 
 def get_active_investors():
-    investor_data = deal_investors_df.groupby("investorName")["dealId"].count().reset_index()
+    investor_data = deal_investors_df.groupby("investorName", observed=True)["dealId"].count().reset_index()
     investor_data = investor_data.sort_values(by="dealId", ascending=False).head(5)
     return investor_data.to_string(index=False)
 
@@ -0,0 +1,159 @@
+import streamlit as st
+import numpy as np
+import plotly.express as px
+from data_loader import load_deals
+from coinvestment import load_co_investment, top_pairs, top_co_investors, centrality, syndicates
+
+# Page Configuration
+st.set_page_config(page_title="Co-Investment Network", page_icon="dashboard/images/ib.png", layout="wide")
+
+# Dark Theme Styling
+st.markdown("""
+    <style>
+            header { visibility: hidden; }
+    div[data-testid="stToolbar"] { display: none !important; }
+    html, body, .stApp { 
+        font-family: "Courier New", monospace !important; 
+        color: white !important; 
+    }
+    
+    .stSidebar, .stMetric, .stRadio, .stTextInput, .stButton, .stMarkdown { 
+        font-family: "Courier New", monospace !important; 
+        font-size: 16px; 
+        color: white; 
+    }
+
+    div[data-testid="stMetric"] {
+        font-size: 22px !important;
+        font-weight: bold;
+        text-align: center;
+        background-color: #1E1E2F !important; 
+        border-radius: 10px;
+        padding: 20px;
+        color: white !important;
+    }
+
+    div[data-testid="stMetricLabel"] {
+        font-size: 16px !important;
+        font-family: "Courier New", monospace !important;
+        color: white !important;
+    }    
+
+    h1, h2, h3, h4, h5, h6 { 
+        font-family: "Courier New", monospace !important; 
+    }
+
+    .custom-title { 
+        text-align: center; 
+        font-family: "Courier New", monospace !important; 
+        font-size: 22px !important; 
+        font-weight: bold; 
+        color: white !important; 
+    }
+    </style>
+""", unsafe_allow_html=True)
+
+
+deals_df = load_deals(years=None)
+
+
+def style_figure(fig, height=500):
+    fig.update_layout(
+        plot_bgcolor="#0e1117", paper_bgcolor="#0e1117",
+        font=dict(color="white", family="Courier New, monospace"),
+        margin=dict(l=0, r=0, t=50, b=0), height=height
+    )
+    return fig
+
+
+# Sidebar Filters
+st.sidebar.title("Co-Investment Network")
+st.sidebar.write("---")
+all_years = sorted(deals_df["year"].dropna().unique())
+selected_years = st.sidebar.select_slider("Select Years", options=all_years, value=(all_years[0], all_years[-1])) if all_years else None
+all_round_types = sorted(deals_df["roundType"].dropna().unique())
+selected_round_types = st.sidebar.multiselect("Select Funding Stages", all_round_types, default=all_round_types)
+top_n = st.sidebar.slider("Select Top Entries", 5, 30, 10)
+min_shared = st.sidebar.slider("Minimum Shared Deals for a Syndicate Tie", 1, 10, 2)
+
+# Co-investment matrix for the selection (cached per filter combination)
+shared, deals, names = load_co_investment(
+    tuple(int(year) for year in selected_years) if selected_years else None, tuple(selected_round_types)
+)
+
+st.markdown('<p class="custom-title">Who Invests With Whom</p>', unsafe_allow_html=True)
+col1, col2, col3 = st.columns(3)
+col1.metric("Active Investment Firms", f"{int((deals > 0).sum()):,}")
+col2.metric("Co-Investing Pairs", f"{shared.nnz // 2:,}")
+col3.metric("Firms With Co-Investors", f"{int((np.diff(shared.indptr) > 0).sum()):,}")
+
+# Top Co-Investor Pairs
+pairs = top_pairs(shared, names, top_n)
+pairs["pair"] = pairs["investor"] + " & " + pairs["coInvestor"]
+fig = px.bar(
+    pairs.iloc[::-1], x="sharedDeals", y="pair", orientation="h", text_auto=True,
+    labels={"sharedDeals": "Shared Deals", "pair": "Investor Pair"},
+    color="sharedDeals", color_continuous_scale="Magma"
+)
+st.subheader(f"Top {top_n} Co-Investor Pairs")
+st.plotly_chart(style_figure(fig), use_container_width=True)
+
+# Top Co-Investors of One Firm
+active = np.flatnonzero(deals > 0)
+if len(active):
+    ranked = active[np.argsort(-deals[active], kind="stable")]
+    selected_investor = st.selectbox("Select an Investment Firm", ranked, format_func=lambda key: f"{names[key]} ({deals[key]} deals)")
+    partners = top_co_investors(shared, names, selected_investor, top_n)
+    st.subheader(f"Top Co-Investors of {names[selected_investor]}")
+    if partners.empty:
+        st.write("No co-investors for this selection.")
+    else:
+        fig = px.bar(
+            partners.iloc[::-1], x="sharedDeals", y="coInvestor", orientation="h", text_auto=True,
+            labels={"sharedDeals": "Shared Deals", "coInvestor": "Co-Investor"},
+            color_discrete_sequence=px.colors.sequential.Magma[4:]
+        )
+        st.plotly_chart(style_figure(fig, height=400), use_container_width=True)
+
+# Centrality Rankings
+ranking = centrality(shared, deals, names)
+col1, col2 = st.columns([3, 2])
+with col1:
+    fig = px.bar(
+        ranking.head(top_n).iloc[::-1], x="eigenvector", y="investor", orientation="h",
+        hover_data=["deals", "coInvestors", "sharedDeals"],
+        labels={"eigenvector": "Eigenvector Centrality", "investor": "Investment Firm"},
+        color="coInvestors", color_continuous_scale="Magma"
+    )
+    st.subheader("Most Central Investment Firms")
+    st.plotly_chart(style_figure(fig), use_container_width=True)
+with col2:
+    st.subheader("Centrality Rankings")
+    st.dataframe(
+        ranking.head(100).rename(columns={
+            "investor": "Investment Firm", "deals": "Deals", "coInvestors": "Co-Investors",
+            "sharedDeals": "Shared Deals", "eigenvector": "Eigenvector Centrality",
+        }),
+        use_container_width=True, hide_index=True
+    )
+
+# Syndicate Clusters
+clusters = syndicates(shared, deals, names, min_shared)
+st.subheader(f"Syndicates (Firms Tied by {min_shared}+ Shared Deals)")
+if clusters.empty:
+    st.write("No syndicates for this selection; try lowering the minimum shared deals.")
+else:
+    fig = px.bar(
+        clusters.head(top_n), x="syndicate", y="investors", text_auto=True,
+        hover_data=["sharedDeals"],
+        labels={"syndicate": "Syndicate", "investors": "Investment Firms"},
+        color="sharedDeals", color_continuous_scale="Magma"
+    )
+    fig.update_xaxes(type="category")
+    st.plotly_chart(style_figure(fig, height=400), use_container_width=True)
+    st.dataframe(
+        clusters.head(top_n).rename(columns={
+            "syndicate": "Syndicate", "investors": "Investment Firms", "sharedDeals": "Shared Deals", "members": "Members",
+        }),
+        use_container_width=True, hide_index=True
+    )
@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from data_loader import load_deals, load_deal_investors, load_companies, load_investors
+from cube import load_cube, amount_by, deal_counts
+from downsample import downsample, render_mode, METHODS as DOWNSAMPLING_METHODS
+from figure_cache import cached_figure, show_cache_stats
 
 # Set Page Config
 st.set_page_config(
@@ -78,66 +82,43 @@ funding_data = {
     ]
 }
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/deals_updated.csv")
-    df = df.drop(columns=["ecosystemSecondary"], errors="ignore")  
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    df["year"] = df["date"].dt.year
-    df = df[df["year"].between(2019, 2024)]
-    return df
-deals_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/dealInvestor_updated.csv")
-    df = df.dropna(subset=["date"])
-    df = df[df["year"].between(2019, 2024)]
-    return df
-dealInvestor_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/companies_updated.csv")
-    return df
-companies_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/investors_updated.csv")
-    return df
-investors_df = load_data()
+deals_df = load_deals()
+dealInvestor_df = load_deal_investors()
+companies_df = load_companies()
+investors_df = load_investors()
+deal_cube = load_cube()
 
 st.sidebar.title("Funding Stages Analysis Dashboard")
 st.sidebar.write("---")
 
 min_date, max_date = deals_df["date"].min().date(), deals_df["date"].max().date()
 date_range = st.sidebar.slider("Select Date Range:", min_date, max_date, (min_date, max_date), format="YYYY-MM-DD")
-filtered_deals = deals_df[(deals_df["date"] >= pd.to_datetime(date_range[0])) & (deals_df["date"] <= pd.to_datetime(date_range[1]))]
 
 
 col1, col2 = st.columns([2, 1])
 with col1:
     ####### Evolution of Average Deal Size by Funding Stage #######
-    daily_avg_deal_size = filtered_deals.groupby(["date", "roundType"])["amount"].mean().reset_index()
+    daily_avg_deal_size = amount_by(deal_cube, ["date", "roundType"], "mean", date_range)
     daily_avg_deal_size["amount"] = daily_avg_deal_size["amount"] / 1e6
     chart_type = st.radio("Select Chart Type:", ["Line", "Points", "Both"], horizontal=True)
+    sampling = st.radio("Downsampling:", list(DOWNSAMPLING_METHODS), horizontal=True)
+    daily_avg_deal_size = downsample(daily_avg_deal_size, "date", "amount", "roundType", method=DOWNSAMPLING_METHODS[sampling])
+    mode = render_mode(len(daily_avg_deal_size))
     if chart_type == "Line":
-        fig1 = px.line(daily_avg_deal_size, x="date", y="amount", color="roundType", line_shape="linear",
+        fig1 = px.line(daily_avg_deal_size, x="date", y="amount", color="roundType", line_shape="linear", render_mode=mode,
                     color_discrete_sequence=px.colors.sequential.Magma)
     elif chart_type == "Points":
-        fig1 = px.scatter(daily_avg_deal_size, x="date", y="amount", color="roundType",
+        fig1 = px.scatter(daily_avg_deal_size, x="date", y="amount", color="roundType", render_mode=mode,
                         color_discrete_sequence=px.colors.sequential.Magma)
     else:
-        fig1 = px.line(daily_avg_deal_size, x="date", y="amount", color="roundType", markers=True, line_shape="linear",
+        fig1 = px.line(daily_avg_deal_size, x="date", y="amount", color="roundType", markers=True, line_shape="linear", render_mode=mode,
                     color_discrete_sequence=px.colors.sequential.Magma)
     fig1.update_layout(font=dict(family="Courier New, monospace", size=14, color="white"), xaxis=dict(title="Date", tickformat="%Y-%m-%d"), legend_title_text="Funding Stage")
     st.subheader("Evolution of Average Deal Size by Funding Stage")
     st.plotly_chart(fig1, use_container_width=True)
 with col2:
     ####### Top 5 Sectors for Equity Crowdfunding #######
-    sector_stage_investment = deals_df.groupby(["roundType", "primaryTag"])["amount"].sum().reset_index()
+    sector_stage_investment = amount_by(deal_cube, ["roundType", "primaryTag"])
     funding_stages = sector_stage_investment["roundType"].unique()
     selected_stage = st.selectbox("Select a Funding Stage", funding_stages)
     filtered_data = sector_stage_investment[sector_stage_investment["roundType"] == selected_stage]
@@ -161,7 +142,7 @@ with col2:
 col1, col2= st.columns([2, 1])  # Adjust column widths
 with col1:  #
     st.subheader("Primary Sectors Across Funding Stages")
-    sector_counts = filtered_deals.groupby("roundType")["ecosystemName"].nunique().reset_index()
+    sector_counts = deal_counts(deal_cube, ["roundType", "ecosystemName"], date_range).groupby("roundType", observed=True)["ecosystemName"].nunique().reset_index()
     sector_counts = sector_counts.sort_values(by="ecosystemName", ascending=True)
     fig = px.bar(sector_counts, x="ecosystemName", y="roundType", orientation="h", 
                 # title="Primary Sectors Across Funding Stages",
@@ -178,17 +159,17 @@ with col2:
 ####### Ecosystem of Startup's Distribution Across Funding Stage #######
 view_type = st.radio("Choose a sector visualization:", ["Treemap", "Bar Graph"])
 
-if view_type == "Treemap":
-    sector_distribution = filtered_deals.groupby(["roundType", "ecosystemName"]).size().reset_index(name="count")
-    fig = px.treemap(sector_distribution, path=["roundType", "ecosystemName"], values="count",
-                    # title="Primary Ecosystem Distribution Across Funding Stages",
-                    labels={"roundType": "Funding Stage", "count": "Number of Deals", "ecosystemName": "Primary Ecosystem"},
-                    color="count", color_continuous_scale="magma")
-else:
-    sector_distribution = filtered_deals.groupby(["roundType", "ecosystemName"]).size().reset_index(name="count")
-    fig = px.bar(sector_distribution, x="roundType", y="count", color="ecosystemName", 
+def build_ecosystem_distribution():
+    sector_distribution = deal_counts(deal_cube, ["roundType", "ecosystemName"], date_range)
+    if view_type == "Treemap":
+        return px.treemap(sector_distribution, path=["roundType", "ecosystemName"], values="count",
+                        # title="Primary Ecosystem Distribution Across Funding Stages",
+                        labels={"roundType": "Funding Stage", "count": "Number of Deals", "ecosystemName": "Primary Ecosystem"},
+                        color="count", color_continuous_scale="magma")
+    return px.bar(sector_distribution, x="roundType", y="count", color="ecosystemName", 
                 # title="Primary Ecosystem Distribution Across Funding Stages", labels={"roundType": "Funding Stage", "count": "Number of Deals", "ecosystemName": "Primary Ecosystem"},
                 barmode="stack", color_discrete_sequence=px.colors.sequential.Magma)
+fig = cached_figure("funding_stages.ecosystem_distribution", {"view_type": view_type, "date_range": date_range}, build_ecosystem_distribution)
 st.subheader("Ecosystem of Startups' Distribution Across Funding Stage")
 st.plotly_chart(fig, use_container_width=True)
     
@@ -199,3 +180,4 @@ st.plotly_chart(fig, use_container_width=True)
 
 
 
+show_cache_stats()
@@ -1,6 +1,9 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from data_loader import load_deals, load_deal_investors, load_companies, load_investors
+from cube import load_cube, amount_by, deal_counts
+from date_index import load_date_index
+from time_buckets import GRANULARITIES, bucket_column
 
 # Set Page Config
 st.set_page_config(
@@ -39,36 +42,12 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/deals_updated.csv")
-    df = df.drop(columns=["ecosystemSecondary"], errors="ignore")  
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    df["year"] = df["date"].dt.year
-    df = df[df["year"].between(2019, 2024)]
-    return df
-deals_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/dealInvestor_updated.csv")
-    df = df.dropna(subset=["date"])
-    df = df[df["year"].between(2019, 2024)]
-    return df
-dealInvestor_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/companies_updated.csv")
-    return df
-companies_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/investors_updated.csv")
-    return df
-investors_df = load_data()
+deals_df = load_deals()
+dealInvestor_df = load_deal_investors()
+companies_df = load_companies()
+investors_df = load_investors()
+deal_cube = load_cube()
+deal_index = load_date_index()
 
 
 # Sidebar Navigation
@@ -78,41 +57,42 @@ st.sidebar.write("---")
 # Sidebar Filters
 min_date, max_date = deals_df["date"].min().date(), deals_df["date"].max().date()
 date_range = st.sidebar.slider("Select Date Range:", min_date, max_date, (min_date, max_date), format="YYYY-MM-DD")
-filtered_deals = deals_df[(deals_df["date"] >= pd.to_datetime(date_range[0])) & (deals_df["date"] <= pd.to_datetime(date_range[1]))]
 
 
 
 # KPI CARDS
 col1, col2, col3, col4 = st.columns(4)
-col1.metric("Total Investment ($M)", f"{filtered_deals['amount'].sum() / 1e6:.2f}M")
-col2.metric("Total Deals", f"{filtered_deals.shape[0]}")
-col3.metric("Largest Deal ($M)", f"{filtered_deals['amount'].max() / 1e6:.2f}M")
-col4.metric("Smallest Deal ($K)", f"{filtered_deals['amount'].min() / 1e3:.2f}K")
+total_investment, total_deals, largest_deal, smallest_deal = deal_index.metrics(date_range)
+col1.metric("Total Investment ($M)", f"{total_investment / 1e6:.2f}M")
+col2.metric("Total Deals", f"{total_deals}")
+col3.metric("Largest Deal ($M)", f"{largest_deal / 1e6:.2f}M")
+col4.metric("Smallest Deal ($K)", f"{smallest_deal / 1e3:.2f}K")
 
 ####### Investment Over Time #######
-option = st.radio("Choose Investment View:", ["Total Investment Per Quarter", "Average Investment Amounts Over Time"])
-filtered_deals["yearQuarter"] = filtered_deals["date"].dt.to_period("Q").astype(str).apply(lambda x: "'" + f"{x[2:4]} Q{x[-1]}")
-if option == "Total Investment Per Quarter":
-    investment_by_quarter = filtered_deals.groupby("yearQuarter")["amount"].sum().reset_index()
-    st.subheader("Total Investment Per Quarter")
+option = st.radio("Choose Investment View:", ["Total Investment", "Average Investment Amounts Over Time"])
+granularity = st.radio("Select Granularity:", GRANULARITIES, index=GRANULARITIES.index("Quarter"), horizontal=True)
+period = bucket_column(granularity)
+if option == "Total Investment":
+    investment_by_period = amount_by(deal_cube, [period], "sum", date_range)
+    st.subheader(f"Total Investment Per {granularity}")
 else:
-    investment_by_quarter = filtered_deals.groupby("yearQuarter")["amount"].mean().reset_index()
+    investment_by_period = amount_by(deal_cube, [period], "mean", date_range)
     st.subheader("Average Investment Amounts Over Time")
 fig = px.bar(
-    investment_by_quarter, x="yearQuarter", y="amount",
-    labels={"yearQuarter": "Quarter", "amount": "Investment ($)" if option == "Total Investment Per Quarter" else "Avg Investment ($)"},
+    investment_by_period, x=period, y="amount",
+    labels={period: granularity, "amount": "Investment ($)" if option == "Total Investment" else "Avg Investment ($)"},
     text_auto=True, color="amount", color_continuous_scale="magma"
 )
 st.plotly_chart(fig, use_container_width=True)
-deals_per_year = filtered_deals.groupby("year").size().reset_index(name="deal_count")
-avg_deal_size_per_year = filtered_deals.groupby("year")["amount"].mean().reset_index()
+deals_per_year = deal_counts(deal_cube, ["year"], date_range, name="deal_count")
+avg_deal_size_per_year = amount_by(deal_cube, ["year"], "mean", date_range)
 avg_deal_size_per_year.columns = ["year", "avg_deal_size"]  # Ensure correct column name
 avg_deal_size_per_year["avg_deal_size"] /= 1e6  # Convert to millions
 
 col5, col6 = st.columns(2)
 with col5:
     ####### Investment Distribution by Funding Stage Over Time #######
-    avg_amounts = filtered_deals.groupby(["year", "roundType"])["amount"].sum().reset_index()
+    avg_amounts = amount_by(deal_cube, ["year", "roundType"], "sum", date_range)
     area_chart = px.area(
         avg_amounts,
         x="year",
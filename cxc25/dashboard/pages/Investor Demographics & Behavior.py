@@ -1,7 +1,8 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import pycountry
+from data_loader import load_companies, load_investors, load_country_codes
+from deal_facts import load_deal_facts, deals_per_country
+from figure_cache import cached_figure, show_cache_stats
 
 # Page Configuration
 st.set_page_config(page_title="Investor Demographics & Behavior", page_icon="dashboard/images/ib.png", layout="wide")
@@ -58,70 +59,41 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/deals_updated.csv")
-    df = df.drop(columns=["ecosystemSecondary"], errors="ignore")  
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    df["year"] = df["date"].dt.year
-    df = df[df["year"].between(2019, 2024)]
-    return df
-deals_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/dealInvestor_updated.csv")
-    df = df.dropna(subset=["date"])
-    df = df[df["year"].between(2019, 2024)]
-    return df
-dealInvestor_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/companies_updated.csv")
-    return df
-companies_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/investors_updated.csv")
-    return df
-investors_df = load_data()
-
-
-deals_df.rename(columns={"id": "dealId"}, inplace=True)  # Standardize column names
+deal_facts = load_deal_facts()
+companies_df = load_companies()
+investors_df = load_investors()
+country_codes = load_country_codes()
+
 
 # Sidebar Navigation
 st.sidebar.title("Investor Demographics & Behavior")
 st.sidebar.write("---")
 
-# Convert country names to ISO Alpha-3 codes
-def get_country_code(country_name):
-    try:
-        return pycountry.countries.lookup(country_name).alpha_3
-    except LookupError:
-        return None
-
 # Investment Firm Distribution Map
-unique_investors = dealInvestor_df.drop_duplicates(subset=["investorId", "investorCountry"])
+unique_investors = deal_facts.drop_duplicates(subset=["investorKey", "investorCountry"])
 investor_counts = unique_investors["investorCountry"].value_counts().reset_index()
 investor_counts.columns = ["investorCountry", "num_unique_investors"]
-investor_counts["iso_alpha"] = investor_counts["investorCountry"].apply(get_country_code)
+investor_counts = investor_counts[investor_counts["num_unique_investors"] > 0]
+# ISO Alpha-3 codes come from the country table resolved at imputation time
+investor_counts = investor_counts.merge(country_codes[["investorCountry", "alpha3"]], on="investorCountry", how="left")
+investor_counts = investor_counts.rename(columns={"alpha3": "iso_alpha"})
 
 col1, col2 = st.columns([3, 1])
 with col1:
-    fig = px.choropleth(
-        investor_counts, locations="iso_alpha", color="num_unique_investors",
-        hover_name="investorCountry", color_continuous_scale="Magma",
-        scope="world", labels={"num_unique_investors": "Unique Investment Firms"},
-        projection="natural earth"
-    )
-    fig.update_layout(
-        font=dict(family="Courier New, monospace", size=14, color="white"),
-        paper_bgcolor="#0e1117", plot_bgcolor="#0e1117", geo=dict(bgcolor="#0e1117"),
-        margin=dict(l=0, r=0, t=50, b=0), height=500
-    )
+    def build_map():
+        fig = px.choropleth(
+            investor_counts, locations="iso_alpha", color="num_unique_investors",
+            hover_name="investorCountry", color_continuous_scale="Magma",
+            scope="world", labels={"num_unique_investors": "Unique Investment Firms"},
+            projection="natural earth"
+        )
+        fig.update_layout(
+            font=dict(family="Courier New, monospace", size=14, color="white"),
+            paper_bgcolor="#0e1117", plot_bgcolor="#0e1117", geo=dict(bgcolor="#0e1117"),
+            margin=dict(l=0, r=0, t=50, b=0), height=500
+        )
+        return fig
+    fig = cached_figure("investor_demographics.investment_firm_map", {}, build_map)
     st.subheader("Global Investment Firm Distribution")
     st.plotly_chart(fig, use_container_width=True)
 
@@ -133,8 +105,8 @@ st.sidebar.header("Customize Top Countries")
 top_n_countries = st.sidebar.slider("Select Top Countries", 5, 50, 10)  # Adjustable slider
 
 # Investment Firms Per Funding Stage (Filtered by Top N Countries)
-stage_country_counts = dealInvestor_df.groupby(["roundType", "investorCountry"])["investorId"].nunique().reset_index()
-top_stage_countries = stage_country_counts.groupby("investorCountry")["investorId"].sum().nlargest(top_n_countries).index
+stage_country_counts = deal_facts.groupby(["roundType", "investorCountry"], observed=True)["investorId"].nunique().reset_index()
+top_stage_countries = stage_country_counts.groupby("investorCountry", observed=True)["investorId"].sum().nlargest(top_n_countries).index
 filtered_stage_country_counts = stage_country_counts[stage_country_counts["investorCountry"].isin(top_stage_countries)]
 
 fig = px.bar(
@@ -154,12 +126,9 @@ st.subheader("Investment Firms Per Funding Stage")
 st.plotly_chart(fig, use_container_width=True)
 
 # Average Deal Size by Stage & Geography (Filtered by Top N Countries)
-deals_df = deals_df.drop_duplicates(subset="dealId")
-dealInvestor_df = dealInvestor_df.drop_duplicates(subset="dealId")
-merged_df = dealInvestor_df[["dealId", "investorCountry"]].merge(deals_df, on="dealId", how="left")
-avg_deal_size = merged_df.groupby(["roundType", "investorCountry"], as_index=False)["amount"].mean()
+avg_deal_size = deals_per_country(deal_facts).groupby(["roundType", "investorCountry"], as_index=False, observed=True)["amount"].mean()
 
-top_deal_countries = avg_deal_size.groupby("investorCountry")["amount"].sum().nlargest(top_n_countries).index
+top_deal_countries = avg_deal_size.groupby("investorCountry", observed=True)["amount"].sum().nlargest(top_n_countries).index
 filtered_avg_deal_size = avg_deal_size[avg_deal_size["investorCountry"].isin(top_deal_countries)]
 
 fig = px.bar(
@@ -183,14 +152,14 @@ st.sidebar.header("Investment Firm Activity")
 top_n = st.sidebar.slider("Select Top Firms", 5, 20, 10)
 chart_type = st.sidebar.radio("Choose Chart Type", [ "Pie Chart", "Bar Chart"])
 
-firm_activity = dealInvestor_df.groupby(["investorName", "year"])["dealId"].nunique().reset_index()
+firm_activity = deal_facts.groupby(["investorName", "year"], observed=True)["dealKey"].nunique().reset_index()
 firm_activity.columns = ["Investor Name", "Year", "Number of Deals"]
-selected_year = st.sidebar.selectbox("Select Year", sorted(dealInvestor_df["year"].unique(), reverse=True))
+selected_year = st.sidebar.selectbox("Select Year", sorted(deal_facts["year"].unique(), reverse=True))
 
 if chart_type == "Pie Chart":
     firm_activity = firm_activity[firm_activity["Year"] == selected_year]
 
-top_firms = firm_activity.groupby("Investor Name")["Number of Deals"].sum().nlargest(top_n).index
+top_firms = firm_activity.groupby("Investor Name", observed=True)["Number of Deals"].sum().nlargest(top_n).index
 filtered_firm_activity = firm_activity[firm_activity["Investor Name"].isin(top_firms)]
 
 if chart_type == "Bar Chart":
@@ -215,3 +184,5 @@ fig.update_layout(
 
 st.subheader(f"Most Active {top_n} Firms in {str(selected_year)[:4]}")
 st.plotly_chart(fig, use_container_width=True)
+
+show_cache_stats()
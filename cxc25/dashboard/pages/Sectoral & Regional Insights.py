@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from data_loader import load_deals, load_deal_investors, load_companies, load_investors
+from cube import load_cube, amount_by, deal_counts
+from figure_cache import cached_figure, show_cache_stats
 
 # Set Page Config
 st.set_page_config(
@@ -55,36 +57,12 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/deals_updated.csv")
-    df = df.drop(columns=["ecosystemSecondary"], errors="ignore")  
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"])
-    df["year"] = df["date"].dt.year
-    df = df[df["year"].between(2019, 2024)]
-    return df
-deals_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/dealInvestor_updated.csv")
-    df = df.dropna(subset=["date"])
-    df = df[df["year"].between(2019, 2024)]
-    return df
-dealInvestor_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/companies_updated.csv")
-    return df
-companies_df = load_data()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/investors_updated.csv")
-    return df
-investors_df = load_data()
+deals_df = load_deals()
+dealInvestor_df = load_deal_investors()
+companies_df = load_companies()
+investors_df = load_investors()
+# ✅ Cube is built without $0 investments
+deal_cube = load_cube(positive_only=True)
 
 # Sidebar Filters
 st.sidebar.title("Sectoral & Regional Insights Dashboard")
@@ -93,14 +71,6 @@ st.sidebar.write("---")
 min_date, max_date = deals_df["date"].min().date(), deals_df["date"].max().date()
 date_range = st.sidebar.slider("Select Date Range:", min_date, max_date, (min_date, max_date), format="YYYY-MM-DD", key="date_range")
 
-filtered_deals = deals_df[
-    (deals_df["date"] >= pd.to_datetime(date_range[0])) & 
-    (deals_df["date"] <= pd.to_datetime(date_range[1]))
-]
-
-# ✅ Remove $0 investments from filtered data
-filtered_deals = filtered_deals[filtered_deals["amount"] > 0]
-
 num_categories = st.sidebar.slider("Select Number of Top Sectors:", min_value=1, max_value=50, value=10, step=1, key="num_sectors")
 num_regions = st.sidebar.slider("Select Number of Top Regions:", min_value=1, max_value=20, value=5, step=1, key="num_regions")
 
@@ -109,69 +79,67 @@ heatmap_metric = st.sidebar.radio("Choose Heatmap Metric:", ["Number of Deals",
 
 
 
-# **Dynamically determine top regions**
-top_regions = (
-    filtered_deals.groupby("headquarters")["amount"]
-    .sum()
-    .reset_index()
-    .sort_values(by="amount", ascending=False)
-    .head(num_regions)["headquarters"]
-    .tolist()
-)
-
-top_sectors = (
-    filtered_deals.groupby("primaryTag")["amount"]
-    .sum()
-    .reset_index()
-    .sort_values(by="amount", ascending=False)
-    .head(num_categories)["primaryTag"]
-    .tolist()
-)
-
-# **Filter Data for Selected Sectors & Regions**
-filtered_sector_region = filtered_deals[
-    (filtered_deals["primaryTag"].isin(top_sectors)) & 
-    (filtered_deals["headquarters"].isin(top_regions))
-]
-
-# **Determine Heatmap Data Based on Selection**
-if heatmap_metric == "Number of Deals":
-    heatmap_data = (
-        filtered_sector_region.groupby(["primaryTag", "headquarters"])
-        .size()
-        .reset_index(name="count")
+# **Heatmap Data for the Top Sectors & Regions** (used by the heatmap and the region breakdown)
+def sector_region_data():
+    # **Dynamically determine top regions**
+    top_regions = (
+        amount_by(deal_cube, ["headquarters"], "sum", date_range)
+        .sort_values(by="amount", ascending=False)
+        .head(num_regions)["headquarters"]
+        .tolist()
     )
-    z_label = "Number of Deals"
-    colorbar_title = "Total Deals"
-    heatmap_z = "count"
-else:
-    heatmap_data = (
-        filtered_sector_region.groupby(["primaryTag", "headquarters"])["amount"]
-        .sum()
-        .reset_index()
+
+    top_sectors = (
+        amount_by(deal_cube, ["primaryTag"], "sum", date_range)
+        .sort_values(by="amount", ascending=False)
+        .head(num_categories)["primaryTag"]
+        .tolist()
     )
-    z_label = "Total Investment ($)"
-    colorbar_title = "Total Investment ($)"
-    heatmap_z = "amount"
+
+    # **Determine Heatmap Data Based on Selection**
+    if heatmap_metric == "Number of Deals":
+        heatmap_data = deal_counts(deal_cube, ["primaryTag", "headquarters"], date_range)
+        z_label = "Number of Deals"
+        colorbar_title = "Total Deals"
+        heatmap_z = "count"
+    else:
+        heatmap_data = amount_by(deal_cube, ["primaryTag", "headquarters"], "sum", date_range)
+        z_label = "Total Investment ($)"
+        colorbar_title = "Total Investment ($)"
+        heatmap_z = "amount"
+
+    # **Filter Data for Selected Sectors & Regions**
+    heatmap_data = heatmap_data[
+        (heatmap_data["primaryTag"].isin(top_sectors)) & 
+        (heatmap_data["headquarters"].isin(top_regions))
+    ]
+    return heatmap_data, heatmap_z, z_label, colorbar_title
+
 
 # **Sector vs. Region Investment Heatmap**
 st.subheader(f"{heatmap_metric} Distribution: Sectors vs. Regions")
 
-fig1 = px.density_heatmap(
-    heatmap_data,
-    x="headquarters",
-    y="primaryTag",
-    z=heatmap_z,
-    color_continuous_scale="magma",
-    labels={"headquarters": "Region", "primaryTag": "Sector", heatmap_z: z_label},
-)
+def build_heatmap():
+    heatmap_data, heatmap_z, z_label, colorbar_title = sector_region_data()
+    fig1 = px.density_heatmap(
+        heatmap_data,
+        x="headquarters",
+        y="primaryTag",
+        z=heatmap_z,
+        color_continuous_scale="magma",
+        labels={"headquarters": "Region", "primaryTag": "Sector", heatmap_z: z_label},
+    )
 
-fig1.update_layout(
-    coloraxis_colorbar=dict(
-        title=colorbar_title,
-        tickformat="$.0s" if heatmap_metric == "Total Investment" else ""
+    fig1.update_layout(
+        coloraxis_colorbar=dict(
+            title=colorbar_title,
+            tickformat="$.0s" if heatmap_metric == "Total Investment" else ""
+        )
     )
-)
+    return fig1
+
+heatmap_params = {"num_categories": num_categories, "num_regions": num_regions, "heatmap_metric": heatmap_metric, "date_range": date_range}
+fig1 = cached_figure("sectoral.sector_region_heatmap", heatmap_params, build_heatmap)
 
 st.plotly_chart(fig1, use_container_width=True)
 
@@ -181,7 +149,7 @@ col1, col2 = st.columns(2)  # Adjust column widths
 with col1: 
     st.subheader("Sector Distribution Across Companies")
     company_distribution = (
-        filtered_deals.groupby("primaryTag").size().reset_index(name="count").sort_values(by="count", ascending=False)
+        deal_counts(deal_cube, ["primaryTag"], date_range).sort_values(by="count", ascending=False)
     )
     fig2 = px.pie(
         company_distribution,
@@ -197,22 +165,23 @@ with col1:
 with col2:
     # **Sector Distribution by Deals (Treemap/Bar Chart)**
     st.subheader("Distribution of Sectors by Number of Deals")
-    sector_dist = (
-        filtered_deals.groupby("primaryTag").size().reset_index(name="count").sort_values(by="count", ascending=False)
-    )
     view_type = st.radio("Choose a sector visualization:", ["Treemap", "Bar Chart"], key="view_type")
 
-    if view_type == "Treemap":
-        fig3 = px.treemap(sector_dist, path=["primaryTag"], values="count", labels={"primaryTag": "Sector", "count": "Number of Deals"}, color="count", color_continuous_scale="magma")
-    else:
-        fig3 = px.bar(sector_dist, x="count", y="primaryTag", orientation="h", labels={"primaryTag": "Sector", "count": "Number of Deals"}, color="count", color_continuous_scale="magma")
+    def build_sector_dist():
+        sector_dist = (
+            deal_counts(deal_cube, ["primaryTag"], date_range).sort_values(by="count", ascending=False)
+        )
+        if view_type == "Treemap":
+            return px.treemap(sector_dist, path=["primaryTag"], values="count", labels={"primaryTag": "Sector", "count": "Number of Deals"}, color="count", color_continuous_scale="magma")
+        return px.bar(sector_dist, x="count", y="primaryTag", orientation="h", labels={"primaryTag": "Sector", "count": "Number of Deals"}, color="count", color_continuous_scale="magma")
+    fig3 = cached_figure("sectoral.sector_dist", {"view_type": view_type, "date_range": date_range}, build_sector_dist)
 
     st.plotly_chart(fig3, use_container_width=True)
 
 # **Investment by Sector**
 st.subheader(f"{investment_type} of Top {num_categories} Sectors")
 fig4 = px.bar(
-    filtered_deals.groupby("primaryTag")[["amount"]].sum().reset_index().nlargest(num_categories, "amount"),
+    amount_by(deal_cube, ["primaryTag"], "sum", date_range).nlargest(num_categories, "amount"),
     x="primaryTag",
     y="amount",
     text_auto=True,
@@ -225,6 +194,7 @@ st.plotly_chart(fig4, use_container_width=True)
 
 # **Stacked Bar Chart for Sector Investment Breakdown by Region**
 st.subheader(f"{investment_type} of Top {num_regions} Regions")
+heatmap_data, heatmap_z, z_label, _ = sector_region_data()
 fig5 = px.bar(
     heatmap_data,
     x="headquarters",
@@ -234,4 +204,6 @@ fig5 = px.bar(
     barmode="stack",
     color_discrete_sequence=px.colors.sequential.Magma
 )
-st.plotly_chart(fig5, use_container_width=True)
\ No newline at end of file
+st.plotly_chart(fig5, use_container_width=True)
+
+show_cache_stats()
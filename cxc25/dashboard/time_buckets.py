@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+# Vectorized time bucketing for the investment-over-time charts.
+# Each granularity gets an integer bucket key per row and a label per distinct key, stored
+# together as an ordered Categorical (codes + label table), so the labels are formatted once
+# per dataset and grouping by the bucket column keeps chronological order.
+
+GRANULARITIES = ["Week", "Month", "Quarter", "Year"]
+MONTH_NAMES = np.array(["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
+
+
+def bucket_column(granularity):
+    return f"bucket{granularity}"
+
+
+def _short_year(years):
+    return "'" + pd.Series(years % 100).astype(str).str.zfill(2).to_numpy()
+
+
+def bucket_keys(dates, granularity):
+    """Integer bucket key per date: ISO year*100+week, year*12+month, year*4+quarter or year."""
+    if granularity == "Week":
+        iso = dates.dt.isocalendar()
+        return iso["year"].to_numpy("int64") * 100 + iso["week"].to_numpy("int64")
+    years = dates.dt.year.to_numpy("int64")
+    if granularity == "Month":
+        return years * 12 + dates.dt.month.to_numpy("int64") - 1
+    if granularity == "Quarter":
+        return years * 4 + dates.dt.quarter.to_numpy("int64") - 1
+    return years
+
+
+def bucket_labels(keys, granularity):
+    """Display labels for bucket keys, e.g. "'19 W05", "'19 Jan", "'19 Q1", "2019"."""
+    if granularity == "Week":
+        return _short_year(keys // 100) + " W" + pd.Series(keys % 100).astype(str).str.zfill(2).to_numpy()
+    if granularity == "Month":
+        return _short_year(keys // 12) + " " + MONTH_NAMES[keys % 12]
+    if granularity == "Quarter":
+        return _short_year(keys // 4) + " Q" + (keys % 4 + 1).astype(str)
+    return keys.astype(str)
+
+
+def bucketize(dates, granularity):
+    """Ordered Categorical of bucket labels for `dates`; labels are built only for the distinct keys."""
+    keys = bucket_keys(dates, granularity)
+    unique_keys, codes = np.unique(keys, return_inverse=True)
+    labels = bucket_labels(unique_keys, granularity)
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def add_buckets(df, date_col="date"):
+    """Attach one bucket column per granularity to `df`."""
+    for granularity in GRANULARITIES:
+        df[bucket_column(granularity)] = bucketize(df[date_col], granularity)
+    return df
@@ -0,0 +1,63 @@
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+import pandas as pd
+
+# Persisted dictionary encoding for the low-cardinality string columns.
+# Every column listed here is stored as a pandas Categorical whose categories come from
+# data/dictionaries.json. New values are appended to the end of a column's dictionary, so
+# an existing value keeps the same integer code across pipeline runs and dashboard loads.
+# Stages running in parallel worker processes extend it under an exclusive lock on
+# data/dictionaries.json.lock, so one process's new values are never lost to another's write.
+
+DICTIONARY_PATH = "data/dictionaries.json"
+CATEGORICAL_COLUMNS = ["roundType", "primaryTag", "headquarters", "ecosystemName", "investorCountry", "investorName"]
+
+
+def load_dictionary(path=DICTIONARY_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_dictionary(dictionary, path=DICTIONARY_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(dictionary, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def dictionary_lock(path=DICTIONARY_PATH):
+    """Hold an exclusive lock on the dictionary (blocking until other processes release it)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def encode_categories(df, columns=CATEGORICAL_COLUMNS, path=DICTIONARY_PATH):
+    """Convert `columns` of `df` to Categoricals backed by the persisted dictionary, extending it with unseen values."""
+    with dictionary_lock(path):
+        dictionary = load_dictionary(path)
+        changed = False
+        for col in columns:
+            if col not in df.columns:
+                continue
+            values = df[col].astype(object)
+            known = dictionary.get(col, [])
+            new_values = sorted(set(values.dropna().unique()) - set(known))
+            if new_values:
+                known = known + new_values
+                dictionary[col] = known
+                changed = True
+            df[col] = pd.Categorical(values, categories=known)
+        if changed:
+            save_dictionary(dictionary, path)
+    return df
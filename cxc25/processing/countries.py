@@ -0,0 +1,87 @@
+import os
+import pandas as pd
+import pycountry
+
+# Resolves each distinct investor country name to ISO codes once, at imputation time.
+# The result is persisted as data/country_codes.csv so the dashboard can join on it instead
+# of calling pycountry per row at render time. Names that cannot be resolved are written to
+# data/country_codes_unresolved.csv for review.
+
+COUNTRY_CODES_PATH = "data/country_codes.csv"
+UNRESOLVED_PATH = "data/country_codes_unresolved.csv"
+
+# Common spellings pycountry.lookup does not know, or resolves ambiguously with search_fuzzy
+COUNTRY_ALIASES = {
+    "uk": "GB",
+    "u.k.": "GB",
+    "great britain": "GB",
+    "britain": "GB",
+    "england": "GB",
+    "scotland": "GB",
+    "wales": "GB",
+    "northern ireland": "GB",
+    "us": "US",
+    "u.s.": "US",
+    "u.s.a.": "US",
+    "united states of america": "US",
+    "america": "US",
+    "uae": "AE",
+    "korea": "KR",
+    "republic of korea": "KR",
+    "north korea": "KP",
+    "turkey": "TR",
+    "ivory coast": "CI",
+    "russia": "RU",
+    "the netherlands": "NL",
+    "holland": "NL",
+    "macedonia": "MK",
+    "czechia": "CZ",
+    "swaziland": "SZ",
+    "burma": "MM",
+    "cape verde": "CV",
+    "vatican": "VA",
+    "palestine": "PS",
+    "laos": "LA",
+    "syria": "SY",
+    "moldova": "MD",
+    "tanzania": "TZ",
+    "venezuela": "VE",
+}
+
+
+def resolve_country(name):
+    """Return (alpha_2, alpha_3, official short name, method) for a country name, with None codes if unresolved."""
+    key = str(name).strip()
+    alias = COUNTRY_ALIASES.get(key.lower())
+    if alias:
+        country = pycountry.countries.get(alpha_2=alias)
+        return country.alpha_2, country.alpha_3, country.name, "alias"
+    try:
+        country = pycountry.countries.lookup(key)
+        return country.alpha_2, country.alpha_3, country.name, "exact"
+    except LookupError:
+        pass
+    try:
+        matches = pycountry.countries.search_fuzzy(key)
+    except LookupError:
+        matches = []
+    # search_fuzzy ranks loosely (e.g. "UK" -> Uganda first), so only trust an unambiguous hit
+    if len(matches) == 1:
+        return matches[0].alpha_2, matches[0].alpha_3, matches[0].name, "fuzzy"
+    return None, None, None, "unresolved"
+
+
+def build_country_table(*name_series):
+    """Resolve every distinct country name across `name_series` into one lookup table."""
+    names = pd.concat([pd.Series(s, dtype=object) for s in name_series]).dropna().astype(str).str.strip()
+    names = sorted(set(names[names != ""]))
+    rows = [(name, *resolve_country(name)) for name in names]
+    return pd.DataFrame(rows, columns=["investorCountry", "alpha2", "alpha3", "countryName", "method"])
+
+
+def save_country_table(table, path=COUNTRY_CODES_PATH, unresolved_path=UNRESOLVED_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    table.to_csv(path, index=False)
+    unresolved = table[table["method"] == "unresolved"]
+    unresolved[["investorCountry"]].to_csv(unresolved_path, index=False)
+    return unresolved
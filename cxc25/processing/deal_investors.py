@@ -0,0 +1,93 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# The deals' `investors` and `leadInvestors` columns as a compressed sparse row (CSR) index.
+# Both columns hold ", "-separated investor names. They are split once, when the deals are
+# ingested, into integer investor ids: the investors of deal row i are
+# values[offsets[i]:offsets[i + 1]], with a parallel `lead` flag (a lead investor missing from
+# `investors` is added). Ids index `names`, the sorted standardized (stripped, lowercased) names,
+# which match investorName elsewhere in the pipeline. matrix() turns the offsets / values
+# straight into a sparse incidence matrix, so no consumer needs to split strings.
+
+DEAL_INVESTOR_COLUMNS = ["investors", "leadInvestors"]
+
+
+def standardize_names(names):
+    return names.str.strip().str.lower()
+
+
+def explode_list(values):
+    """One row per item of ", "-separated strings, stripped; the index repeats the source row's label.
+
+    Only a comma followed by a space separates items, so a name such as "Smith,Jones LLP" stays whole.
+    """
+    items = values.astype("string").str.split(", ").explode().str.strip()
+    return items[items.notna() & (items != "")]
+
+
+class DealInvestors:
+    def __init__(self, deal_ids, offsets, values, lead, names):
+        self.deal_ids = np.asarray(deal_ids, dtype="int64")
+        self.offsets = np.asarray(offsets, dtype="int64")
+        self.values = np.asarray(values, dtype="int32")
+        self.lead = np.asarray(lead, dtype=bool)
+        self.names = np.asarray(names, dtype=str)
+
+    @classmethod
+    def from_deals(cls, deals, id_column="id"):
+        """Index of the investors named on each row of `deals`, row for row."""
+        deals = deals.reset_index(drop=True)
+        links = []
+        for col in DEAL_INVESTOR_COLUMNS:
+            names = standardize_names(explode_list(deals[col]))
+            links.append(pd.DataFrame({"deal": names.index.to_numpy(), "name": names.to_numpy(dtype=str), "lead": col == "leadInvestors"}))
+        links = pd.concat(links).groupby(["deal", "name"], sort=True)["lead"].any().reset_index()
+        names, values = np.unique(links["name"].to_numpy(dtype=str), return_inverse=True)
+        offsets = np.searchsorted(links["deal"].to_numpy(), np.arange(len(deals) + 1))
+        deal_ids = deals[id_column].astype("Int64").to_numpy(dtype="int64", na_value=-1)
+        return cls(deal_ids, offsets, values, links["lead"].to_numpy(), names)
+
+    def __len__(self):
+        return len(self.deal_ids)
+
+    def deal_rows(self):
+        """Deal row of every entry of `values`."""
+        return np.repeat(np.arange(len(self), dtype="int64"), np.diff(self.offsets))
+
+    def rows(self, deal_ids):
+        """Rows of the given deal ids (the first row of an id that repeats); KeyError if one is not in the index."""
+        deal_ids = np.asarray(deal_ids, dtype="int64")
+        first = np.flatnonzero(~pd.Index(self.deal_ids).duplicated())
+        rows = pd.Index(self.deal_ids[first]).get_indexer(deal_ids)
+        if (rows < 0).any():
+            raise KeyError(f"deal ids not in the index: {deal_ids[rows < 0][:5].tolist()}")
+        return first[rows]
+
+    def take(self, rows):
+        """Index of just the deals at `rows`, in that order (investor ids are unchanged)."""
+        rows = np.asarray(rows, dtype="int64")
+        if len(rows) and (rows.min() < 0 or rows.max() >= len(self)):
+            raise IndexError(f"deal rows out of range for an index of {len(self)} deals")
+        sizes = np.diff(self.offsets)[rows]
+        starts = np.repeat(self.offsets[rows] - np.r_[0, np.cumsum(sizes)[:-1]], sizes) + np.arange(sizes.sum())
+        return DealInvestors(self.deal_ids[rows], np.r_[0, np.cumsum(sizes)], self.values[starts], self.lead[starts], self.names)
+
+    def matrix(self, lead_only=False):
+        """Deals x investors incidence matrix (CSR, one per link) over every deal or only lead roles."""
+        data = self.lead.astype("int8") if lead_only else np.ones(len(self.values), dtype="int8")
+        matrix = sparse.csr_matrix((data, self.values, self.offsets), shape=(len(self), len(self.names)))
+        matrix.eliminate_zeros()
+        return matrix
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, deal_ids=self.deal_ids, offsets=self.offsets, values=self.values, lead=self.lead, names=self.names)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls(arrays["deal_ids"], arrays["offsets"], arrays["values"], arrays["lead"], arrays["names"])
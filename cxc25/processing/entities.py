@@ -0,0 +1,207 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+# Canonical-name index for fuzzy matching of investor and company names.
+# Names are normalized (accents folded, punctuation dropped, trailing legal suffixes such as
+# "Inc." removed) and split into character trigrams weighted by rarity (IDF), so a shared
+# "capital" or "technologies" counts for little. Names are blocked on their rarest trigrams and
+# only names in a shared block are compared, by multiplying the sparse names x trigrams matrix
+# by its transpose, so the work grows with the number of candidate pairs rather than n² (see
+# candidate_pairs). Pairs whose cosine similarity reaches SIMILARITY_THRESHOLD (and whose
+# numbers agree, so "Fund II" stays apart from "Fund III") are linked, and each group of linked
+# names gets one entityId (see cluster_names).
+# The index is persisted as a name -> entityId table; join on entityId instead of on names.
+# extend_entity_table adds the names of a new export to a saved table without renumbering it.
+
+ENTITIES_DIR = "data/entities"
+LEGAL_SUFFIXES = [
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "llc", "llp",
+    "lp", "plc", "gmbh", "sa", "sas", "bv", "ag", "ulc",
+]
+SIMILARITY_THRESHOLD = 0.8
+# Trigrams held by more than MAX_BLOCK_SIZE names are not used for blocking; candidate pairs are
+# generated for CHUNK_ROWS names at a time
+MAX_BLOCK_SIZE = 1000
+CHUNK_ROWS = 5000
+_SUFFIX_PATTERN = rf"(?:\s+(?:{'|'.join(LEGAL_SUFFIXES)}))+$"
+
+
+def normalize_names(names):
+    """Comparable form of each name: ASCII, lowercase, alphanumeric words, no trailing legal suffix."""
+    text = pd.Series(names, dtype="string")
+    text = text.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii").astype("string")
+    text = text.str.lower().str.replace("&", " and ", regex=False)
+    text = text.str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+    stripped = text.str.replace(_SUFFIX_PATTERN, "", regex=True)
+    return stripped.mask(stripped == "", text)
+
+
+def trigram_matrix(normalized):
+    """Names x trigrams matrix (CSR) of IDF weights for an array of normalized names, rows scaled to unit length."""
+    padded = [f" {name} " for name in normalized]
+    rows = np.repeat(np.arange(len(padded)), [max(len(name) - 2, 0) for name in padded])
+    grams = [name[i:i + 3] for name in padded for i in range(len(name) - 2)]
+    cols, _ = pd.factorize(pd.Series(grams, dtype=object))
+    matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(padded), cols.max(initial=-1) + 1))
+    matrix.data[:] = 1  # duplicate trigrams within a name are summed on construction
+    frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    matrix.data = np.log((1 + len(padded)) / frequency[matrix.indices])
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return sparse.diags(1 / np.where(norms > 0, norms, 1)) @ matrix
+
+
+def _prefix_matrix(grams, threshold):
+    """Each name's prefix (see candidate_pairs) as a binary names x trigrams matrix."""
+    grams = grams.tocsr()
+    sizes = np.diff(grams.indptr)
+    rows = np.repeat(np.arange(grams.shape[0]), sizes)
+    frequency = np.bincount(grams.indices, minlength=grams.shape[1])
+    order = np.lexsort((grams.indices, frequency[grams.indices], rows))
+    # Squared weight of each name's trigrams before this one, rarest first
+    squared = grams.data[order] ** 2
+    before = np.cumsum(squared) - squared
+    before -= np.repeat(np.r_[0, np.cumsum(np.add.reduceat(squared, grams.indptr[:-1][sizes > 0]))][:-1], sizes[sizes > 0])
+    kept = order[1 - before >= threshold ** 2 - 1e-9]
+    return sparse.csr_matrix((np.ones(len(kept), dtype=np.float32), (rows[kept], grams.indices[kept])), shape=grams.shape)
+
+
+def candidate_pairs(grams, threshold=SIMILARITY_THRESHOLD, max_block_size=MAX_BLOCK_SIZE, chunk_rows=CHUNK_ROWS, first=0):
+    """Yield (i, j) index arrays, i < j, of names that can reach `threshold`, found by prefix blocking.
+
+    Every name's trigrams are ordered rarest first. If two names' cosine similarity reaches
+    `threshold`, the first trigram they share is in both names' "prefix": the leading trigrams
+    up to the point where the remaining ones weigh less than `threshold` (they could not reach
+    it on their own). So each name is only indexed under its prefix, and only names with a
+    prefix trigram in common are compared. Blocks larger than `max_block_size` are skipped to
+    bound the work on very common trigrams. Pairs are produced `chunk_rows` names at a time.
+    With `first`, only pairs involving a name from row `first` on are produced.
+    """
+    prefixes = _prefix_matrix(grams, threshold)
+    block_sizes = np.asarray(prefixes.sum(axis=0)).ravel()
+    prefixes = prefixes[:, np.flatnonzero(block_sizes <= max_block_size)].tocsr()
+    prefixes_t = prefixes.T.tocsc()
+    for start in range(first, grams.shape[0], chunk_rows):
+        shared = (prefixes[start:start + chunk_rows] @ prefixes_t).tocoo()
+        i, j = shared.row + start, shared.col
+        keep = (j > i) | (j < first)
+        yield np.minimum(i, j)[keep], np.maximum(i, j)[keep]
+
+
+def _numbers(normalized):
+    """Numbers and roman numerals in each name, which must agree for two names to match."""
+    return pd.Series(normalized, dtype="string").str.findall(r"\b(?:\d+|[ivx]{1,4})\b").str.join(" ").to_numpy()
+
+
+def match_pairs(grams, numbers, threshold=SIMILARITY_THRESHOLD, max_block_size=MAX_BLOCK_SIZE, first=0):
+    """(i, j) index arrays of names whose trigram vectors reach `threshold` and whose `numbers` agree."""
+    matched_i, matched_j = [], []
+    for i, j in candidate_pairs(grams, threshold, max_block_size, first=first):
+        keep = numbers[i] == numbers[j]
+        i, j = i[keep], j[keep]
+        similarity = np.asarray(grams[i].multiply(grams[j]).sum(axis=1)).ravel()
+        matched_i.append(i[similarity >= threshold])
+        matched_j.append(j[similarity >= threshold])
+    return np.concatenate(matched_i or [np.array([], dtype=int)]), np.concatenate(matched_j or [np.array([], dtype=int)])
+
+
+def cluster_names(normalized, threshold=SIMILARITY_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+    """Entity number for each of the distinct `normalized` names.
+
+    Matched names are grouped into connected components, and each group is then cut down to its
+    best-connected name plus the names that match that name directly, so chains of pairwise
+    matches (A ~ B ~ C) cannot pull dissimilar names into one entity.
+    """
+    grams = trigram_matrix(normalized)
+    numbers = _numbers(normalized)
+    i, j = match_pairs(grams, numbers, threshold, max_block_size)
+    return _cut_clusters(grams, numbers, i, j, threshold)
+
+
+def _cut_clusters(grams, numbers, i, j, threshold):
+    """Entity number for each row of `grams` from its matched pairs (i, j), as described in cluster_names."""
+    n = grams.shape[0]
+    links = sparse.coo_matrix((np.ones(len(i), dtype=np.int8), (i, j)), shape=(n, n))
+    _, components = connected_components(links, directed=False)
+    degree = np.bincount(np.r_[i, j], minlength=n)
+    order = np.lexsort((-degree, components))
+    first = order[np.r_[True, components[order][1:] != components[order][:-1]]] if n else order
+    centers = np.empty(components.max(initial=-1) + 1, dtype=int)
+    centers[components[first]] = first
+    center = centers[components]
+    similarity = np.asarray(grams.multiply(grams[center]).sum(axis=1)).ravel()
+    keep = (similarity >= threshold) & (numbers == numbers[center])
+    return np.unique(np.where(keep, center, np.arange(n)), return_inverse=True)[1]
+
+
+def _distinct_names(name_series):
+    names = pd.concat([pd.Series(s, dtype="string") for s in name_series]).dropna().str.strip()
+    return names[names != ""].drop_duplicates().sort_values().reset_index(drop=True)
+
+
+def build_entity_table(*name_series, threshold=SIMILARITY_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+    """name -> normalized name -> entityId table for every distinct name in `name_series`."""
+    names = _distinct_names(name_series)
+    table = pd.DataFrame({"name": names, "normalized": normalize_names(names)})
+    normalized, norm_ids = np.unique(table["normalized"].to_numpy(dtype=str), return_inverse=True)
+    table["entityId"] = cluster_names(normalized, threshold, max_block_size)[norm_ids].astype("int64")
+    return table
+
+
+def extend_entity_table(table, *name_series, threshold=SIMILARITY_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+    """`table` plus the names in `name_series` it does not have yet; existing entityIds are kept.
+
+    A new name whose normalized form is already in the table joins that entity. The others are
+    only compared with each other and with the table's names (see candidate_pairs): each joins the
+    entity of its most similar known name, and the rest are grouped among themselves as in
+    cluster_names, under entityIds numbered after the existing ones.
+    """
+    names = _distinct_names(name_series)
+    names = names[~names.isin(table["name"])].reset_index(drop=True)
+    added = pd.DataFrame({"name": names, "normalized": normalize_names(names)})
+    known_ids = table.drop_duplicates("normalized").set_index("normalized")["entityId"]
+    entity = added["normalized"].map(known_ids).astype("Int64")
+    known = known_ids.index.to_numpy(dtype=str)
+    unknown, unknown_ids = np.unique(added.loc[entity.isna(), "normalized"].to_numpy(dtype=str), return_inverse=True)
+    if len(unknown):
+        normalized = np.r_[known, unknown]
+        grams = trigram_matrix(normalized)
+        numbers = _numbers(normalized)
+        i, j = match_pairs(grams, numbers, threshold, max_block_size, first=len(known))
+        # Pairs are ordered i < j, so a known name is always i; keep each new name's closest one
+        to_known = i < len(known)
+        similarity = np.asarray(grams[i[to_known]].multiply(grams[j[to_known]]).sum(axis=1)).ravel()
+        best = pd.DataFrame({"known": i[to_known], "new": j[to_known] - len(known), "similarity": similarity})
+        best = best.sort_values("similarity", ascending=False).drop_duplicates("new")
+        ids = np.full(len(unknown), -1, dtype="int64")
+        ids[best["new"].to_numpy()] = known_ids.to_numpy()[best["known"].to_numpy()]
+        rest = np.flatnonzero(ids < 0)
+        among = ~to_known & np.isin(i - len(known), rest) & np.isin(j - len(known), rest)
+        position = np.full(len(unknown), -1)
+        position[rest] = np.arange(len(rest))
+        clusters = _cut_clusters(
+            grams[len(known) + rest], numbers[len(known) + rest],
+            position[i[among] - len(known)], position[j[among] - len(known)], threshold,
+        )
+        ids[rest] = table["entityId"].to_numpy().max(initial=-1) + 1 + clusters
+        entity[entity.isna()] = ids[unknown_ids]
+    added["entityId"] = entity.astype("int64")
+    return pd.concat([table, added], ignore_index=True).sort_values("name", ignore_index=True)
+
+
+def save_entity_table(table, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    table.to_csv(path, index=False)
+
+
+def load_entity_table(path):
+    return pd.read_csv(path, dtype={"name": str, "normalized": str}, keep_default_na=False)
+
+
+def entity_ids(table, names):
+    """entityId for each of `names` by its normalized form (Int64, missing where it is not in `table`)."""
+    ids = table.drop_duplicates("normalized").set_index("normalized")["entityId"]
+    normalized = normalize_names(names)
+    return pd.Series(ids.reindex(normalized.to_numpy()).to_numpy(), index=normalized.index).astype("Int64")
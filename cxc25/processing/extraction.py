@@ -0,0 +1,98 @@
+import asyncio
+import json
+import re
+
+# Batched founding-date extraction with a pluggable model backend.
+# Several companies' scraped snippets are packed into one prompt as a JSON list, and the model
+# is asked for a JSON object mapping each company id to its date. Batches are sent concurrently
+# (at most MAX_IN_FLIGHT at a time). A backend is any object with generate(prompt) -> str;
+# StubBackend answers deterministically from the snippets so the pipeline can run offline.
+
+BATCH_SIZE = 10
+MAX_IN_FLIGHT = 4
+NOT_FOUND = "Not Found"
+AI_FAILURE = "Error: AI Failure"
+COMPANIES_MARKER = "Companies:\n"
+DATE_PATTERN = re.compile(r"\b((?:19|20)\d{2})(?:-(\d{2})-(\d{2}))?\b")
+
+PROMPT = (
+    "For each company below, extract its founding date from its sources. Return only a JSON object "
+    "mapping each company id to the date in YYYY-MM-DD format, 'YYYY' if only the year is found, "
+    f"or '{NOT_FOUND}'.\n"
+)
+
+
+class GeminiBackend:
+    def __init__(self, model_name="gemini-pro"):
+        import google.generativeai as genai
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        response = self.model.generate_content(prompt)
+        return response.text if response else ""
+
+
+class StubBackend:
+    """Answers with the first date or year mentioned in each company's sources."""
+
+    def generate(self, prompt):
+        companies = json.loads(prompt.split(COMPANIES_MARKER, 1)[1])
+        answers = {}
+        for company in companies:
+            match = DATE_PATTERN.search("\n".join(company["sources"]))
+            answers[company["id"]] = match.group(0) if match else NOT_FOUND
+        return json.dumps(answers)
+
+
+BACKENDS = {"gemini": GeminiBackend, "stub": StubBackend}
+
+
+def format_founded_date(date_str):
+    return f"{date_str}-01-01" if re.fullmatch(r"\d{4}", date_str) else date_str
+
+
+def build_prompt(batch):
+    """Prompt for a batch of (company_name, location, scraped_texts) tuples; ids are positions in the batch."""
+    companies = [
+        {"id": str(i), "company": company_name, "location": location, "sources": texts}
+        for i, (company_name, location, texts) in enumerate(batch)
+    ]
+    return PROMPT + COMPANIES_MARKER + json.dumps(companies, ensure_ascii=False)
+
+
+def parse_answers(text, n):
+    """Per-company dates from a batch response, in batch order; AI_FAILURE for all if it is not a JSON object."""
+    match = re.search(r"\{.*\}", text or "", re.S)
+    try:
+        answers = json.loads(match.group(0)) if match else None
+    except json.JSONDecodeError:
+        answers = None
+    if not isinstance(answers, dict):
+        return [AI_FAILURE] * n
+    return [format_founded_date(str(answers.get(str(i), NOT_FOUND)).strip()) for i in range(n)]
+
+
+def extract_batch(backend, batch):
+    try:
+        return parse_answers(backend.generate(build_prompt(batch)), len(batch))
+    except Exception:
+        return [AI_FAILURE] * len(batch)
+
+
+async def extract_founded_dates(backend, items, batch_size=BATCH_SIZE, max_in_flight=MAX_IN_FLIGHT, on_batch=None):
+    """Founded date for every (company_name, location, scraped_texts) item, one model request per batch.
+
+    `on_batch(batch, dates)` is called as each batch finishes, e.g. to cache its answers.
+    """
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def run(batch):
+        async with in_flight:
+            dates = await asyncio.to_thread(extract_batch, backend, batch)
+        if on_batch is not None:
+            on_batch(batch, dates)
+        return dates
+
+    results = await asyncio.gather(*(run(batch) for batch in batches))
+    return [date for batch_dates in results for date in batch_dates]
@@ -0,0 +1,114 @@
+import csv
+import os
+import numpy as np
+import pandas as pd
+
+# Founding-date estimates from each company's first funding round.
+# A company is assumed to be founded EARLY_STAGE_OFFSET_YEARS before its first round when that
+# round is an early stage, and LATE_STAGE_OFFSET_YEARS before it otherwise. The first round is
+# found with one groupby over the dated deals and the offsets are applied as array operations.
+# When deals are read in chunks, each chunk's first rounds are folded into a running per-company
+# table with merge_first_funding, so only one row per company is kept between chunks.
+# Scraped dates are written back the same way: collected into one frame keyed by SCRAPE_KEYS and
+# applied with a single indexed lookup, optionally checkpointed to a CSV as they arrive.
+
+EARLY_STAGES = ["Pre-Seed", "Seed", "Series A", "Series B"]
+EARLY_STAGE_OFFSET_YEARS = 1
+LATE_STAGE_OFFSET_YEARS = 2
+# Scraped founding dates are keyed by company name and ecosystem
+SCRAPE_KEYS = ["companyName", "ecosystemName"]
+
+
+def first_funding(deals, company_names=None, key="companyName"):
+    """Earliest dated deal per company (its date and round type), optionally only for `company_names`.
+
+    Companies are told apart by the `key` column, e.g. an entity id (see entities.py) instead of the name.
+    """
+    dated = deals[[key, "date", "roundType"]].dropna(subset=["date"])
+    if company_names is not None:
+        dated = dated[dated[key].isin(company_names)]
+    first = dated.loc[dated.groupby(key, sort=False)["date"].idxmin()]
+    return first.set_index(key)
+
+
+def merge_first_funding(first, chunk_first):
+    """Combine two first_funding tables, keeping each company's earlier round (the one in `first` on ties)."""
+    if first is None:
+        return chunk_first
+    key = first.index.name
+    both = pd.concat([first, chunk_first]).reset_index()
+    return both.loc[both.groupby(key, sort=False)["date"].idxmin()].set_index(key)
+
+
+def estimates_from_first_funding(first):
+    """Estimated founding date per company (indexed like `first`, by its key column), offset back from its first funding round by stage."""
+    early = first["roundType"].isin(EARLY_STAGES).to_numpy()
+    estimated = np.where(
+        early,
+        first["date"] - pd.DateOffset(years=EARLY_STAGE_OFFSET_YEARS),
+        first["date"] - pd.DateOffset(years=LATE_STAGE_OFFSET_YEARS),
+    )
+    return pd.Series(pd.to_datetime(estimated), index=first.index, name="estimatedFounded")
+
+
+def estimate_founded_dates(deals, company_names=None):
+    return estimates_from_first_funding(first_funding(deals, company_names))
+
+
+def fill_estimated_dates(companies, estimated, key="companyName"):
+    """Fill missing `dateFounded` values from `estimated` (by `key`); returns the frame and the number filled.
+
+    Estimates are written as dates when dateFounded is already a datetime column (as read through
+    schema.py) and as YYYY-MM-DD strings otherwise.
+    """
+    missing = int(companies["dateFounded"].isna().sum())
+    if not pd.api.types.is_datetime64_any_dtype(companies["dateFounded"]):
+        estimated = estimated.dt.strftime("%Y-%m-%d")
+    companies = companies.copy()
+    companies["dateFounded"] = companies["dateFounded"].fillna(companies[key].map(estimated))
+    return companies, missing - int(companies["dateFounded"].isna().sum())
+
+
+def impute_founded_dates(companies, deals, only_missing=True):
+    """Fill missing `dateFounded` values from the first-funding estimates (see fill_estimated_dates).
+
+    With only_missing=True the estimates are computed just for companies whose dateFounded is
+    missing. Returns the updated companies frame and the number of dates filled.
+    """
+    missing = companies["dateFounded"].isna()
+    names = companies.loc[missing, "companyName"].unique() if only_missing else None
+    return fill_estimated_dates(companies, estimate_founded_dates(deals, names))
+
+
+def fill_scraped_dates(companies, results):
+    """Fill missing `dateFounded` values from `results` (SCRAPE_KEYS + dateFounded) with one indexed lookup.
+
+    Scraped answers are unvalidated text, so a datetime dateFounded column is written back as
+    YYYY-MM-DD strings alongside them; schema.py parses the combined column when it is next read.
+    """
+    scraped = results.drop_duplicates(subset=SCRAPE_KEYS, keep="last").set_index(SCRAPE_KEYS)["dateFounded"]
+    found = scraped.reindex(pd.MultiIndex.from_frame(companies[SCRAPE_KEYS])).to_numpy()
+    companies = companies.copy()
+    if pd.api.types.is_datetime64_any_dtype(companies["dateFounded"]):
+        companies["dateFounded"] = companies["dateFounded"].dt.strftime("%Y-%m-%d")
+    companies["dateFounded"] = companies["dateFounded"].fillna(pd.Series(found, index=companies.index))
+    return companies
+
+
+def load_checkpoint(path):
+    """Scraped results saved so far, as a SCRAPE_KEYS + dateFounded frame."""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=SCRAPE_KEYS + ["dateFounded"], dtype=object)
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def append_checkpoint(path, rows):
+    """Append (companyName, ecosystemName, dateFounded) rows to the checkpoint CSV and flush them to disk."""
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(SCRAPE_KEYS + ["dateFounded"])
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
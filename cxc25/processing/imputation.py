@@ -1,25 +1,72 @@
+import asyncio
+import os
 import pandas as pd
-import numpy as np
-import requests
-import re
-import time
-from bs4 import BeautifulSoup
 import google.generativeai as genai
-from datetime import timedelta
 from googlesearch import search
+from categories import encode_categories
+from countries import build_country_table, save_country_table
+from round_types import infer_round_types
+from founded_dates import SCRAPE_KEYS, first_funding, merge_first_funding, estimates_from_first_funding, fill_estimated_dates, fill_scraped_dates
+from pipeline import Stage, main
+from scraper import SEARCH_FAILURE, Fetcher, map_bounded
+from scrape_cache import ScrapeCache
+from extraction import BACKENDS, AI_FAILURE, NOT_FOUND, extract_founded_dates
+from entities import build_entity_table, extend_entity_table, save_entity_table, load_entity_table, entity_ids
+from incremental import Snapshot, snapshot_path
+from investor_profiles import PROFILE_FIELDS, investor_profile_pairs, deal_profile_pairs, merge_pairs, list_column, apply_profiles, joined
+from schema import REJECTS_DIR, read_csv_chunks
+from streaming import CsvChunkWriter, ParquetChunkWriter
 
 # Configuration for Google AI API
 genai.configure(api_key="YOUR_API_KEY")
 
+# Each section below is a pipeline stage (see pipeline.py). Run every stage that is out of date with
+#   python processing/imputation.py
+# or a subset with `python processing/imputation.py round_types founded_dates`; `--list` shows the stages.
+# Stages declared incremental only process the rows that changed since their last run (see incremental.py).
+
+DEALS_PATH = "data/deals_updated.csv"
+# The deals with round types inferred; the export above is only read, so rejected rows stay in it
+DEALS_TYPED_PATH = "data/deals_typed.csv"
+DEAL_INVESTORS_PATH = "data/dealInvestor_updated.csv"
+INVESTORS_PATH = "data/investors_updated.csv"
+INVESTORS_FINAL_PATH = "data/investors_final.csv"
+INVESTOR_PROFILES_PATH = "data/investors_final.parquet"
+COMPANIES_PATH = "data/companies_updated.csv"
+DEAL_INVESTORS_FINAL_PATH = "data/dealInvestor_final.csv"
+COMPANIES_ESTIMATED_PATH = "data/companies_estimated.csv"
+COMPANIES_SCRAPED_PATH = "data/companies_scraped.csv"
+COMPANIES_FINAL_PATH = "data/companies_final.csv"
+COMPANIES_FINAL_TYPED_PATH = "data/companies_final.parquet"
+COUNTRY_CODES_PATH = "data/country_codes.csv"
+COUNTRY_CODES_UNRESOLVED_PATH = "data/country_codes_unresolved.csv"
+INVESTOR_ENTITIES_PATH = "data/entities/investors.csv"
+COMPANY_ENTITIES_PATH = "data/entities/companies.csv"
+
+# Companies looked up at once by the scraping stage; per-host limits live in scraper.py, and the
+# searches count against SEARCH_URL's host like any page fetch
+COMPANY_CONCURRENCY = 8
+SEARCH_URL = "https://www.google.com/search"
+# Founding dates are extracted EXTRACTION_BATCH_SIZE companies per model request, with up to
+# EXTRACTION_IN_FLIGHT requests at once; EXTRACTION_BACKEND=stub runs without the Gemini API
+EXTRACTION_BACKEND = os.environ.get("EXTRACTION_BACKEND", "gemini")
+EXTRACTION_BATCH_SIZE = 10
+EXTRACTION_IN_FLIGHT = 4
+# Rows per chunk when streaming the CSVs through the stages (IMPUTATION_CHUNK_ROWS=200000, say,
+# for exports larger than memory); unset reads each file in one piece
+CHUNK_ROWS = int(os.environ.get("IMPUTATION_CHUNK_ROWS") or 0) or None
+
 ### Load Datasets
 
-def load_csv(filepath):
-    return pd.read_csv(filepath)
+def load_chunks(filepath, name, log_rejects=True):
+    """Typed frames (see schema.py) of up to CHUNK_ROWS rows from one of the datasets, or the whole file if CHUNK_ROWS is unset."""
+    return read_csv_chunks(filepath, name, CHUNK_ROWS, REJECTS_DIR if log_rejects else None)
 
-dealInvestor_df = load_csv("data/dealInvestor_updated.csv")
-investors_df = load_csv("data/investors_updated.csv")
-deals_df = load_csv("data/deals_updated.csv")
-companies_df = load_csv("data/companies_updated.csv")
+def load_output_chunks(filepath):
+    """A stage's previous output as untyped text frames, so the rows an incremental run keeps are copied over verbatim."""
+    if CHUNK_ROWS is None:
+        return iter([pd.read_csv(filepath, dtype=str, keep_default_na=False)])
+    return pd.read_csv(filepath, dtype=str, keep_default_na=False, chunksize=CHUNK_ROWS)
 
 ### Standardizing Column Values
 
@@ -27,105 +74,274 @@ def standardize_column(df, column):
     df[column] = df[column].str.strip().str.lower()
     return df
 
-dealInvestor_df = standardize_column(dealInvestor_df, "investorName")
-investors_df = standardize_column(investors_df, "investorName")
-companies_df = standardize_column(companies_df, "companyName")
-deals_df = standardize_column(deals_df, "companyName")
-
-deals_df["date"] = pd.to_datetime(deals_df["date"], errors="coerce")
-
-def infer_round_type(amount):
-    if pd.isnull(amount):
-        return "Unknown"
-    if amount < 500000:
-        return "Pre-Seed"
-    elif amount < 2000000:
-        return "Seed"
-    elif amount < 15000000:
-        return "Series A"
-    elif amount < 50000000:
-        return "Series B"
-    elif amount < 100000000:
-        return "Series C"
-    else:
-        return "Series D+"
-
-deals_df["roundType"] = deals_df.apply(lambda row: row["roundType"] if row["roundType"] != "Series ?" else infer_round_type(row["amount"]), axis=1)
-
-deals_df.to_csv("data/deals_updated.csv", index=False)
-print("✅ `roundType` inferred where missing and saved in `deals_updated.csv`.")
+### Inferring Missing Round Types From Amounts
+
+def round_types_stage(incremental=False):
+    # Each deal's round type depends on its own row only, so an incremental run infers the new or
+    # changed deals and copies the others from the last `deals_typed.csv`
+    snapshot = Snapshot("round_types", incremental)
+    round_type_counts = pd.Series(dtype="int64")
+    processed = 0
+    chunks = snapshot.update("deals", load_chunks(DEALS_PATH, "deals"), lambda: load_output_chunks(DEALS_TYPED_PATH))
+    with CsvChunkWriter(DEALS_TYPED_PATH) as writer:
+        for deals_df, to_process in chunks:
+            if to_process:
+                deals_df = standardize_column(deals_df, "companyName")
+                deals_df["roundType"], chunk_counts = infer_round_types(deals_df)
+                round_type_counts = round_type_counts.add(chunk_counts, fill_value=0).astype("int64")
+                processed += len(deals_df)
+                deals_df = encode_categories(deals_df)
+            writer.write(deals_df)
+    snapshot.save()
+    print(f"  round types inferred in {processed} deals:")
+    for round_type, rows in round_type_counts.items():
+        print(f"  {round_type}: {rows} deals")
+    print("✅ `roundType` inferred where missing and saved in `deals_typed.csv`.")
+
+### Indexing Investor & Company Names
+
+def entity_index_stage(incremental=False):
+    # Only the distinct names are kept between chunks; an incremental run adds the new names to the
+    # saved tables without renumbering their entities
+    names = {INVESTOR_ENTITIES_PATH: set(), COMPANY_ENTITIES_PATH: set()}
+    sources = [
+        (INVESTORS_PATH, "investors", "investorName", INVESTOR_ENTITIES_PATH),
+        (DEAL_INVESTORS_PATH, "dealInvestor", "investorName", INVESTOR_ENTITIES_PATH),
+        (COMPANIES_PATH, "companies", "companyName", COMPANY_ENTITIES_PATH),
+        (DEALS_TYPED_PATH, "deals", "companyName", COMPANY_ENTITIES_PATH),
+    ]
+    for path, name, column, entities_path in sources:
+        for df in load_chunks(path, name, log_rejects=False):
+            names[entities_path].update(df[column].dropna().unique())
+    for entities_path, entity_names in names.items():
+        entity_names = pd.Series(sorted(entity_names), dtype="string")
+        if incremental:
+            entity_table = extend_entity_table(load_entity_table(entities_path), entity_names)
+        else:
+            entity_table = build_entity_table(entity_names)
+        save_entity_table(entity_table, entities_path)
+        print(f"  {len(entity_table)} names -> {entity_table['entityId'].nunique()} entities in `{entities_path}`")
+    print("✅ Investor and company name indexes saved in `data/entities`.")
 
 ### Imputing Missing Investor Country
 
-investor_country_map = investors_df.set_index("investorName")["country"].dropna().to_dict()
-dealInvestor_df["investorCountry"] = dealInvestor_df["investorCountry"].fillna(dealInvestor_df["investorName"].map(investor_country_map))
-dealInvestor_df.to_csv("data/dealInvestor_final.csv", index=False)
-print("✅ `investorCountry` imputed where possible and saved in `dealInvestor_final.csv`.")
+def investor_countries_stage(incremental=False):
+    # Countries are looked up by investor entity, so name variants share one; later rows win.
+    # An incremental run only fills the new or changed rows and those of investors whose own row changed
+    snapshot = Snapshot("investor_countries", incremental)
+    investor_entities = load_entity_table(INVESTOR_ENTITIES_PATH)
+    country_by_entity = {}
+    changed_investors = []
+    for investors_df in load_chunks(INVESTORS_PATH, "investors"):
+        investors_df = investors_df.assign(entityId=entity_ids(investor_entities, investors_df["investorName"]))
+        country_by_entity.update(investors_df.dropna(subset=["entityId", "country"]).set_index("entityId")["country"].to_dict())
+        changed_investors.append(investors_df[snapshot.changed("investors", investors_df.drop(columns="entityId")).to_numpy()])
+    changed_investors = pd.concat(changed_investors)
+    changed_ids = changed_investors["id"].astype("string").tolist() + snapshot.removed("investors").tolist()
+    changed_entities = changed_investors["entityId"].dropna()
+
+    def affected(dealInvestor_df):
+        return dealInvestor_df["investorId"].astype("string").isin(changed_ids) | entity_ids(investor_entities, dealInvestor_df["investorName"]).isin(changed_entities)
+
+    processed = filled = 0
+    chunks = snapshot.update(
+        "dealInvestor", load_chunks(DEAL_INVESTORS_PATH, "dealInvestor"),
+        lambda: load_output_chunks(DEAL_INVESTORS_FINAL_PATH), affected,
+    )
+    with CsvChunkWriter(DEAL_INVESTORS_FINAL_PATH) as writer:
+        for dealInvestor_df, to_process in chunks:
+            if to_process:
+                dealInvestor_df = standardize_column(dealInvestor_df, "investorName")
+                missing = dealInvestor_df["investorCountry"].isna().sum()
+                countries = entity_ids(investor_entities, dealInvestor_df["investorName"]).map(country_by_entity)
+                dealInvestor_df["investorCountry"] = dealInvestor_df["investorCountry"].fillna(countries)
+                filled += missing - dealInvestor_df["investorCountry"].isna().sum()
+                processed += len(dealInvestor_df)
+                dealInvestor_df = encode_categories(dealInvestor_df)
+            writer.write(dealInvestor_df)
+    snapshot.save()
+    print(f"  {filled} investor countries filled in {processed} rows")
+    print("✅ `investorCountry` imputed where possible and saved in `dealInvestor_final.csv`.")
+
+### Resolving Investor Countries to ISO Codes
+
+def country_codes_stage():
+    # Only the distinct country names are kept between chunks
+    countries = set()
+    for dealInvestor_df in load_chunks(DEAL_INVESTORS_FINAL_PATH, "dealInvestor"):
+        countries.update(dealInvestor_df["investorCountry"].dropna().unique())
+    for investors_df in load_chunks(INVESTORS_PATH, "investors"):
+        countries.update(investors_df["country"].dropna().unique())
+    country_table = build_country_table(sorted(countries))
+    unresolved_countries = save_country_table(country_table, COUNTRY_CODES_PATH, COUNTRY_CODES_UNRESOLVED_PATH)
+    print(f"✅ {len(country_table) - len(unresolved_countries)}/{len(country_table)} investor countries resolved to ISO codes and saved in `country_codes.csv`.")
+    if len(unresolved_countries):
+        print(f"❌ Unresolved countries saved in `country_codes_unresolved.csv`: {', '.join(unresolved_countries['investorCountry'])}")
+
+### Building Investor Stage & Sector Profiles
+
+def investor_profiles_stage():
+    # Only distinct (investor, value) pairs are kept between chunks
+    pairs = None
+    for investors_df in load_chunks(INVESTORS_PATH, "investors", log_rejects=False):
+        pairs = merge_pairs(pairs, investor_profile_pairs(investors_df))
+    for deals_df in load_chunks(DEALS_TYPED_PATH, "deals", log_rejects=False):
+        pairs = merge_pairs(pairs, deal_profile_pairs(deals_df))
+    profiles = {field: list_column(pairs[field]) for field in PROFILE_FIELDS}
+    with CsvChunkWriter(INVESTORS_FINAL_PATH) as csv_writer, ParquetChunkWriter(INVESTOR_PROFILES_PATH) as parquet_writer:
+        for investors_df in load_chunks(INVESTORS_PATH, "investors"):
+            investors_df = apply_profiles(investors_df, profiles)
+            parquet_writer.write(investors_df)
+            csv_writer.write(joined(investors_df))
+    print(f"✅ `stages` and `sectors` profiles built for {csv_writer.rows} investors and saved in `investors_final.csv` / `investors_final.parquet`.")
 
 ### Imputing Missing Founding Date Using First Funding Date
 
-deals_df = deals_df.sort_values(by=["companyName", "date"], ascending=[True, True])
-first_funding = deals_df.drop_duplicates(subset=["companyName"], keep="first")[["companyName", "date", "roundType"]]
+def founded_dates_stage(incremental=False):
+    # Deals and companies are matched by company entity, so name variants share one first round;
+    # one first-funding row per company is carried across the deal chunks. An incremental run only
+    # fills the new or changed companies and the companies of new or changed deals (a deal dropped
+    # from the export does not revise its company's estimate until a full run)
+    snapshot = Snapshot("founded_dates", incremental)
+    company_entities = load_entity_table(COMPANY_ENTITIES_PATH)
+    first = None
+    changed_deals = []
+    for deals_df in load_chunks(DEALS_TYPED_PATH, "deals", log_rejects=False):
+        changed = snapshot.changed("deals", deals_df).to_numpy()
+        deals_df["companyEntity"] = entity_ids(company_entities, deals_df["companyName"])
+        first = merge_first_funding(first, first_funding(deals_df, key="companyEntity"))
+        changed_deals.append(deals_df.loc[changed, ["companyId", "companyEntity"]])
+    estimated = estimates_from_first_funding(first)
+    changed_deals = pd.concat(changed_deals)
+    changed_ids = changed_deals["companyId"].astype("string").dropna().tolist()
 
-def estimate_founded_date(row):
-    if pd.isnull(row["date"]):
-        return pd.NaT
-    return row["date"] - pd.DateOffset(years=1 if row["roundType"] in ["Pre-Seed", "Seed", "Series A", "Series B"] else 2)
+    def affected(companies_df):
+        return companies_df["id"].astype("string").isin(changed_ids) | entity_ids(company_entities, companies_df["companyName"]).isin(changed_deals["companyEntity"].dropna())
 
-first_funding["estimatedFounded"] = first_funding.apply(estimate_founded_date, axis=1)
-companies_df = companies_df.merge(first_funding[["companyName", "estimatedFounded"]], on="companyName", how="left")
-companies_df["dateFounded"] = companies_df["dateFounded"].fillna(companies_df["estimatedFounded"])
-companies_df.drop(columns=["estimatedFounded"], inplace=True, errors="ignore")
-companies_df.to_csv("data/companies_final.csv", index=False)
-print("✅ `dateFounded` imputed using first funding date and saved in `companies_final.csv`.")
+    processed = founded_filled = 0
+    chunks = snapshot.update(
+        "companies", load_chunks(COMPANIES_PATH, "companies"),
+        lambda: load_output_chunks(COMPANIES_ESTIMATED_PATH), affected,
+    )
+    with CsvChunkWriter(COMPANIES_ESTIMATED_PATH) as writer:
+        for companies_df, to_process in chunks:
+            if to_process:
+                companies_df = standardize_column(companies_df, "companyName")
+                companies_df["companyEntity"] = entity_ids(company_entities, companies_df["companyName"])
+                companies_df, filled = fill_estimated_dates(companies_df, estimated, key="companyEntity")
+                companies_df = companies_df.drop(columns="companyEntity")
+                founded_filled += filled
+                processed += len(companies_df)
+            writer.write(companies_df)
+    snapshot.save()
+    print(f"  {founded_filled} founding dates estimated from first funding rounds for {processed} companies")
+    print("✅ `dateFounded` imputed using first funding date and saved in `companies_estimated.csv`.")
 
 ### Scraping Missing Founding Dates from Google Search
 
+def founded_date_query(company_name, location):
+    return f"{company_name} {location} founded date"
+
 def get_google_search_results(company_name, location):
-    query = f"{company_name} {location} founded date"
+    query = founded_date_query(company_name, location)
     search_results = list(search(query, num_results=15))
     valid_results = [url for url in search_results if url.startswith("http") and "linkedin" not in url]
     return valid_results
 
-def scrape_webpage(url):
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, "html.parser").get_text()
-    except requests.exceptions.RequestException:
-        return None
-
-def format_founded_date(date_str):
-    return f"{date_str}-01-01" if re.fullmatch(r"\d{4}", date_str) else date_str
-
-def get_founded_date(company_name, location):
-    search_results = get_google_search_results(company_name, location)
-    scraped_texts = [scrape_webpage(url)[:2000] for url in search_results if scrape_webpage(url)][:5]
-    if not scraped_texts:
-        return "Not Found"
-    try:
-        model = genai.GenerativeModel("gemini-pro")
-        prompt = f"Extract the founding date for {company_name} in {location}. Only return the date in YYYY-MM-DD format.\nSources:\n" + "\n".join(scraped_texts)
-        response = model.generate_content(prompt)
-        return format_founded_date(response.text.strip() if response else "Not Found")
-    except:
-        return "Error: AI Failure"
-
-missing_companies = companies_df[companies_df["dateFounded"].isna()][["companyName", "ecosystemName"]].dropna().values.tolist()
-
-for company, location in missing_companies:
-    founded_date = get_founded_date(company, location)
-    companies_df.loc[(companies_df["companyName"] == company) & (companies_df["ecosystemName"] == location), "dateFounded"] = founded_date
-    time.sleep(2)
-
-print("✅ Web scraping & AI-assisted date imputation completed!")
-
-### Save Cleaned Companies Data
-date_cols = ["dateFounded", "latestRoundDate", "dateAcqusition", "ipoDate", "peDate"]
-valid_date_pattern = r"^\d{4}-\d{2}-\d{2}$"
-for col in date_cols:
-    companies_df[col] = companies_df[col].astype(str)
-    companies_df[col] = companies_df[col].where(companies_df[col].str.match(valid_date_pattern), np.nan)
-
-companies_df.to_csv("data/companies_final.csv", index=False)
-print("✅ Cleaned company data saved in `companies_final.csv`.")
+async def get_scraped_texts(fetcher, cache, company_name, location):
+    """Page texts for a company, or None if its search failed (after the fetcher's retries)."""
+    query = founded_date_query(company_name, location)
+    search_results = cache.get("search", query)
+    if search_results is None:
+        try:
+            search_results = await fetcher.run_limited(SEARCH_URL, get_google_search_results, company_name, location)
+        except Exception as e:
+            print(f"❌ Search failed for {company_name} ({location}): {e}")
+            return None
+        cache.put("search", query, search_results)
+    return await fetcher.collect_texts(search_results, limit=5)
+
+async def get_founded_dates(companies, backend):
+    with ScrapeCache() as cache, Fetcher(cache=cache) as fetcher:
+        founded_dates = [cache.get("founded", [company, location]) for company, location in companies]
+        todo = [i for i, founded_date in enumerate(founded_dates) if founded_date is None]
+        scraped = await map_bounded([companies[i] for i in todo], lambda company, location: get_scraped_texts(fetcher, cache, company, location), COMPANY_CONCURRENCY)
+
+        # Companies with no reachable pages or a failed search are not cached: both may only have failed this time
+        pending = []
+        for i, texts in zip(todo, scraped):
+            if texts:
+                pending.append((i, texts))
+            else:
+                founded_dates[i] = SEARCH_FAILURE if texts is None else NOT_FOUND
+
+        def cache_batch(batch, dates):
+            for (company, location, _), founded_date in zip(batch, dates):
+                if founded_date != AI_FAILURE:
+                    cache.put("founded", [company, location], founded_date)
+
+        items = [(*companies[i], texts) for i, texts in pending]
+        extracted = await extract_founded_dates(backend, items, EXTRACTION_BATCH_SIZE, EXTRACTION_IN_FLIGHT, on_batch=cache_batch)
+        for (i, _), founded_date in zip(pending, extracted):
+            founded_dates[i] = founded_date
+        print(f"  {len(companies) - len(todo)} founding dates from cache, {len(pending)} companies sent to the model in {-(-len(pending) // EXTRACTION_BATCH_SIZE)} requests")
+        return founded_dates
+
+def scrape_founded_dates_stage(incremental=False):
+    # The companies still missing a date are collected in a first pass, scraped, then filled in a second pass.
+    # An incremental run only looks up new or changed companies; the others keep their last answer
+    snapshot = Snapshot("scrape_founded_dates", incremental)
+    missing_companies = []
+    for companies_df in load_chunks(COMPANIES_ESTIMATED_PATH, "companies", log_rejects=False):
+        companies_df = companies_df[snapshot.changed("companies", companies_df, record=False).to_numpy()]
+        missing_companies += companies_df[companies_df["dateFounded"].isna()][SCRAPE_KEYS].dropna().values.tolist()
+    backend = BACKENDS[EXTRACTION_BACKEND]()
+    founded_dates = asyncio.run(get_founded_dates(missing_companies, backend))
+
+    # Each batch's answers are already checkpointed in the scrape cache; write them all back at once
+    scraped = pd.DataFrame(missing_companies, columns=SCRAPE_KEYS).assign(dateFounded=founded_dates)
+    chunks = snapshot.update(
+        "companies", load_chunks(COMPANIES_ESTIMATED_PATH, "companies"),
+        lambda: load_output_chunks(COMPANIES_SCRAPED_PATH),
+    )
+    with CsvChunkWriter(COMPANIES_SCRAPED_PATH) as writer:
+        for companies_df, to_process in chunks:
+            writer.write(fill_scraped_dates(companies_df, scraped) if to_process else companies_df)
+    snapshot.save()
+    print("✅ Web scraping & AI-assisted date imputation completed!")
+
+### Validate and Save Final Companies Data
+
+def validate_companies_stage():
+    # Scraped answers are parsed against the companies schema here: malformed dates become
+    # missing and are logged to data/rejects/companies.csv instead of being regex-filtered
+    with CsvChunkWriter(COMPANIES_FINAL_PATH) as csv_writer, ParquetChunkWriter(COMPANIES_FINAL_TYPED_PATH) as parquet_writer:
+        for companies_df in load_chunks(COMPANIES_SCRAPED_PATH, "companies"):
+            csv_writer.write(companies_df)
+            parquet_writer.write(companies_df)
+    print("✅ Validated company data saved in `companies_final.csv` and `companies_final.parquet`.")
+
+# Every stage reads through load_chunks (schema.py) and writes through streaming.py
+READS = [load_chunks, load_output_chunks, "schema", "streaming"]
+
+STAGES = [
+    Stage("round_types", round_types_stage, inputs=[DEALS_PATH], outputs=[DEALS_TYPED_PATH, snapshot_path("round_types")], incremental=True,
+          code_deps=READS + [standardize_column, "round_types", "categories", "incremental"]),
+    Stage("entity_index", entity_index_stage, inputs=[INVESTORS_PATH, DEAL_INVESTORS_PATH, COMPANIES_PATH, DEALS_TYPED_PATH], outputs=[INVESTOR_ENTITIES_PATH, COMPANY_ENTITIES_PATH], incremental=True,
+          code_deps=READS + ["entities"]),
+    Stage("investor_countries", investor_countries_stage, inputs=[DEAL_INVESTORS_PATH, INVESTORS_PATH, INVESTOR_ENTITIES_PATH], outputs=[DEAL_INVESTORS_FINAL_PATH, snapshot_path("investor_countries")], incremental=True,
+          code_deps=READS + [standardize_column, "entities", "categories", "incremental"]),
+    Stage("country_codes", country_codes_stage, inputs=[DEAL_INVESTORS_FINAL_PATH, INVESTORS_PATH], outputs=[COUNTRY_CODES_PATH, COUNTRY_CODES_UNRESOLVED_PATH],
+          code_deps=READS + ["countries"]),
+    Stage("investor_profiles", investor_profiles_stage, inputs=[INVESTORS_PATH, DEALS_TYPED_PATH], outputs=[INVESTORS_FINAL_PATH, INVESTOR_PROFILES_PATH],
+          code_deps=READS + ["investor_profiles", "deal_investors"]),
+    Stage("founded_dates", founded_dates_stage, inputs=[COMPANIES_PATH, DEALS_TYPED_PATH, COMPANY_ENTITIES_PATH], outputs=[COMPANIES_ESTIMATED_PATH, snapshot_path("founded_dates")], incremental=True,
+          code_deps=READS + [standardize_column, "founded_dates", "entities", "incremental"]),
+    Stage("scrape_founded_dates", scrape_founded_dates_stage, inputs=[COMPANIES_ESTIMATED_PATH], outputs=[COMPANIES_SCRAPED_PATH, snapshot_path("scrape_founded_dates")], incremental=True,
+          code_deps=READS + [founded_date_query, get_google_search_results, get_scraped_texts, get_founded_dates, "founded_dates", "scraper", "scrape_cache", "extraction", "incremental"]),
+    Stage("validate_companies", validate_companies_stage, inputs=[COMPANIES_SCRAPED_PATH], outputs=[COMPANIES_FINAL_PATH, COMPANIES_FINAL_TYPED_PATH],
+          code_deps=READS),
+]
+
+if __name__ == "__main__":
+    main(STAGES, description="Impute missing values in the CxC datasets.")
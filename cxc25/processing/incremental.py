@@ -0,0 +1,139 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Row-level change tracking for the imputation stages.
+# A stage that supports it (see Stage.incremental in pipeline.py) keeps a snapshot of the row hashes
+# of the datasets it read on its last run, keyed by dealId / companyId / investorId. When its inputs
+# change but its code and outputs do not, the stage is run with incremental=True: the rows whose key
+# is new or whose contents changed (plus any rows the stage marks as affected, e.g. the companies of
+# new deals) are processed and merged into its stored output, and the other rows are copied over
+# as they were. A full run (the first one, or with --force) processes every row.
+# A key may repeat (e.g. a duplicated dealInvestor link): the snapshot keeps every row's hash, and
+# when one row of a key changes or disappears, all rows of that key are processed again.
+
+SNAPSHOTS_DIR = os.path.join("data", ".pipeline", "snapshots")
+# Mixed into the hash of each repeat of an identical row, so the copies count separately
+REPEAT_MIX = np.uint64(0x9E3779B97F4A7C15)
+# Key columns of each dataset; the exports call the deal / company / investor ids `id`
+KEYS = {
+    "deals": ["id"],
+    "companies": ["id"],
+    "investors": ["id"],
+    "dealInvestor": ["dealId", "investorId"],
+}
+
+
+def snapshot_path(stage):
+    return os.path.join(SNAPSHOTS_DIR, f"{stage}.parquet")
+
+
+def row_keys(df, name):
+    """Key of each row of a `name` frame as a string (key columns joined with "/"), missing if any part is."""
+    parts = [df[column].astype("string").replace("", pd.NA) for column in KEYS[name]]
+    keys = parts[0]
+    for part in parts[1:]:
+        keys = keys + "/" + part
+    return keys
+
+
+def row_hashes(df, name):
+    """Hash of each row of a `name` frame (all columns, in name order), indexed by its key."""
+    hashes = pd.util.hash_pandas_object(df[sorted(df.columns)].astype("string"), index=False)
+    return pd.Series(hashes.to_numpy(), index=row_keys(df, name).to_numpy(), dtype="uint64")
+
+
+def distinct_repeats(hashes, counts):
+    """`hashes` with the n-th repeat of a value mixed with n (n counted across calls in `counts`); first copies are unchanged."""
+    values = hashes.to_numpy()
+    uniques, sizes = np.unique(values, return_counts=True)
+    before = pd.Series([counts.get(value, 0) for value in uniques.tolist()], index=uniques, dtype="uint64")
+    occurrence = before.reindex(values).to_numpy() + pd.Series(values).groupby(values).cumcount().to_numpy().astype("uint64")
+    counts.update(zip(uniques.tolist(), (before.to_numpy() + sizes.astype("uint64")).tolist()))
+    return pd.Series(values ^ (occurrence * REPEAT_MIX), index=hashes.index, dtype="uint64")
+
+
+class Snapshot:
+    """Row hashes a stage read on its last run, and the ones it reads on this run.
+
+    changed() compares a chunk with the last run and records its hashes; save() replaces the
+    stored snapshot with those recorded. With incremental=False (or no stored snapshot) every
+    row counts as changed. Each pass over a dataset must read it in the same order.
+    """
+
+    def __init__(self, stage, incremental=False):
+        self.path = snapshot_path(stage)
+        self.full = not (incremental and os.path.exists(self.path))
+        # Hashes by dataset, indexed by key (repeated for a key with several rows)
+        self.previous = {} if self.full else self._load()
+        self.current = {}
+        # Copies of each row hash seen so far, per (dataset, recorded pass)
+        self.counts = {}
+
+    def _load(self):
+        stored = pd.read_parquet(self.path)
+        return {name: rows.set_index("key")["hash"] for name, rows in stored.groupby("dataset")}
+
+    def changed(self, name, df, record=True):
+        """Mask of the rows of `df` that are new or changed since the last run (or have no key)."""
+        hashes = distinct_repeats(row_hashes(df, name), self.counts.setdefault((name, record), {}))
+        if record:
+            self.current.setdefault(name, []).append(hashes)
+        if self.full:
+            return pd.Series(True, index=df.index)
+        previous = self.previous.get(name, pd.Series(dtype="uint64"))
+        return pd.Series(~hashes.isin(previous.to_numpy()).to_numpy() | hashes.index.isna(), index=df.index)
+
+    def removed(self, name):
+        """Keys with a row read on the last run but not on this one, changed or gone (call after reading every chunk)."""
+        if self.full or name not in self.previous:
+            return pd.Index([])
+        seen = pd.concat(self.current[name]).to_numpy() if name in self.current else []
+        previous = self.previous[name]
+        return previous.index[~previous.isin(seen).to_numpy()].unique()
+
+    def update(self, name, chunks, stored_chunks, affected=None):
+        """Yield (frame, to_process) for the output of a stage that transforms dataset `name` row by row.
+
+        On a full run, every chunk of `chunks` is yielded to be processed. Otherwise the chunks are
+        read first, keeping the new and changed rows and those where `affected(chunk)` is True.
+        A key that lost a row (changed or gone) or has an affected row is replaced: the stage's
+        stored output (from `stored_chunks()`) is yielded without its rows, followed by the kept
+        rows and every other row of the replaced keys, to be processed.
+        """
+        if self.full:
+            for chunk in chunks:
+                self.changed(name, chunk)
+                yield chunk, True
+            return
+        previous = self.previous.get(name, pd.Series(dtype="uint64"))
+        repeated = previous.index[previous.index.duplicated()].unique()
+        todo, new, held = [], [], []
+        for chunk in chunks:
+            changed = self.changed(name, chunk).to_numpy()
+            keep = changed | affected(chunk).to_numpy() if affected is not None else changed
+            todo.append(chunk[keep])
+            new.append(changed[keep])
+            # Unchanged rows of keys with several rows are needed if another row of the key is replaced
+            held.append(chunk[~keep & row_keys(chunk, name).isin(repeated).to_numpy()])
+        if not todo:
+            return
+        todo, new, held = pd.concat(todo, ignore_index=True), np.concatenate(new), pd.concat(held, ignore_index=True)
+        replaced = pd.Index(row_keys(todo[~new], name).dropna().unique()).union(self.removed(name))
+        todo = pd.concat([todo, held[row_keys(held, name).isin(replaced).to_numpy()]], ignore_index=True)
+        for chunk in stored_chunks():
+            keys = row_keys(chunk, name)
+            yield chunk[(keys.notna() & ~keys.isin(replaced)).to_numpy()], False
+        yield todo, True
+
+    def save(self):
+        """Store the hashes recorded on this run, one per row with a key."""
+        rows = []
+        for name, hashes in self.current.items():
+            hashes = pd.concat(hashes)
+            hashes = hashes[hashes.index.notna()]
+            rows.append(pd.DataFrame({"dataset": name, "key": hashes.index.astype(str), "hash": hashes.to_numpy()}))
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        pd.concat(rows, ignore_index=True).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
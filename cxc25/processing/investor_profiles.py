@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from deal_investors import DealInvestors, explode_list, standardize_names
+
+# Investor stage and sector profiles as list columns.
+# Every (investor, value) pair for a profile field comes from two places: the deals each investor
+# appears in (via the deals' investor index, see deal_investors.py) and the investor's own
+# comma-separated `stages` / `sectors`. The pairs are exploded into one long frame and
+# deduplicated; each field is then aggregated into an Arrow list<string> column of sorted
+# distinct values, built straight from the group offsets. Consumers filter with
+# investors_active_in rather than splitting strings. Field names are as in investors.csv.
+
+PROFILE_FIELDS = {"stages": "roundType", "sectors": "primaryTag"}
+
+
+def deal_profile_pairs(deals, links=None):
+    """Distinct (investorName, value) pairs per profile field for every investor named on `deals`.
+
+    `links` is the deals' DealInvestors index, row for row; it is built from `deals` if not given.
+    """
+    deals = deals.reset_index(drop=True)
+    links = DealInvestors.from_deals(deals) if links is None else links
+    rows = links.deal_rows()
+    names = links.names[links.values]
+    pairs = {}
+    for field, source in PROFILE_FIELDS.items():
+        frame = pd.DataFrame({"investorName": names, "value": deals[source].to_numpy()[rows]})
+        pairs[field] = frame.dropna().drop_duplicates()
+    return pairs
+
+
+def investor_profile_pairs(investors):
+    """Distinct (investorName, value) pairs per profile field already listed on `investors`."""
+    investors = investors.reset_index(drop=True)
+    names = standardize_names(investors["investorName"]).to_numpy()
+    pairs = {}
+    for field in PROFILE_FIELDS:
+        values = explode_list(investors[field])
+        frame = pd.DataFrame({"investorName": names[values.index.to_numpy()], "value": values.to_numpy()})
+        pairs[field] = frame.dropna().drop_duplicates()
+    return pairs
+
+
+def merge_pairs(pairs, more):
+    """Union of two per-field pair tables, e.g. to accumulate pairs across chunks."""
+    if pairs is None:
+        return more
+    return {field: pd.concat([pairs[field], more[field]]).drop_duplicates() for field in PROFILE_FIELDS}
+
+
+def list_column(pairs):
+    """Sorted distinct values per investor as an Arrow list column indexed by investorName."""
+    pairs = pairs.astype({"investorName": str, "value": str}).sort_values(["investorName", "value"])
+    names = pairs["investorName"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]]) if len(names) else np.array([], dtype=int)
+    offsets = pa.array(np.r_[starts, len(names)].astype("int32"))
+    lists = pa.ListArray.from_arrays(offsets, pa.array(pairs["value"].to_numpy(), pa.string()))
+    return pd.Series(pd.arrays.ArrowExtensionArray(lists), index=names[starts])
+
+
+def apply_profiles(investors, profiles):
+    """`investors` with its profile fields replaced by the list columns in `profiles` (null where an investor has none)."""
+    investors = investors.copy()
+    names = standardize_names(investors["investorName"])
+    investors["investorName"] = names
+    for field in PROFILE_FIELDS:
+        investors[field] = pd.Series(profiles[field].reindex(names.to_numpy()).array, index=investors.index)
+    return investors
+
+
+def build_profiles(investors, deals):
+    """Investors with `stages` and `sectors` as list columns covering their own values and their deals'."""
+    pairs = merge_pairs(investor_profile_pairs(investors), deal_profile_pairs(deals))
+    return apply_profiles(investors, {field: list_column(pairs[field]) for field in PROFILE_FIELDS})
+
+
+def joined(profiles):
+    """Copy of `profiles` with the list columns joined back to comma-separated strings (for CSV output)."""
+    profiles = profiles.copy()
+    for field in PROFILE_FIELDS:
+        profiles[field] = pd.Series(pc.binary_join(pa.array(profiles[field].array), ", "), index=profiles.index, dtype="string")
+    return profiles
+
+
+def investors_active_in(profiles, **values):
+    """Mask of investors whose list columns contain every given value, e.g. stages="Series A", sectors="fintech"."""
+    mask = np.ones(len(profiles), dtype=bool)
+    for field, value in values.items():
+        items = profiles[field].reset_index(drop=True).explode()
+        mask &= items.eq(value).fillna(False).groupby(level=0).any().to_numpy()
+    return pd.Series(mask, index=profiles.index)
+
+
+def read_profiles(path):
+    """Read a profiles Parquet file, keeping its list columns as Arrow lists."""
+    return pq.read_table(path).to_pandas(types_mapper=lambda t: pd.ArrowDtype(t) if pa.types.is_list(t) else None)
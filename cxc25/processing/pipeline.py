@@ -0,0 +1,307 @@
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Content-hashed stage runner for the imputation pipeline.
+# Each stage declares the files it reads and writes. A stage is skipped when its code, inputs
+# and outputs still have the content hashes recorded after its last run, and its outputs are
+# restored from the cache when its inputs match an earlier run. A stage may rewrite one of
+# its own inputs in place (the hashes recorded for a stage are taken after it finishes), but
+# every file should have a single writer, or the stages sharing it keep invalidating each other.
+# Stages run in a process pool as soon as the stages they depend on (see dependencies) are done,
+# so a full refresh takes about as long as the slowest chain of dependent stages (the critical
+# path) rather than the sum of all stages. The manifest and cache are only touched by the parent.
+# A stage declared incremental is called with incremental=True when only its inputs changed since
+# its last run, so it can update its outputs from the changed rows (see incremental.py).
+
+PIPELINE_DIR = os.path.join("data", ".pipeline")
+MANIFEST_PATH = os.path.join(PIPELINE_DIR, "manifest.json")
+CACHE_DIR = os.path.join(PIPELINE_DIR, "cache")
+CACHED_RUNS_PER_STAGE = 3
+
+
+class Stage:
+    """One pipeline step. `code_deps` lists the helper functions and modules (by name) `run` relies
+    on; their source is hashed along with `run`'s, so editing a helper also invalidates the stage."""
+
+    def __init__(self, name, run, inputs, outputs, incremental=False, code_deps=()):
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.incremental = incremental
+        self.code_deps = list(code_deps)
+
+    def arguments(self, action):
+        """Arguments to call `run` with for `action` ("ran" or "updated")."""
+        return (action == "updated",) if self.incremental else ()
+
+    def code_hash(self):
+        """Hash of the source of the stage function and its `code_deps`, so editing either invalidates its cached runs."""
+        digest = hashlib.sha256()
+        for code in [self.run, *self.code_deps]:
+            code = importlib.import_module(code) if isinstance(code, str) else code
+            digest.update(inspect.getsource(code).encode())
+        return digest.hexdigest()
+
+
+def file_hash(path):
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dependencies(stages):
+    """Map each stage name to the earlier stages it must run after.
+
+    That is the stages that last wrote one of its inputs, and, for each of its outputs, the
+    stage that last wrote it and the stages that read it since, so running stages in parallel
+    gives the same files as running them in pipeline order.
+    """
+    writers = {}
+    readers = {}
+    deps = {}
+    for stage in stages:
+        after = {writers[path] for path in stage.inputs if path in writers}
+        for path in stage.outputs:
+            after |= {writers[path]} if path in writers else set()
+            after |= readers.get(path, set())
+        after.discard(stage.name)
+        deps[stage.name] = sorted(after)
+        for path in stage.inputs:
+            readers.setdefault(path, set()).add(stage.name)
+        for path in stage.outputs:
+            writers[path] = stage.name
+            readers[path] = set()
+    return deps
+
+
+def critical_path(results, deps):
+    """Longest chain of dependent stages in `results` by their seconds, as (stage names, seconds)."""
+    seconds = {name: elapsed for name, _, elapsed in results}
+    finish, previous = {}, {}
+    for name, _, _ in results:  # results are in pipeline order, so dependencies come first
+        before = max((d for d in deps[name] if d in finish), key=finish.get, default=None)
+        finish[name] = seconds[name] + (finish[before] if before else 0)
+        previous[name] = before
+    last = max(finish, key=finish.get, default=None)
+    path, name = [], last
+    while name is not None:
+        path.append(name)
+        name = previous[name]
+    return path[::-1], finish.get(last, 0.0)
+
+
+def _timed_run(run, *args):
+    """Run a stage function in a worker process; returns its wall time."""
+    start = time.perf_counter()
+    run(*args)
+    return time.perf_counter() - start
+
+
+class Pipeline:
+    def __init__(self, stages, manifest_path=MANIFEST_PATH, cache_dir=CACHE_DIR):
+        self.stages = list(stages)
+        self.by_name = {stage.name: stage for stage in self.stages}
+        self.manifest_path = manifest_path
+        self.cache_dir = cache_dir
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _key(self, stage, input_hashes):
+        payload = json.dumps([stage.name, stage.code_hash(), input_hashes], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _cache_paths(self, key, stage):
+        return [os.path.join(self.cache_dir, key, f"{i}_{os.path.basename(path)}") for i, path in enumerate(stage.outputs)]
+
+    def _store(self, key, stage):
+        os.makedirs(os.path.join(self.cache_dir, key), exist_ok=True)
+        for path, cached in zip(stage.outputs, self._cache_paths(key, stage)):
+            shutil.copyfile(path, cached)
+
+    def _restore(self, key, stage):
+        cached_paths = self._cache_paths(key, stage)
+        if not all(os.path.exists(cached) for cached in cached_paths):
+            return False
+        for path, cached in zip(stage.outputs, cached_paths):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            shutil.copyfile(cached, path)
+        return True
+
+    def _record(self, stage, key):
+        entry = self.manifest.get(stage.name, {})
+        cached = [k for k in entry.get("cached", []) if k != key] + [key]
+        for evicted in cached[:-CACHED_RUNS_PER_STAGE]:
+            shutil.rmtree(os.path.join(self.cache_dir, evicted), ignore_errors=True)
+        self.manifest[stage.name] = {
+            "code": stage.code_hash(),
+            "inputs": {path: file_hash(path) for path in stage.inputs},
+            "outputs": {path: file_hash(path) for path in stage.outputs},
+            "cached": cached[-CACHED_RUNS_PER_STAGE:],
+        }
+        self._save_manifest()
+
+    def is_up_to_date(self, stage):
+        entry = self.manifest.get(stage.name)
+        if entry is None:
+            return False
+        return (
+            entry.get("code") == stage.code_hash()
+            and entry["inputs"] == {path: file_hash(path) for path in stage.inputs}
+            and entry["outputs"] == {path: file_hash(path) for path in stage.outputs}
+        )
+
+    def can_update(self, stage):
+        """Whether an incremental stage's outputs are as its current code last left them, so it can update them."""
+        entry = self.manifest.get(stage.name)
+        return (
+            stage.incremental
+            and entry is not None
+            and entry.get("code") == stage.code_hash()
+            and entry["outputs"] == {path: file_hash(path) for path in stage.outputs}
+        )
+
+    def _prepare(self, stage, force):
+        """Skip or restore `stage` if possible; returns (action, cache key).
+
+        The action is "skipped" or "restored" when that is done, else "updated" or "ran" for a
+        stage that has to run, incrementally or in full.
+        """
+        if not force and self.is_up_to_date(stage):
+            return "skipped", None
+        missing = [path for path in stage.inputs if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"Stage `{stage.name}` is missing inputs: {', '.join(missing)}")
+        key = self._key(stage, {path: file_hash(path) for path in stage.inputs})
+        if not force and self._restore(key, stage):
+            self._record(stage, key)
+            return "restored", key
+        return "updated" if not force and self.can_update(stage) else "ran", key
+
+    def _finish(self, stage, key):
+        self._store(key, stage)
+        self._record(stage, key)
+
+    def run_stage(self, stage, force=False):
+        """Run, restore or skip one stage; returns "skipped", "restored", "updated" or "ran"."""
+        action, key = self._prepare(stage, force)
+        if action in ("updated", "ran"):
+            stage.run(*stage.arguments(action))
+            self._finish(stage, key)
+        return action
+
+    def run(self, names=None, force=False, jobs=1):
+        """Run the named stages (all by default); returns (name, action, seconds) per stage, in pipeline order.
+
+        With `jobs` > 1, stages run in a pool of that many processes, each as soon as the stages
+        it depends on have finished. If a stage fails, no further stages are started; the ones
+        already running are finished and recorded before the error is raised.
+        """
+        unknown = set(names or []) - set(self.by_name)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+        selected = [stage for stage in self.stages if not names or stage.name in names]
+        if jobs <= 1:
+            results = []
+            for stage in selected:
+                start = time.perf_counter()
+                action = self.run_stage(stage, force=force)
+                results.append((stage.name, action, time.perf_counter() - start))
+            return results
+
+        selected_names = {stage.name for stage in selected}
+        deps = {name: [d for d in after if d in selected_names] for name, after in dependencies(self.stages).items()}
+        pending = list(selected)
+        running = {}
+        done = {}
+        error = None
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            while pending or running:
+                ready = [] if error else [stage for stage in pending if all(d in done for d in deps[stage.name])]
+                for stage in ready:
+                    pending.remove(stage)
+                    start = time.perf_counter()
+                    try:
+                        action, key = self._prepare(stage, force)
+                    except Exception as e:
+                        error = e
+                        break
+                    if action in ("updated", "ran"):
+                        running[pool.submit(_timed_run, stage.run, *stage.arguments(action))] = (stage, action, key, time.perf_counter() - start)
+                    else:
+                        done[stage.name] = (action, time.perf_counter() - start)
+                if not running or any(stage.name in done for stage in ready):
+                    if not ready:
+                        break
+                    continue  # skipped / restored stages may have unblocked others
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, action, key, prepare_seconds = running.pop(future)
+                    try:
+                        seconds = future.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    start = time.perf_counter()
+                    self._finish(stage, key)
+                    done[stage.name] = (action, prepare_seconds + seconds + time.perf_counter() - start)
+        if error:
+            raise error
+        return [(stage.name, *done[stage.name]) for stage in selected]
+
+
+def print_timings(results, wall_seconds=None, deps=None):
+    for name, action, seconds in results:
+        print(f"  {name:<24} {action:<9} {seconds:8.2f}s")
+    print(f"  {'total':<24} {'':<9} {sum(seconds for _, _, seconds in results):8.2f}s")
+    if wall_seconds is not None:
+        print(f"  {'wall time':<24} {'':<9} {wall_seconds:8.2f}s")
+    if deps is not None:
+        path, seconds = critical_path(results, deps)
+        print(f"  critical path ({seconds:.2f}s): {' -> '.join(path) or '-'}")
+
+
+def main(stages, argv=None, description=None):
+    """Command-line entry point: run all or some of `stages`, then print per-stage timings."""
+    pipeline = Pipeline(stages)
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("stages", nargs="*", metavar="stage", help=f"stages to run (default: all): {', '.join(pipeline.by_name)}")
+    parser.add_argument("--force", action="store_true", help="rerun the selected stages in full even if their inputs are unchanged")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="number of stages to run at once (default: one per CPU)")
+    parser.add_argument("--list", action="store_true", help="list the stages, their dependencies and whether they are up to date")
+    args = parser.parse_args(argv)
+    if args.list:
+        deps = dependencies(pipeline.stages)
+        for stage in pipeline.stages:
+            state = "up to date" if pipeline.is_up_to_date(stage) else "stale"
+            print(f"  {stage.name:<24} {state:<11} after: {', '.join(deps[stage.name]) or '-'}")
+        return
+    unknown = set(args.stages) - set(pipeline.by_name)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    start = time.perf_counter()
+    results = pipeline.run(args.stages or None, force=args.force, jobs=args.jobs)
+    print_timings(results, time.perf_counter() - start, dependencies(pipeline.stages))
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+# Round-type inference from the deal amount.
+# The amount ladder is kept as a threshold table rather than an if/elif chain: each rule
+# assigns its round type to amounts below `upper` (and at or above the previous rule's bound).
+# Deals whose round type is MISSING_ROUND_TYPE get a rule's label in one vectorized pass;
+# deals with no amount get UNKNOWN_ROUND_TYPE.
+
+MISSING_ROUND_TYPE = "Series ?"
+UNKNOWN_ROUND_TYPE = "Unknown"
+
+ROUND_TYPE_RULES = pd.DataFrame([
+    {"upper": 500_000, "roundType": "Pre-Seed"},
+    {"upper": 2_000_000, "roundType": "Seed"},
+    {"upper": 15_000_000, "roundType": "Series A"},
+    {"upper": 50_000_000, "roundType": "Series B"},
+    {"upper": 100_000_000, "roundType": "Series C"},
+    {"upper": np.inf, "roundType": "Series D+"},
+])
+
+
+def round_type_for_amount(amount, rules=ROUND_TYPE_RULES):
+    """Round type implied by each amount under `rules` (UNKNOWN_ROUND_TYPE where the amount is missing)."""
+    amount = pd.to_numeric(pd.Series(amount), errors="coerce")
+    bins = np.concatenate([[-np.inf], rules["upper"].to_numpy(dtype="float64")])
+    labels = pd.cut(amount, bins=bins, labels=rules["roundType"].tolist(), right=False, ordered=False)
+    return labels.astype(object).fillna(UNKNOWN_ROUND_TYPE)
+
+
+def infer_round_types(deals, rules=ROUND_TYPE_RULES):
+    """Fill MISSING_ROUND_TYPE deals from their amount; returns the new roundType column and the rows each rule filled."""
+    round_type = deals["roundType"].astype(object)
+    missing = (round_type == MISSING_ROUND_TYPE).to_numpy()
+    inferred = round_type_for_amount(deals.loc[missing, "amount"], rules).to_numpy()
+    round_type = round_type.copy()
+    round_type[missing] = inferred
+    counts = pd.Series(inferred).value_counts().reindex(rules["roundType"].tolist() + [UNKNOWN_ROUND_TYPE], fill_value=0)
+    return round_type, counts.rename("rows")
@@ -0,0 +1,192 @@
+import fcntl
+import os
+import numpy as np
+import pandas as pd
+
+# Column schemas for the four datasets, applied once when a CSV is read.
+# Every column is parsed from its raw text in one vectorized pass into a nullable pandas
+# dtype (string, Int64, float64, boolean or datetime64). Values that are present but do not
+# parse, fall outside a column's allowed categories, or are missing from a required column
+# send the whole row to data/rejects/<name>.csv with the reason, instead of quietly becoming
+# NaN. Columns marked on_error="null" (e.g. scraped founding dates) keep the row, null the
+# value and still log the row. Columns not listed in a schema are passed through as text.
+
+REJECTS_DIR = "data/rejects"
+# Placeholders the pipeline writes for "no value"
+NULL_TOKENS = ["", "nan", "NaN", "NaT", "None", "Not Found", "Error: AI Failure", "Error: Search Failure"]
+ROUND_TYPES = [
+    "Pre-Seed", "Seed", "Series A", "Series B", "Series C", "Series D", "Series D+", "Series E",
+    "Series F", "Series G", "Series ?", "Grant", "Equity Crowdfunding", "IPO", "Unknown",
+]
+BOOLEAN_VALUES = {"true": True, "false": False, "1": True, "0": False, "yes": True, "no": False}
+
+SCHEMAS = {
+    "deals": {
+        "id": {"dtype": "Int64", "required": True},
+        "companyId": {"dtype": "Int64"},
+        "companyName": {"dtype": "string"},
+        "headquarters": {"dtype": "string"},
+        "ecosystemName": {"dtype": "string"},
+        "ecosystemSecondary": {"dtype": "string"},
+        "primaryTag": {"dtype": "string"},
+        "roundType": {"dtype": "string", "allowed": ROUND_TYPES},
+        "date": {"dtype": "date"},
+        "amount": {"dtype": "float64"},
+        "year": {"dtype": "Int64"},
+        "yearQuarter": {"dtype": "string"},
+        "investors": {"dtype": "string"},
+        "leadInvestors": {"dtype": "string"},
+    },
+    "dealInvestor": {
+        "id": {"dtype": "Int64", "required": True},
+        "dealId": {"dtype": "Int64", "required": True},
+        "companyId": {"dtype": "Int64"},
+        "companyName": {"dtype": "string"},
+        "headquarters": {"dtype": "string"},
+        "investorId": {"dtype": "Int64", "required": True},
+        "investorName": {"dtype": "string"},
+        "leadInvestorFlag": {"dtype": "boolean"},
+        "ecosystemName": {"dtype": "string"},
+        "ecosystemSecondary": {"dtype": "string"},
+        "date": {"dtype": "date"},
+        "year": {"dtype": "Int64"},
+        "yearQuarter": {"dtype": "string"},
+        "roundType": {"dtype": "string", "allowed": ROUND_TYPES},
+        "investorCountry": {"dtype": "string"},
+    },
+    "companies": {
+        "id": {"dtype": "Int64", "required": True},
+        "companyName": {"dtype": "string"},
+        "ecosystemName": {"dtype": "string"},
+        "ecosystemSecondary": {"dtype": "string"},
+        "dateFounded": {"dtype": "date", "on_error": "null"},
+        "primaryTag": {"dtype": "string"},
+        "secondaryTag": {"dtype": "string"},
+        "latestRoundType": {"dtype": "string", "allowed": ROUND_TYPES},
+        "latestRoundDate": {"dtype": "date"},
+        "dateAcqusition": {"dtype": "date"},
+        "acquiringCompany": {"dtype": "string"},
+        "ipoDate": {"dtype": "date"},
+        "peDate": {"dtype": "date"},
+        "deadFlag": {"dtype": "boolean"},
+        "logoUrlCdn": {"dtype": "string"},
+    },
+    "investors": {
+        "id": {"dtype": "Int64", "required": True},
+        "investorName": {"dtype": "string"},
+        "investorType": {"dtype": "string"},
+        "city": {"dtype": "string"},
+        "country": {"dtype": "string"},
+        "sectors": {"dtype": "string"},
+        "stages": {"dtype": "string"},
+        "logoURL": {"dtype": "string"},
+    },
+}
+
+
+def _parse(text, spec):
+    """Typed values for a column of stripped text (NA where missing) and a mask of values that failed to parse."""
+    dtype = spec["dtype"]
+    present = text.notna()
+    if dtype == "string":
+        values = text
+        bad = present & ~text.isin(spec["allowed"]) if "allowed" in spec else pd.Series(False, index=text.index)
+    elif dtype == "date":
+        values = pd.to_datetime(text, format="ISO8601", errors="coerce")
+        bad = present & values.isna()
+    elif dtype == "boolean":
+        values = text.str.lower().map(BOOLEAN_VALUES).astype("boolean")
+        bad = present & values.isna()
+    else:
+        numbers = pd.to_numeric(text, errors="coerce")
+        bad = present & numbers.isna()
+        if dtype == "Int64":
+            bad |= present & (numbers % 1 != 0)
+            numbers = numbers.where(~bad)
+        values = numbers.astype(dtype)
+    return values, bad.to_numpy(dtype=bool)
+
+
+def validate(df, name):
+    """Coerce the raw text columns of `df` to the `name` schema.
+
+    Returns the typed rows and the logged rows: the raw values plus `rejectReason` (the failing
+    columns) and `kept` (True when only on_error="null" columns failed, so the row stayed in).
+    """
+    schema = SCHEMAS[name]
+    df = df.rename(columns=str.strip)
+    missing_required = [col for col, spec in schema.items() if spec.get("required") and col not in df.columns]
+    if missing_required:
+        raise ValueError(f"`{name}` is missing required columns: {', '.join(missing_required)}")
+    columns = {}
+    rejected = np.zeros(len(df), dtype=bool)
+    reasons = pd.Series("", index=df.index, dtype=object)
+    for col in df.columns:
+        text = df[col].astype("string").str.strip()
+        text = text.mask(text.isin(NULL_TOKENS))
+        spec = schema.get(col)
+        if spec is None:
+            columns[col] = text
+            continue
+        values, bad = _parse(text, spec)
+        if spec.get("required"):
+            bad |= text.isna().to_numpy()
+        if spec.get("on_error") == "null":
+            values = values.mask(bad)
+        else:
+            rejected |= bad
+        columns[col] = values
+        reasons = reasons.mask(bad, reasons + col + ";")
+    typed = pd.DataFrame(columns, index=df.index)
+    logged = reasons != ""
+    rejects = df[logged].assign(rejectReason=reasons[logged].str.rstrip(";"), kept=~rejected[logged.to_numpy()])
+    return typed[~rejected].reset_index(drop=True), rejects
+
+
+def write_rejects(rejects, name, rejects_dir=REJECTS_DIR):
+    """Add `rejects` to data/rejects/<name>.csv, keeping rows logged by earlier runs."""
+    path = os.path.join(rejects_dir, f"{name}.csv")
+    if rejects.empty and not os.path.exists(path):
+        return
+    os.makedirs(rejects_dir, exist_ok=True)
+    # Stages running in parallel worker processes may log the same dataset: the read-extend-write
+    # holds an exclusive lock on <name>.csv.lock so no process's rows are lost, and the file is
+    # replaced whole so readers never see it torn
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if os.path.exists(path):
+                rejects = pd.concat([pd.read_csv(path, dtype=str, keep_default_na=False), rejects.astype(str)])
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            rejects.astype(str).drop_duplicates().to_csv(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_csv_chunks(path, name, chunk_rows=None, rejects_dir=REJECTS_DIR):
+    """Yield the `name` dataset from `path` as typed frames of up to `chunk_rows` rows (one frame if None).
+
+    Rejected rows are collected across chunks and logged once the file has been read (not at all
+    if `rejects_dir` is None).
+    """
+    if chunk_rows:
+        chunks = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+    else:
+        chunks = [pd.read_csv(path, dtype=str, keep_default_na=False)]
+    logged = []
+    for raw in chunks:
+        typed, rejects = validate(raw, name)
+        if not rejects.empty:
+            logged.append(rejects)
+        yield typed
+    if logged and rejects_dir is not None:
+        rejects = pd.concat(logged)
+        kept = int(rejects["kept"].sum())
+        print(f"  {path}: {len(rejects) - kept} rows rejected, {kept} rows with values nulled (see {rejects_dir}/{name}.csv)")
+        write_rejects(rejects, name, rejects_dir)
+
+
+def read_csv(path, name, rejects_dir=REJECTS_DIR):
+    """Read the `name` dataset from `path` as typed columns, logging rejected rows."""
+    return pd.concat(read_csv_chunks(path, name, rejects_dir=rejects_dir), ignore_index=True)
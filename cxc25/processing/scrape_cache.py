@@ -0,0 +1,117 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# Persistent cache for the founding-date scraper, stored in one SQLite file.
+# Three namespaces: "search" (query -> result URLs), "page" (URL -> page text, zlib-compressed)
+# and "founded" ((company, ecosystem) -> extracted date). Entries expire after their namespace's
+# TTL, and each namespace is capped in bytes by evicting the least recently used entries.
+# Writes happen as each lookup finishes, so an interrupted run resumes where it stopped.
+
+CACHE_PATH = "data/scrape_cache.sqlite"
+DAY = 24 * 60 * 60
+NAMESPACES = {
+    "search": {"ttl": 30 * DAY, "max_bytes": 32 * 1024 * 1024, "compress": False},
+    "page": {"ttl": 90 * DAY, "max_bytes": 512 * 1024 * 1024, "compress": True},
+    "founded": {"ttl": 365 * DAY, "max_bytes": 32 * 1024 * 1024, "compress": False},
+}
+
+
+class ScrapeCache:
+    def __init__(self, path=CACHE_PATH, namespaces=NAMESPACES):
+        self.namespaces = namespaces
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (namespace TEXT, key TEXT, value BLOB, size INTEGER, "
+            "created REAL, accessed REAL, PRIMARY KEY (namespace, key))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (namespace, accessed)")
+        self.purge_expired()
+        self.sizes = dict(self.db.execute("SELECT namespace, SUM(size) FROM entries GROUP BY namespace").fetchall())
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
+
+    @staticmethod
+    def _key(key):
+        return key if isinstance(key, str) else json.dumps(key, ensure_ascii=False)
+
+    def purge_expired(self):
+        now = time.time()
+        with self.lock:
+            for namespace, config in self.namespaces.items():
+                if config["ttl"] is not None:
+                    self.db.execute("DELETE FROM entries WHERE namespace = ? AND created < ?", (namespace, now - config["ttl"]))
+            self.db.commit()
+
+    def get(self, namespace, key):
+        """Cached value for `key`, or None if it is missing or expired."""
+        config = self.namespaces[namespace]
+        key = self._key(key)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT value, size, created FROM entries WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+            if row is None or (config["ttl"] is not None and row[2] < now - config["ttl"]):
+                if row is not None:
+                    self._delete(namespace, key, row[1])
+                self.misses += 1
+                return None
+            self.db.execute("UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?", (now, namespace, key))
+            self.hits += 1
+        value = zlib.decompress(row[0]) if config["compress"] else row[0]
+        return json.loads(value)
+
+    def put(self, namespace, key, value):
+        config = self.namespaces[namespace]
+        key = self._key(key)
+        blob = json.dumps(value, ensure_ascii=False).encode()
+        if config["compress"]:
+            blob = zlib.compress(blob, 6)
+        now = time.time()
+        with self.lock:
+            old = self.db.execute("SELECT size FROM entries WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, blob, len(blob), now, now),
+            )
+            self.sizes[namespace] = self.sizes.get(namespace, 0) + len(blob) - (old[0] if old else 0)
+            self._evict(namespace, config["max_bytes"])
+            self.db.commit()
+
+    def _delete(self, namespace, key, size):
+        self.db.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+        self.sizes[namespace] = self.sizes.get(namespace, 0) - size
+
+    def _evict(self, namespace, max_bytes):
+        if self.sizes.get(namespace, 0) <= max_bytes:
+            return
+        rows = self.db.execute("SELECT key, size FROM entries WHERE namespace = ? ORDER BY accessed", (namespace,))
+        evicted = []
+        excess = self.sizes[namespace] - max_bytes
+        for key, size in rows:
+            if excess <= 0:
+                break
+            evicted.append((key, size))
+            excess -= size
+        for key, size in evicted:
+            self._delete(namespace, key, size)
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.db.execute("SELECT namespace, COUNT(*) FROM entries GROUP BY namespace").fetchall())
+        return {"entries": counts, "bytes": dict(self.sizes), "hits": self.hits, "misses": self.misses}
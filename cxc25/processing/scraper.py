@@ -0,0 +1,158 @@
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+# Concurrent page fetching for the founding-date lookup.
+# Requests run on a bounded pool of worker threads sharing one connection pool, driven from
+# asyncio so many companies can be looked up at once. At most PER_HOST_LIMIT requests hit the
+# same host at a time, rate-limited and server errors are retried with exponential backoff,
+# and collect_texts cancels the remaining fetches as soon as it has enough page texts.
+# Other blocking requests (e.g. the search queries) go through run_limited, which applies the
+# same per-host limit and backoff and raises the last error if every attempt fails.
+
+MAX_CONNECTIONS = 32
+PER_HOST_LIMIT = 2
+TIMEOUT_SECONDS = 10
+RETRIES = 2
+BACKOFF_SECONDS = 1.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Recorded (see schema.NULL_TOKENS) for a company whose search failed; it is not cached, so the
+# company is searched again on the next run
+SEARCH_FAILURE = "Error: Search Failure"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36"
+}
+
+
+def retry_after_seconds(response):
+    """The Retry-After header of `response` in seconds, if it gives one."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    return float(retry_after) if retry_after and retry_after.isdigit() else None
+
+
+class Fetcher:
+    def __init__(self, max_connections=MAX_CONNECTIONS, per_host=PER_HOST_LIMIT, timeout=TIMEOUT_SECONDS,
+                 retries=RETRIES, backoff=BACKOFF_SECONDS, headers=HEADERS, cache=None):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        # Optional ScrapeCache; page texts found there are returned without a request
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_connections)
+        # Semaphores are created on first use so they belong to the running event loop
+        self.connections = None
+        self.hosts = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc.lower()
+        if host not in self.hosts:
+            self.hosts[host] = asyncio.Semaphore(self.per_host)
+        return self.hosts[host]
+
+    def _delay(self, attempt, retry_after):
+        delay = retry_after if retry_after is not None else self.backoff * 2 ** attempt
+        return delay * random.uniform(0.75, 1.25)
+
+    def _get(self, url):
+        """Blocking GET run on a worker thread; returns (status, page text or None, Retry-After seconds)."""
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            return None, None, None
+        retry_after = retry_after_seconds(response)
+        if response.status_code != 200:
+            return response.status_code, None, retry_after
+        return 200, BeautifulSoup(response.text, "html.parser").get_text(), None
+
+    async def fetch_text(self, url):
+        """Visible text of the page at `url`, or None if it cannot be fetched."""
+        if self.cache is not None:
+            text = self.cache.get("page", url)
+            if text is not None:
+                return text
+        if self.connections is None:
+            self.connections = asyncio.Semaphore(self.max_connections)
+        loop = asyncio.get_running_loop()
+        async with self._host_limit(url), self.connections:
+            for attempt in range(self.retries + 1):
+                status, text, retry_after = await loop.run_in_executor(self.executor, self._get, url)
+                if status == 200:
+                    if self.cache is not None:
+                        self.cache.put("page", url, text)
+                    return text
+                # Connection errors and timeouts (no status) are retried like rate limits and 5xx
+                if (status is not None and status not in RETRY_STATUSES) or attempt == self.retries:
+                    return None
+                await asyncio.sleep(self._delay(attempt, retry_after))
+        return None
+
+    async def run_limited(self, url, call, *args):
+        """`call(*args)` on a worker thread, counted against the limit of `url`'s host.
+
+        A requests exception with a retryable status (or none, for connection errors and
+        timeouts) is retried with backoff; any other error, or the last one, is raised.
+        """
+        if self.connections is None:
+            self.connections = asyncio.Semaphore(self.max_connections)
+        loop = asyncio.get_running_loop()
+        async with self._host_limit(url), self.connections:
+            for attempt in range(self.retries + 1):
+                try:
+                    return await loop.run_in_executor(self.executor, call, *args)
+                except requests.exceptions.RequestException as error:
+                    response = error.response
+                    if (response is not None and response.status_code not in RETRY_STATUSES) or attempt == self.retries:
+                        raise
+                    await asyncio.sleep(self._delay(attempt, retry_after_seconds(response)))
+
+    async def _fetch_indexed(self, i, url):
+        return i, await self.fetch_text(url)
+
+    async def collect_texts(self, urls, limit, max_chars=2000):
+        """Fetch `urls` concurrently and return the first `limit` non-empty texts (in `urls` order), cancelling the rest."""
+        tasks = [asyncio.ensure_future(self._fetch_indexed(i, url)) for i, url in enumerate(urls)]
+        collected = []
+        try:
+            for done in asyncio.as_completed(tasks):
+                i, text = await done
+                if text:
+                    collected.append((i, text[:max_chars]))
+                    if len(collected) >= limit:
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return [text for _, text in sorted(collected)]
+
+
+async def map_bounded(items, lookup, concurrency):
+    """Await `lookup(*item)` for every item with at most `concurrency` running at once; results follow `items` order."""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with limit:
+            return await lookup(*item)
+
+    return await asyncio.gather(*(run(item) for item in items))
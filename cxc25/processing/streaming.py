@@ -0,0 +1,61 @@
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Chunk-at-a-time writers for the imputation stages.
+# A stage reads its input with schema.read_csv_chunks and writes each transformed chunk here, so
+# only one chunk is held in memory. Output goes to a temporary file that replaces the target only
+# when the writer closes without an error, which also lets a stage rewrite the file it is reading.
+
+
+class CsvChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.file = None
+        self.rows = 0
+
+    def __enter__(self):
+        self.file = open(self.tmp_path, "w", newline="")
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.file.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+    def write(self, df):
+        df.to_csv(self.file, header=self.file.tell() == 0, index=False)
+        self.rows += len(df)
+
+
+class ParquetChunkWriter:
+    """Writes each chunk as a row group; later chunks are cast to the first chunk's column types."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.writer = None
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if self.writer is not None:
+            self.writer.close()
+        if exc_type is None and self.writer is not None:
+            os.replace(self.tmp_path, self.path)
+        elif os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def write(self, df):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.tmp_path, table.schema)
+        else:
+            table = table.cast(self.writer.schema)
+        self.writer.write_table(table)
+        self.rows += len(df)
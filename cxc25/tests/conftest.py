@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The processing and dashboard modules import each other as top-level modules (they run as scripts from cxc25/)
+for package in ["processing", "dashboard"]:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", package))
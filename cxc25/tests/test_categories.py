@@ -0,0 +1,25 @@
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from categories import encode_categories, load_dictionary
+
+
+def encode_values(path, worker, n):
+    for i in range(n):
+        encode_categories(pd.DataFrame({"roundType": [f"type {worker}-{i}"]}), ["roundType"], path)
+
+
+def test_codes_are_stable(tmp_path):
+    path = str(tmp_path / "dictionaries.json")
+    first = encode_categories(pd.DataFrame({"roundType": ["Seed", "Series A"]}), path=path)
+    second = encode_categories(pd.DataFrame({"roundType": ["Series A", "Grant", None]}), path=path)
+    assert list(first["roundType"].cat.codes) == [0, 1]
+    assert list(second["roundType"].cat.codes) == [1, 2, -1]
+    assert load_dictionary(path)["roundType"] == ["Seed", "Series A", "Grant"]
+
+
+def test_parallel_processes_keep_every_value(tmp_path):
+    # Stages in separate worker processes extend the same dictionary at once
+    path = str(tmp_path / "dictionaries.json")
+    with ProcessPoolExecutor(4) as executor:
+        list(executor.map(encode_values, [path] * 4, range(4), [25] * 4))
+    assert len(load_dictionary(path)["roundType"]) == 100
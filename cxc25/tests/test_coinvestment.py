@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from coinvestment import co_investment, incidence, syndicates, top_pairs
+from deal_investors import DealInvestors
+
+
+def sample_deals():
+    return pd.DataFrame({
+        "dealId": [1, 2, 2, 3, 4],
+        "year": [2020, 2021, 2021, 2022, 2023],
+        "roundType": ["Seed", "Series A", "Series A", "Seed", "Seed"],
+        "investors": ["a, b, c", "a, b", "a, b", "b, c", "d"],
+        "leadInvestors": [None, None, None, "a", None],
+    })
+
+
+def test_co_investment_equals_brute_force_counts():
+    deals = sample_deals()
+    index = DealInvestors.from_deals(deals, id_column="dealId")
+    shared, counts = co_investment(incidence(index, deals))
+    # Brute force over the distinct deals: pairs of investors named on the same deal
+    members = [set(deals.loc[row, "investors"].split(", ")) | ({deals.loc[row, "leadInvestors"]} - {None}) for row in [0, 1, 3, 4]]
+    names = index.names.tolist()
+    expected = np.zeros((len(names), len(names)), dtype=int)
+    for investors in members:
+        for a in investors:
+            for b in investors:
+                expected[names.index(a), names.index(b)] += 1
+    assert counts.tolist() == np.diag(expected).tolist()
+    np.fill_diagonal(expected, 0)
+    assert (shared.toarray() == expected).all()
+    assert top_pairs(shared, index.names, 1).iloc[0].tolist() == ["a", "b", 3]
+
+
+def test_incidence_filters_years_and_round_types():
+    deals = sample_deals()
+    index = DealInvestors.from_deals(deals, id_column="dealId")
+    matrix = incidence(index, deals, years=(2021, 2023), round_types=["Seed"])
+    assert matrix.shape == (len(index.names), 2)
+    assert sorted(index.names[matrix.nonzero()[0]].tolist()) == ["a", "b", "c", "d"]
+
+
+def test_syndicate_members_are_truncated():
+    deals = pd.DataFrame({"dealId": [1, 2], "year": 2020, "roundType": "Seed", "investors": [", ".join(f"firm {i:02}" for i in range(15))] * 2, "leadInvestors": None})
+    index = DealInvestors.from_deals(deals, id_column="dealId")
+    shared, counts = co_investment(incidence(index, deals))
+    table = syndicates(shared, counts, index.names, min_shared=2, members_shown=3)
+    assert table[["investors", "sharedDeals"]].values.tolist() == [[15, 2 * 15 * 14 // 2]]
+    assert table.loc[0, "members"] == "firm 00, firm 01, firm 02 and 12 more"
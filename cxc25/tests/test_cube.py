@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+from cube import amount_by, build_cube, deal_counts
+
+
+def random_deals(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 50, n) * 100_000.0
+    amounts[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "date": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1500, n), unit="D") + pd.to_timedelta(rng.integers(0, 86400, n), unit="s"),
+        "roundType": rng.choice(["Seed", "Series A", "Series B"], n),
+        "primaryTag": rng.choice(["fintech", "health", "ai"], n),
+        "headquarters": rng.choice(["Toronto", "Montreal", "Calgary", "Vancouver"], n),
+        "ecosystemName": rng.choice(["Toronto", "Montreal"], n),
+        "amount": amounts,
+    }).sort_values("date", ignore_index=True)
+
+
+@pytest.mark.parametrize("by", [["roundType"], ["primaryTag", "headquarters"], ["year"]])
+@pytest.mark.parametrize("stat", ["sum", "mean", "count", "min", "max"])
+def test_rollups_equal_raw_groupby(by, stat):
+    deals = random_deals().assign(year=lambda df: df["date"].dt.year.astype("int16"))
+    cube = build_cube(deals)
+    date_range = ("2021-03-15", "2022-07-01")
+    window = deals[deals["date"].dt.normalize().between(*pd.to_datetime(date_range))]
+    expected = window.groupby(by)["amount"].agg(stat).rename("amount").reset_index()
+    pd.testing.assert_frame_equal(amount_by(cube, by, stat, date_range), expected, check_dtype=False)
+    expected = window.groupby(by).size().rename("count").reset_index()
+    pd.testing.assert_frame_equal(deal_counts(cube, by, date_range), expected, check_dtype=False)
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from date_index import DateIndex, RangeExtrema
+
+
+def test_range_extrema_equal_brute_force():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=1000)
+    values[rng.random(1000) < 0.2] = np.nan
+    values[300:700] = np.nan
+    extrema = RangeExtrema(values, block_size=16)
+    for lo, hi in [(0, 1000), (5, 6), (10, 40), (299, 701), (300, 700), (17, 999), (500, 500)] + [tuple(sorted(rng.integers(0, 1001, 2))) for _ in range(300)]:
+        window = values[lo:hi]
+        if np.isnan(window).all():
+            assert np.isnan(extrema.query(lo, hi)).all()
+        else:
+            assert extrema.query(lo, hi) == (np.nanmin(window), np.nanmax(window))
+
+
+def test_metrics_equal_masked_frame():
+    rng = np.random.default_rng(1)
+    deals = pd.DataFrame({
+        "date": pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 2000, 800), unit="D"),
+        "amount": np.where(rng.random(800) < 0.1, np.nan, rng.integers(1, 1000, 800) * 1000.0),
+    })
+    index = DateIndex(deals)
+    date_range = ("2020-02-01", "2022-11-30")
+    window = deals[deals["date"].between(*pd.to_datetime(date_range))]["amount"]
+    total, count, largest, smallest = index.metrics(date_range)
+    assert (total, count, largest, smallest) == (window.sum(), len(window), window.max(), window.min())
+    assert index.metrics(("2030-01-01", "2031-01-01"))[1] == 0
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from deal_investors import DealInvestors, explode_list
+
+
+def sample_deals():
+    return pd.DataFrame({
+        "id": [10, 11, 12],
+        "investors": ["Alpha, Beta", "Smith,Jones LLP, beta ", None],
+        "leadInvestors": ["Gamma", "beta", "Alpha"],
+    })
+
+
+def test_explode_list_splits_on_comma_space():
+    items = explode_list(pd.Series(["Alpha, Beta", "Smith,Jones LLP", None, ""]))
+    assert items.tolist() == ["Alpha", "Beta", "Smith,Jones LLP"]
+    assert items.index.tolist() == [0, 0, 1]
+
+
+def test_matrix_matches_the_split_names():
+    deals = sample_deals()
+    index = DealInvestors.from_deals(deals)
+    assert index.names.tolist() == ["alpha", "beta", "gamma", "smith,jones llp"]
+    # Brute force: the standardized names of each deal's investors and lead investors
+    for row, deal in deals.iterrows():
+        expected = {name.strip().lower() for col in ["investors", "leadInvestors"] if pd.notna(deal[col]) for name in deal[col].split(", ")}
+        assert set(index.names[index.matrix()[row].indices]) == expected
+    leads = index.matrix(lead_only=True)
+    assert [set(index.names[leads[row].indices]) for row in range(len(deals))] == [{"gamma"}, {"beta"}, {"alpha"}]
+
+
+def test_rows_and_take():
+    index = DealInvestors.from_deals(sample_deals())
+    subset = index.take(index.rows([12, 10]))
+    assert subset.deal_ids.tolist() == [12, 10]
+    assert (subset.matrix().toarray() == index.matrix().toarray()[[2, 0]]).all()
+    with pytest.raises(KeyError):
+        index.rows([99])
+    with pytest.raises(IndexError):
+        index.take([3])
+
+
+def test_save_and_load(tmp_path):
+    index = DealInvestors.from_deals(sample_deals())
+    path = str(tmp_path / "deal_investors.npz")
+    index.save(path)
+    loaded = DealInvestors.load(path)
+    assert np.array_equal(loaded.offsets, index.offsets) and loaded.names.tolist() == index.names.tolist()
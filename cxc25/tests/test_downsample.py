@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from downsample import downsample, lttb_indices, minmax_indices, render_mode
+
+
+def test_lttb_keeps_endpoints_and_size():
+    x = np.arange(5000)
+    y = np.sin(x / 50.0)
+    keep = lttb_indices(x, y, 200)
+    assert len(keep) == 200 and keep[0] == 0 and keep[-1] == 4999
+    assert (np.diff(keep) > 0).all()
+    assert (lttb_indices(x[:100], y[:100], 200) == np.arange(100)).all()
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=3000)
+    y[1234] = 100.0
+    keep = minmax_indices(y, 100)
+    assert 1234 in keep and np.argmin(y) in keep
+    assert len(keep) <= 100
+    # Brute force: every bucket's min and max value survives
+    buckets = np.arange(len(y)) * 50 // len(y)
+    for bucket in range(50):
+        values = y[buckets == bucket]
+        assert {values.min(), values.max()} <= set(y[keep])
+
+
+def test_downsample_per_group():
+    dates = pd.date_range("2019-01-01", periods=3000, freq="D")
+    df = pd.DataFrame({"date": np.tile(dates, 2), "roundType": np.repeat(["Seed", "Series A"], 3000), "amount": np.arange(6000.0)})
+    out = downsample(df, "date", "amount", group="roundType", max_points=300)
+    assert out.groupby("roundType").size().tolist() == [300, 300]
+    assert downsample(df, "date", "amount", method=None) is df
+    assert render_mode(len(out)) == "svg" and render_mode(len(df)) == "webgl"
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from entities import (
+    SIMILARITY_THRESHOLD, build_entity_table, entity_ids, extend_entity_table, match_pairs,
+    normalize_names, trigram_matrix, _numbers,
+)
+
+
+def variant_names(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    words = ["maple", "north", "capital", "ventures", "partners", "growth", "fund", "labs", "river", "peak", "bio", "data"]
+    names = [" ".join(rng.choice(words, rng.integers(2, 4))) for _ in range(n)]
+    # Typos and suffixes so that some names are close but not equal
+    names += [name[:-1] + " inc." for name in names[:50]] + [name.replace("a", "e", 1) for name in names[50:100]]
+    return np.unique(normalize_names(pd.Series(names)).to_numpy(dtype=str))
+
+
+def test_blocking_finds_every_pair_above_threshold():
+    normalized = variant_names()
+    grams = trigram_matrix(normalized)
+    numbers = _numbers(normalized)
+    i, j = match_pairs(grams, numbers, max_block_size=len(normalized))
+    # Brute force: every pair's cosine similarity
+    similarity = (grams @ grams.T).toarray()
+    bi, bj = np.nonzero(np.triu(similarity >= SIMILARITY_THRESHOLD, k=1))
+    assert len(bi) > 0
+    assert set(zip(i.tolist(), j.tolist())) == set(zip(bi.tolist(), bj.tolist()))
+
+
+def test_variants_share_an_entity():
+    table = build_entity_table(pd.Series(["Maple Leaf Ventures Inc.", "maple leaf ventures", "Maple Leaf Venture", "Northern Lights Fund II", "Northern Lights Fund III", "Peak Bio"]))
+    ids = table.set_index("name")["entityId"]
+    assert ids["Maple Leaf Ventures Inc."] == ids["maple leaf ventures"] == ids["Maple Leaf Venture"]
+    assert ids["Northern Lights Fund II"] != ids["Northern Lights Fund III"]
+    assert ids["Peak Bio"] not in {ids["Maple Leaf Venture"], ids["Northern Lights Fund II"]}
+    assert entity_ids(table, pd.Series(["MAPLE LEAF VENTURES LTD", "Unknown Co"])).tolist() == [ids["maple leaf ventures"], pd.NA]
+
+
+def test_extend_keeps_existing_ids():
+    table = build_entity_table(pd.Series(["Maple Leaf Ventures", "Peak Bio", "River Data Labs"]))
+    extended = extend_entity_table(table, pd.Series(["Maple Leaf Ventures Inc.", "Maple Leaf Venture", "Brand New Capital", "Brand New Capital Corp"]))
+    ids = extended.set_index("name")["entityId"]
+    assert table.set_index("name")["entityId"].to_dict().items() <= ids.to_dict().items()
+    assert ids["Maple Leaf Ventures Inc."] == ids["Maple Leaf Ventures"]
+    assert ids["Maple Leaf Venture"] == ids["Maple Leaf Ventures"]
+    assert ids["Brand New Capital"] == ids["Brand New Capital Corp"] > table["entityId"].max()
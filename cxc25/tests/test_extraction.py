@@ -0,0 +1,68 @@
+import asyncio
+import json
+from extraction import AI_FAILURE, NOT_FOUND, StubBackend, build_prompt, extract_batch, extract_founded_dates, parse_answers
+
+ITEMS = [
+    ("acme", "toronto", ["Acme was founded on 2015-03-02 in Toronto."]),
+    ("globex", "waterloo", ["Globex started in 2009.", "It moved in 2012."]),
+    ("initech", "ottawa", ["No dates on this page."]),
+]
+
+
+class CountingBackend(StubBackend):
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, prompt):
+        self.prompts.append(prompt)
+        return super().generate(prompt)
+
+
+class FixedBackend:
+    def __init__(self, answer):
+        self.answer = answer
+
+    def generate(self, prompt):
+        if isinstance(self.answer, Exception):
+            raise self.answer
+        return self.answer
+
+
+def test_stub_backend_answers_every_company():
+    assert extract_batch(StubBackend(), ITEMS) == ["2015-03-02", "2009-01-01", NOT_FOUND]
+
+
+def test_batches_keep_item_order():
+    backend = CountingBackend()
+    items = ITEMS * 3
+    batches = []
+    dates = asyncio.run(extract_founded_dates(backend, items, batch_size=4, max_in_flight=2, on_batch=lambda batch, dates: batches.append((batch, dates))))
+    assert dates == ["2015-03-02", "2009-01-01", NOT_FOUND] * 3
+    assert len(backend.prompts) == 3
+    assert sorted(len(batch) for batch, _ in batches) == [1, 4, 4]
+    for batch, batch_dates in batches:
+        assert batch_dates == extract_batch(StubBackend(), batch)
+
+
+def test_prompt_lists_each_company_by_position():
+    companies = json.loads(build_prompt(ITEMS).split("Companies:\n", 1)[1])
+    assert [company["id"] for company in companies] == ["0", "1", "2"]
+    assert companies[1]["sources"] == ITEMS[1][2]
+
+
+def test_parse_answers():
+    # Surrounding prose and code fences are ignored; ids are strings, years become January 1
+    text = 'Here you go:\n```json\n{"0": "2015-03-02", "2": " 1999 "}\n```'
+    assert parse_answers(text, 3) == ["2015-03-02", NOT_FOUND, "1999-01-01"]
+    assert parse_answers('{"0": "Not Found", "1": "2001"}', 2) == [NOT_FOUND, "2001-01-01"]
+
+
+def test_parse_answers_malformed():
+    for text in ["", None, "no json here", '{"0": "2015"', '["2015", "2016"]', '{"0": 2015,}']:
+        assert parse_answers(text, 2) == [AI_FAILURE, AI_FAILURE]
+
+
+def test_backend_errors_fail_the_batch():
+    assert extract_batch(FixedBackend(RuntimeError("quota exceeded")), ITEMS) == [AI_FAILURE] * 3
+    assert extract_batch(FixedBackend("I could not find these."), ITEMS[:2]) == [AI_FAILURE] * 2
+    assert extract_batch(FixedBackend('{"1": "2010"}'), ITEMS) == [NOT_FOUND, "2010-01-01", NOT_FOUND]
@@ -0,0 +1,56 @@
+import pandas as pd
+from incremental import Snapshot
+
+
+def links(*rows):
+    return pd.DataFrame(rows, columns=["dealId", "investorId", "investorCountry"], dtype="string")
+
+
+def run_stage(df, incremental, stored=None, chunk_rows=2):
+    """Toy row-by-row stage over dealInvestor chunks: upper-cases investorCountry, tagging the rows it processed."""
+    snapshot = Snapshot("toy", incremental)
+    chunks = (df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows))
+    output = []
+    for chunk, to_process in snapshot.update("dealInvestor", chunks, lambda: [stored]):
+        if to_process:
+            chunk = chunk.assign(investorCountry=chunk["investorCountry"].str.upper())
+        output.append(chunk)
+    snapshot.save()
+    return pd.concat(output, ignore_index=True)
+
+
+def sorted_rows(df):
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def test_incremental_run_equals_full_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = links(("1", "a", "ca"), ("1", "b", "us"), ("2", "a", "fr"), ("3", "c", "de"))
+    stored = run_stage(first, incremental=False)
+    second = links(("1", "a", "ca"), ("1", "b", "gb"), ("3", "c", "de"), ("4", "d", "jp"))
+    assert sorted_rows(run_stage(second, True, stored)).equals(sorted_rows(run_stage(second, False)))
+
+
+def test_duplicate_key_keeps_every_row(tmp_path, monkeypatch):
+    # A duplicated (dealId, investorId) link keeps both rows, whether or not one of them changes
+    monkeypatch.chdir(tmp_path)
+    first = links(("1", "a", "ca"), ("2", "b", "us"), ("1", "a", "fr"))
+    stored = run_stage(first, incremental=False)
+    second = links(("1", "a", "ca"), ("2", "b", "gb"), ("1", "a", "fr"))
+    stored = run_stage(second, True, stored)
+    assert sorted(stored["investorCountry"]) == ["CA", "FR", "GB"]
+    third = links(("1", "a", "ca"), ("2", "b", "gb"), ("1", "a", "de"))
+    updated = run_stage(third, True, stored)
+    assert sorted_rows(updated).equals(sorted_rows(run_stage(third, False)))
+    assert sorted(updated["investorCountry"]) == ["CA", "DE", "GB"]
+
+
+def test_identical_duplicates_are_counted(tmp_path, monkeypatch):
+    # Dropping one of two identical rows removes exactly one row from the output
+    monkeypatch.chdir(tmp_path)
+    first = links(("1", "a", "ca"), ("1", "a", "ca"), ("2", "b", "us"))
+    stored = run_stage(first, incremental=False)
+    second = links(("1", "a", "ca"), ("2", "b", "us"))
+    assert sorted(run_stage(second, True, stored)["investorCountry"]) == ["CA", "US"]
+    third = links(("1", "a", "ca"), ("2", "b", "us"), ("1", "a", "ca"))
+    assert sorted(run_stage(third, True, run_stage(second, False))["investorCountry"]) == ["CA", "CA", "US"]
@@ -0,0 +1,29 @@
+import pandas as pd
+from investor_profiles import build_profiles, investors_active_in, read_profiles
+from streaming import ParquetChunkWriter
+
+
+def test_filter_profiles_read_back_from_parquet(tmp_path):
+    investors = pd.DataFrame({
+        "investorName": ["Alpha Ventures", "Beta Capital", "Gamma Fund"],
+        "stages": ["Seed", None, "Series A, Seed"],
+        "sectors": ["fintech", "health", None],
+    })
+    deals = pd.DataFrame({
+        "id": [1, 2],
+        "investors": ["alpha ventures, beta capital", "gamma fund"],
+        "leadInvestors": [None, "gamma fund"],
+        "roundType": ["Series A", "Series B"],
+        "primaryTag": ["fintech", "fintech"],
+    })
+    path = str(tmp_path / "investors_final.parquet")
+    with ParquetChunkWriter(path) as writer:
+        writer.write(build_profiles(investors, deals))
+
+    profiles = read_profiles(path)
+    assert isinstance(profiles["stages"].dtype, pd.ArrowDtype)
+    active = investors_active_in(profiles, stages="Series A", sectors="fintech")
+    assert profiles.loc[active, "investorName"].tolist() == ["alpha ventures", "beta capital", "gamma fund"]
+    active = investors_active_in(profiles, stages="Seed", sectors="fintech")
+    assert profiles.loc[active, "investorName"].tolist() == ["alpha ventures", "gamma fund"]
+    assert not investors_active_in(profiles, sectors="health", stages="Series B").any()
@@ -0,0 +1,143 @@
+import os
+import pytest
+from pipeline import Pipeline, Stage, critical_path, dependencies
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def upper():
+    write("upper.txt", read("raw.txt").upper())
+
+
+def reverse():
+    write("reverse.txt", read("upper.txt")[::-1])
+
+
+def count():
+    write("count.txt", str(len(read("raw.txt"))))
+
+
+def combine():
+    write("combined.txt", read("reverse.txt") + read("count.txt"))
+
+
+def fail():
+    raise RuntimeError("stage failed")
+
+
+def toy_stages():
+    return [
+        Stage("upper", upper, inputs=["raw.txt"], outputs=["upper.txt"]),
+        Stage("reverse", reverse, inputs=["upper.txt"], outputs=["reverse.txt"]),
+        Stage("count", count, inputs=["raw.txt"], outputs=["count.txt"]),
+        Stage("combine", combine, inputs=["reverse.txt", "count.txt"], outputs=["combined.txt"]),
+    ]
+
+
+def toy_pipeline():
+    return Pipeline(toy_stages(), manifest_path="pipeline/manifest.json", cache_dir="pipeline/cache")
+
+
+def test_dependencies_follow_inputs_and_outputs():
+    assert dependencies(toy_stages()) == {"upper": [], "reverse": ["upper"], "count": [], "combine": ["count", "reverse"]}
+    # A stage rewriting a file runs after the stage that wrote it and the stages that read it
+    stages = toy_stages() + [Stage("rewrite", upper, inputs=[], outputs=["upper.txt"])]
+    assert dependencies(stages)["rewrite"] == ["reverse", "upper"]
+
+
+def test_rerun_skips_and_restores(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("raw.txt", "abc")
+    assert [action for _, action, _ in toy_pipeline().run()] == ["ran"] * 4
+    assert read("combined.txt") == "CBA3"
+    # Nothing changed: a new process of the pipeline does no work
+    assert [action for _, action, _ in toy_pipeline().run()] == ["skipped"] * 4
+
+    write("raw.txt", "abcd")
+    assert [action for _, action, _ in toy_pipeline().run()] == ["ran"] * 4
+    assert read("combined.txt") == "DCBA4"
+    # Back to an earlier input: every output comes from the cache
+    write("raw.txt", "abc")
+    assert [action for _, action, _ in toy_pipeline().run()] == ["restored"] * 4
+    assert read("combined.txt") == "CBA3"
+    assert [action for _, action, _ in toy_pipeline().run(force=True)] == ["ran"] * 4
+
+
+def test_edited_output_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("raw.txt", "abc")
+    toy_pipeline().run()
+    write("reverse.txt", "edited")
+    assert dict((name, action) for name, action, _ in toy_pipeline().run()) == {
+        "upper": "skipped", "reverse": "restored", "count": "skipped", "combine": "skipped",
+    }
+    assert read("reverse.txt") == "CBA"
+
+
+def test_code_hash_covers_code_deps():
+    plain = Stage("upper", upper, inputs=["raw.txt"], outputs=["upper.txt"])
+    with_helper = Stage("upper", upper, inputs=["raw.txt"], outputs=["upper.txt"], code_deps=[read, write])
+    with_module = Stage("upper", upper, inputs=["raw.txt"], outputs=["upper.txt"], code_deps=[read, write, "json"])
+    assert len({plain.code_hash(), with_helper.code_hash(), with_module.code_hash()}) == 3
+    assert with_helper.code_hash() == Stage("other", upper, inputs=[], outputs=[], code_deps=[read, write]).code_hash()
+
+
+def test_critical_path_is_the_slowest_chain():
+    deps = dependencies(toy_stages())
+    results = [("upper", "ran", 1.0), ("reverse", "ran", 2.0), ("count", "ran", 5.0), ("combine", "ran", 1.5)]
+    assert critical_path(results, deps) == (["count", "combine"], 6.5)
+    results[2] = ("count", "skipped", 0.0)
+    assert critical_path(results, deps) == (["upper", "reverse", "combine"], 4.5)
+    assert critical_path([], {}) == ([], 0.0)
+
+
+def test_parallel_run_matches_serial_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("raw.txt", "abc")
+    results = toy_pipeline().run(jobs=3)
+    assert [(name, action) for name, action, _ in results] == [(stage.name, "ran") for stage in toy_stages()]
+    assert read("combined.txt") == "CBA3"
+    assert [action for _, action, _ in toy_pipeline().run(jobs=3)] == ["skipped"] * 4
+    write("raw.txt", "abcd")
+    toy_pipeline().run(jobs=3)
+    assert read("combined.txt") == "DCBA4"
+
+
+def test_failed_stage_stops_dependents(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("raw.txt", "abc")
+    stages = [Stage("upper", upper, inputs=["raw.txt"], outputs=["upper.txt"]), Stage("broken", fail, inputs=["upper.txt"], outputs=["broken.txt"])]
+    stages.append(Stage("after", combine, inputs=["broken.txt"], outputs=["after.txt"]))
+    pipeline = Pipeline(stages, manifest_path="pipeline/manifest.json", cache_dir="pipeline/cache")
+    with pytest.raises(RuntimeError):
+        pipeline.run(jobs=2)
+    assert pipeline.is_up_to_date(stages[0]) and not os.path.exists("after.txt")
+
+
+def append_lines(incremental=False):
+    # Copies raw.txt, noting whether it was called for an incremental update
+    write("lines.txt", read("raw.txt") + ("updated" if incremental else "full"))
+
+
+def test_incremental_stage_updates_when_only_inputs_change(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stage = Stage("lines", append_lines, inputs=["raw.txt"], outputs=["lines.txt"], incremental=True)
+    pipeline = lambda: Pipeline([stage], manifest_path="pipeline/manifest.json", cache_dir="pipeline/cache")
+    write("raw.txt", "a\n")
+    assert pipeline().run()[0][1] == "ran" and read("lines.txt") == "a\nfull"
+    write("raw.txt", "a\nb\n")
+    assert pipeline().run()[0][1] == "updated" and read("lines.txt") == "a\nb\nupdated"
+    # An edited output cannot be updated from
+    write("raw.txt", "a\nb\nc\n")
+    write("lines.txt", "edited")
+    assert pipeline().run()[0][1] == "ran"
+    write("raw.txt", "a\n")
+    assert pipeline().run(force=True)[0][1] == "ran" and read("lines.txt") == "a\nfull"
@@ -0,0 +1,23 @@
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from schema import write_rejects
+
+
+def log_rejects(rejects_dir, worker, n):
+    for i in range(n):
+        write_rejects(pd.DataFrame({"id": [f"{worker}-{i}"], "reason": ["roundType not allowed"]}), "deals", rejects_dir)
+
+
+def test_rejects_accumulate(tmp_path):
+    write_rejects(pd.DataFrame({"id": ["1"], "reason": ["bad date"]}), "deals", str(tmp_path))
+    write_rejects(pd.DataFrame({"id": ["1", "2"], "reason": ["bad date", "bad amount"]}), "deals", str(tmp_path))
+    write_rejects(pd.DataFrame(columns=["id", "reason"]), "companies", str(tmp_path))
+    assert pd.read_csv(tmp_path / "deals.csv", dtype=str)["id"].tolist() == ["1", "2"]
+    assert not (tmp_path / "companies.csv").exists()
+
+
+def test_parallel_processes_keep_every_reject(tmp_path):
+    # Stages in separate worker processes log rejects of the same dataset at once
+    with ProcessPoolExecutor(4) as executor:
+        list(executor.map(log_rejects, [str(tmp_path)] * 4, range(4), [20] * 4))
+    assert len(pd.read_csv(tmp_path / "deals.csv")) == 80
@@ -0,0 +1,151 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from scraper import RETRIES, SEARCH_FAILURE, Fetcher
+
+# The fetcher against a local stub server. Paths:
+#   /page/<name>        200 with a one-line HTML page
+#   /flaky/<name>       429 (Retry-After: 0) on the first request, then as /page/<name>
+#   /down/<name>        always 503
+#   /missing/<name>     always 404
+#   /slow/<name>        as /page/<name> after 50 ms, tracking how many requests overlap
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.hits = Counter()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, body="", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body.encode())))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] += 1
+            hits = server.hits[self.path]
+        kind, name = self.path.strip("/").split("/", 1)
+        page = f"<html><body><p>{name} was founded in 2015</p></body></html>"
+        if kind == "flaky" and hits == 1:
+            self.send(429, headers=[("Retry-After", "0")])
+        elif kind == "down":
+            self.send(503)
+        elif kind == "missing":
+            self.send(404)
+        elif kind == "slow":
+            with server.lock:
+                server.active += 1
+                server.max_active = max(server.max_active, server.active)
+            time.sleep(0.05)
+            with server.lock:
+                server.active -= 1
+            self.send(200, page)
+        else:
+            self.send(200, page)
+
+
+@pytest.fixture
+def server():
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetcher():
+    with Fetcher(backoff=0.01, timeout=2) as fetcher:
+        yield fetcher
+
+
+def get_checked(url):
+    response = requests.get(url, timeout=2)
+    response.raise_for_status()
+    return response.text
+
+
+def test_fetch_text_retries_rate_limits(server, fetcher):
+    text = asyncio.run(fetcher.fetch_text(server.url("/flaky/acme")))
+    assert "acme was founded in 2015" in text
+    assert server.hits["/flaky/acme"] == 2
+
+
+def test_fetch_text_gives_up(server, fetcher):
+    assert asyncio.run(fetcher.fetch_text(server.url("/missing/acme"))) is None
+    assert server.hits["/missing/acme"] == 1
+    assert asyncio.run(fetcher.fetch_text(server.url("/down/acme"))) is None
+    assert server.hits["/down/acme"] == fetcher.retries + 1
+
+
+def test_per_host_limit(server):
+    async def fetch_all(fetcher):
+        return await asyncio.gather(*(fetcher.fetch_text(server.url(f"/slow/{i}")) for i in range(8)))
+
+    with Fetcher(per_host=2) as fetcher:
+        texts = asyncio.run(fetch_all(fetcher))
+    assert all(texts)
+    assert server.max_active == 2
+
+
+def test_collect_texts_keeps_url_order(server, fetcher):
+    urls = [server.url(path) for path in ["/missing/a", "/page/b", "/flaky/c", "/page/d"]]
+    texts = asyncio.run(fetcher.collect_texts(urls, limit=5))
+    assert [text.split()[0] for text in texts] == ["b", "c", "d"]
+
+
+def test_run_limited_retries_then_raises(server, fetcher):
+    assert "founded" in asyncio.run(fetcher.run_limited(server.url("/"), get_checked, server.url("/flaky/search")))
+    with pytest.raises(requests.exceptions.HTTPError):
+        asyncio.run(fetcher.run_limited(server.url("/"), get_checked, server.url("/down/search")))
+    assert server.hits["/down/search"] == fetcher.retries + 1
+    with pytest.raises(requests.exceptions.HTTPError):
+        asyncio.run(fetcher.run_limited(server.url("/"), get_checked, server.url("/missing/search")))
+    assert server.hits["/missing/search"] == 1
+
+
+def test_failed_search_is_recorded_per_company(server, monkeypatch, tmp_path):
+    pytest.importorskip("googlesearch")
+    pytest.importorskip("google.generativeai")
+    import imputation
+    from extraction import StubBackend
+
+    def search(company_name, location):
+        # Every search for "blocked" gets a 503; the others return two stub pages
+        if company_name == "blocked":
+            get_checked(server.url(f"/down/{company_name}"))
+        return [server.url(f"/page/{company_name}"), server.url(f"/missing/{company_name}")]
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(imputation, "get_google_search_results", search)
+    monkeypatch.setattr(imputation, "Fetcher", functools.partial(Fetcher, backoff=0.01, timeout=2))
+    companies = [["acme", "toronto"], ["blocked", "waterloo"], ["globex", "ottawa"]]
+    founded_dates = asyncio.run(imputation.get_founded_dates(companies, StubBackend()))
+    assert founded_dates == ["2015-01-01", SEARCH_FAILURE, "2015-01-01"]
+    # The failure is not cached: the company is searched again on the next run
+    asyncio.run(imputation.get_founded_dates(companies, StubBackend()))
+    assert server.hits["/down/blocked"] == 2 * (RETRIES + 1)